@@ -1,6 +1,20 @@
+import hashlib
+import math
+import os
+import re
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
+from scipy.interpolate import RBFInterpolator
+from scipy.linalg import cho_factor, cho_solve, expm, lu_factor, lu_solve
+from scipy.optimize import least_squares, minimize
+from scipy import sparse
+from scipy.sparse.linalg import splu
+from scipy.special import gammainc, gammaln
+from scipy.stats import qmc
 import matplotlib.pyplot as plt
 import tkinter as tk
 from tkinter import ttk, messagebox
@@ -204,7 +218,20 @@ class ReactionDatabase:
                 },
                 "target_product": "PE",
                 "catalyst": "Ziegler-Natta or Metallocene catalysts",
-                "temperature_range": (350, 500)
+                "temperature_range": (350, 500),
+                # Free-radical (high-pressure autoclave) kinetics for the moment model,
+                # initiated by di-tert-butyl peroxide
+                "polymerization": {
+                    "monomer": "C2H4",
+                    "monomer_molar_mass": 28.05,  # g/mol
+                    "initiator_feed": 0.05,  # mol/m³
+                    "initiator_efficiency": 0.5,
+                    "initiator_decomposition": {"frequency_factor": 1.0e16, "activation_energy": 153000},
+                    "propagation": {"frequency_factor": 5.88e4, "activation_energy": 29800},  # m³/(mol·s)
+                    "transfer_to_monomer": {"frequency_factor": 582.0, "activation_energy": 43500},
+                    "termination_combination": {"frequency_factor": 1.075e6, "activation_energy": 5000},
+                    "termination_disproportionation": {"frequency_factor": 0.0, "activation_energy": 0}
+                }
             },
             "Steam Reforming of Methane": {
                 "description": "CH4 + H2O → CO + 3H2 - Production of syngas from methane and steam",
@@ -469,6 +496,156 @@ class ReactionDatabase:
     def get_reaction_details(self, reaction_name):
         """Return details for a specific reaction"""
         return self.reactions.get(reaction_name, None)
+    
+    def build_response_tables(self, directory, **grid):
+        """
+        Precompute a response-surface table for every process of the database
+        
+        Parameters:
+        -----------
+        directory : str
+            Directory where the tables are written
+        **grid
+            Grid options passed to CSTRSimulator.build_response_table
+        
+        Returns:
+        --------
+        dict
+            Path of the table of each process
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        for name, data in self.reactions.items():
+            paths[name] = self.create_simulator(name).build_response_table(
+                os.path.join(directory, ResponseTable.file_stem(name)),
+                temp_bounds=data["temperature_range"], name=name, **grid)
+        return paths
+    
+    def train_surrogates(self, directory, **options):
+        """
+        Train and save a surrogate model for every process of the database
+        
+        Parameters:
+        -----------
+        directory : str
+            Directory where the surrogates are written
+        **options
+            Options passed to CSTRSimulator.train_surrogate
+        
+        Returns:
+        --------
+        dict
+            Path of the surrogate of each process
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        for name, data in self.reactions.items():
+            surrogate = self.create_simulator(name).train_surrogate(temp_bounds=data["temperature_range"], **options)
+            paths[name] = surrogate.save(os.path.join(directory, ResponseTable.file_stem(name) + ".npz"))
+        return paths
+    
+    def runaway_screening(self, heat_transfer_coefficient=1000.0, coolant_offsets=(-100, -50, 0, 50, 100),
+                          feed_scales=(0.5, 1.0, 1.5), n_temperatures=401):
+        """
+        Screen every process with heats of reaction for thermal runaway
+        
+        Each process is run in a jacketed reactor fed at the middle of its
+        temperature range, and CSTRSimulator.heat_balance_curves is
+        evaluated for every combination of coolant temperature and feed
+        scale, over a grid from 200 K below to 400 K above the temperature
+        range.
+        
+        Parameters:
+        -----------
+        heat_transfer_coefficient : float
+            Jacket UA in W/K
+        coolant_offsets : array_like
+            Coolant temperatures relative to the feed temperature in K
+        feed_scales : array_like
+            Factors applied to the feed composition
+        n_temperatures : int
+            Number of grid temperatures
+        
+        Returns:
+        --------
+        DataFrame
+            The scenario table of heat_balance_curves with a "process" column
+        """
+        offsets, scales = np.meshgrid(np.asarray(coolant_offsets, dtype=float), np.asarray(feed_scales, dtype=float),
+                                      indexing="ij")
+        tables = []
+        for name, data in self.reactions.items():
+            if not any("heat_of_reaction" in reaction for reaction in data["reactions"]):
+                continue
+            simulator = self.create_simulator(name)
+            simulator.set_jacket(heat_transfer_coefficient, simulator.temperature)
+            low, high = data["temperature_range"]
+            curves = simulator.heat_balance_curves(simulator.temperature + offsets.ravel(), scales.ravel(),
+                                                   temp_bounds=(max(low - 200, 1.0), high + 400),
+                                                   n_temperatures=n_temperatures)
+            tables.append(curves["scenarios"])
+            tables[-1].insert(0, "process", name)
+        return pd.concat(tables, ignore_index=True)
+    
+    def import_mechanism(self, path, name=None, feed_composition=None, temperature_range=(300, 1500),
+                         target_product=None, catalyst=None, cache=True):
+        """
+        Add a process whose reactions are imported from a mechanism file
+        
+        Parameters:
+        -----------
+        path : str
+            CHEMKIN or Cantera YAML mechanism file (see Mechanism)
+        name : str, optional
+            Name of the process, the file name by default
+        feed_composition : dict, optional
+            Feed concentrations in mol/m³
+        temperature_range : tuple
+            Operating temperature range in K; equilibrium constants from
+            reverse parameters are evaluated at its middle
+        target_product : str, optional
+            Product used for yields and optimization
+        catalyst : str, optional
+            Name of the catalyst
+        cache : bool
+            Use the binary cache of the mechanism file
+        
+        Returns:
+        --------
+        str
+            Name under which the process was added
+        """
+        mechanism = Mechanism.load(path, cache=cache, fit_temperature=float(np.mean(temperature_range)))
+        if name is None:
+            name = os.path.splitext(os.path.basename(path))[0]
+        self.reactions[name] = {
+            "description": f"{len(mechanism.names)} reactions and {len(mechanism.species)} species "
+                           f"imported from {os.path.basename(path)}",
+            "reactions": mechanism.reactions,
+            "feed_composition": dict(feed_composition or {}),
+            "target_product": target_product,
+            "catalyst": catalyst,
+            "temperature_range": tuple(temperature_range)
+        }
+        return name
+    
+    def create_simulator(self, reaction_name, volume=5.0, flow_rate=0.02, recycle_ratio=0.0):
+        """Return a CSTRSimulator set up for a process at the middle of its temperature range"""
+        data = self.reactions[reaction_name]
+        simulator = CSTRSimulator()
+        simulator.set_parameters(
+            volume=volume,
+            temperature=float(np.mean(data["temperature_range"])),
+            flow_rate=flow_rate,
+            reactions=data["reactions"],
+            feed_composition=dict(data["feed_composition"]),
+            recycle_ratio=recycle_ratio,
+            target_product=data["target_product"],
+            catalyst=data["catalyst"]
+        )
+        if "polymerization" in data:
+            simulator.set_polymerization(data["polymerization"])
+        return simulator
 
 class CSTRSimulator:
     """
@@ -476,9 +653,22 @@ class CSTRSimulator:
     recycle, and temperature optimization.
     """
     
+    # Chemical element symbols recognized in molecular formulas
+    ELEMENT_SYMBOLS = frozenset("""
+        H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se
+        Br Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy
+        Ho Er Tm Yb Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu
+    """.split())
+    
+    # Networks with at least this many species are solved with sparse Jacobians
+    SPARSE_THRESHOLD = 100
+    
     def __init__(self):
         # Constants
         self.R = 8.314  # J/(mol·K), Universal gas constant
+        # Molecular formulas of species not named by their formula
+        # (PE stands for one ethylene unit of the polymer)
+        self.formulas = {"BPA": "C15H16O2", "PE": "C2H4"}
         
     def set_parameters(self, volume, temperature, flow_rate, 
                        reactions, feed_composition, recycle_ratio=0.0, 
@@ -545,6 +735,9 @@ class CSTRSimulator:
             exp_term = 700
             
         k = k0 * np.exp(exp_term)
+        # Modified Arrhenius form k0 T^n exp(-Ea / RT)
+        if reaction.get("temperature_exponent", 0.0):
+            k *= temp ** reaction["temperature_exponent"]
         
         # Check for unreasonably large frequency factors
         # In practice, frequency factor rarely exceed 1e12 in standard units
@@ -555,8 +748,11 @@ class CSTRSimulator:
         rate = k
         for component, order in reaction["reaction_order"].items():
             if component in component_conc:
-                # Prevent negative or zero concentration issues
-                conc = max(1e-10, component_conc[component])
+                # Prevent negative concentrations, and zero concentrations for negative orders
+                if order < 0:
+                    conc = max(1e-10, component_conc[component])
+                else:
+                    conc = max(0.0, component_conc[component])
                 rate *= conc ** order
         
         # Adjust for reversible reactions if needed
@@ -593,6 +789,19 @@ class CSTRSimulator:
                 # If we have numerical issues, assume forward reaction dominates
                 pass
         
+        # Langmuir-Hinshelwood/Hougen-Watson adsorption denominator, if any
+        rate_law = reaction.get("rate_law") or {}
+        if rate_law.get("adsorption"):
+            denominator = 1.0
+            for term in rate_law["adsorption"]:
+                K_ads = term["frequency_factor"] * np.exp(
+                    max(min(-term.get("heat_of_adsorption", 0.0) / (self.R * temp), 700), -700))
+                for component, power in term.get("orders", {}).items():
+                    conc = component_conc.get(component, 0.0)
+                    K_ads *= (max(1e-10, conc) if power < 0 else max(0.0, conc)) ** power
+                denominator += K_ads
+            rate /= denominator ** rate_law.get("exponent", 1.0)
+        
         # Ensure rate is not negative (reaction can't go backward if not reversible)
         if not reaction.get("reversible", False) and rate < 0:
             rate = 0.0
@@ -603,536 +812,5470 @@ class CSTRSimulator:
         
         return rate
     
-    def solve_steady_state(self, temperature=None):
-        """
-        Solve for steady-state concentrations at the given temperature
+    def _network_species(self):
+        """Return the ordered list of species handled by the array-based solver"""
+        species = list(self.components)
+        for comp in self.feed_composition:
+            if comp not in species:
+                species.append(comp)
+        return species
+    
+    def _compile_network(self):
         """
-        if temperature is None:
-            temperature = self.temperature
+        Compile the reaction dictionaries into arrays for vectorized kinetics
         
-        # For a CSTR with recycle, we need iterations to reach true steady state
-        # Start with no recycle
-        if self.recycle_ratio > 0:
-            # Initialize with feed composition
-            current_conc = {comp: conc for comp, conc in self.feed_composition.items()}
-            for comp in self.components:
-                if comp not in current_conc:
-                    current_conc[comp] = 0.0
-            
-            # Iteratively solve until convergence
-            max_iterations = 20
-            tolerance = 1e-6
-            converged = False
-            
-            for iteration in range(max_iterations):
-                # Calculate the actual input concentration (fresh feed + recycle)
-                inlet_conc = {comp: 0.0 for comp in self.components}
-                for comp in self.components:
-                    # Fresh feed contribution
-                    fresh_feed = self.feed_composition.get(comp, 0.0)
-                    # Recycle contribution
-                    recycle_feed = current_conc.get(comp, 0.0) * self.recycle_ratio
-                    # Combined feed
-                    inlet_conc[comp] = fresh_feed * (1 - self.recycle_ratio) + recycle_feed
-                
-                # Calculate net generation/consumption rates for each component
-                net_rates = {comp: 0.0 for comp in self.components}
-                
-                for reaction in self.reactions:
-                    reaction_rate = self.reaction_rate(current_conc, temperature, reaction)
-                    
-                    # Ensure reaction rates are physically reasonable
-                    # Reaction can't consume more than what's available in residence time
-                    tau = self.volume / self.flow_rate  # residence time
-                    
-                    # Check if reaction rate is too high for any reactant
-                    limiting_factor = 1.0
-                    for component, stoich in reaction["stoichiometry"].items():
-                        if stoich < 0:  # Reactant
-                            if component in current_conc and current_conc[component] > 0:
-                                # Maximum rate allowed by availability of this reactant
-                                max_rate = current_conc[component] / (abs(stoich) * tau)
-                                if reaction_rate > max_rate:
-                                    # Scale down the reaction rate to avoid mass balance violations
-                                    factor = max_rate / reaction_rate
-                                    limiting_factor = min(limiting_factor, factor)
-                    
-                    # Apply the limiting factor to reaction rate
-                    reaction_rate *= limiting_factor
-                    
-                    # Add contribution to net rates
-                    for component, stoich in reaction["stoichiometry"].items():
-                        if component in net_rates:
-                            net_rates[component] += stoich * reaction_rate
-                
-                # Calculate new concentrations
-                new_conc = {comp: 0.0 for comp in self.components}
-                for comp in self.components:
-                    # CSTR mass balance: in - out + generation = 0
-                    # Solving for out: Cout = Cin + generation * tau
-                    tau = self.volume / self.flow_rate  # residence time
-                    new_conc[comp] = inlet_conc.get(comp, 0.0) + net_rates.get(comp, 0.0) * tau
-                    # Ensure non-negative concentrations
-                    new_conc[comp] = max(0.0, new_conc[comp])
-                
-                # Verify mass balance (atom balance)
-                self._verify_mass_balance(inlet_conc, new_conc, reaction)
-                
-                # Check convergence
-                max_diff = max([abs(new_conc[comp] - current_conc[comp]) for comp in self.components])
-                if max_diff < tolerance:
-                    converged = True
-                    break
-                
-                # Update for next iteration
-                current_conc = new_conc.copy()
-            
-            # Return converged concentrations
-            self.concentrations = current_conc
-        else:
-            # No recycle, direct solution
-            # Initialize with feed composition
-            current_conc = {comp: conc for comp, conc in self.feed_composition.items()}
-            for comp in self.components:
-                if comp not in current_conc:
-                    current_conc[comp] = 0.0
-            
-            # Calculate net generation/consumption rates for each component
-            net_rates = {comp: 0.0 for comp in self.components}
-            
-            for reaction in self.reactions:
-                reaction_rate = self.reaction_rate(current_conc, temperature, reaction)
-                
-                # Same check as above for physical reasonability
-                tau = self.volume / self.flow_rate
-                limiting_factor = 1.0
-                for component, stoich in reaction["stoichiometry"].items():
-                    if stoich < 0:  # Reactant
-                        if component in current_conc and current_conc[component] > 0:
-                            max_rate = current_conc[component] / (abs(stoich) * tau)
-                            if reaction_rate > max_rate:
-                                factor = max_rate / reaction_rate
-                                limiting_factor = min(limiting_factor, factor)
-                
-                reaction_rate *= limiting_factor
-                
-                for component, stoich in reaction["stoichiometry"].items():
-                    if component in net_rates:
-                        net_rates[component] += stoich * reaction_rate
-            
-            # Calculate new concentrations
-            new_conc = {comp: 0.0 for comp in self.components}
-            for comp in self.components:
-                tau = self.volume / self.flow_rate
-                new_conc[comp] = current_conc.get(comp, 0.0) + net_rates.get(comp, 0.0) * tau
-                new_conc[comp] = max(0.0, new_conc[comp])
-            
-            # Verify mass balance
-            self._verify_mass_balance(current_conc, new_conc, reaction)
-            
-            self.concentrations = new_conc
+        The compiled network is cached and only rebuilt when the species list
+        or one of the reaction parameters changes. Networks with at least
+        SPARSE_THRESHOLD species also carry CSR stoichiometric and order
+        matrices and the (reaction, species) pairs that enter a rate law,
+        used by the sparse steady-state solver.
         
-        return self.concentrations
-    
-    def _verify_mass_balance(self, inlet_conc, outlet_conc, reaction):
-        """
-        Verify that mass balance is maintained in the reactor
-        by checking elemental balances (this is a simplified version)
+        Rate laws beyond power-law Arrhenius kinetics are declared on the
+        reaction dictionaries and compiled here, so that the kinetics only
+        evaluate arrays:
+        
+        - "temperature_exponent": n in k = k0 T^n exp(-Ea / RT)
+        - "rate_law": {"adsorption": [...], "exponent": m} divides the rate
+          by the Langmuir-Hinshelwood/Hougen-Watson term
+          (1 + sum_j K_j(T) prod_i C_i^p_ji)^m, each adsorption term being a
+          dict with the "orders" p_ji, the "frequency_factor" of K_j in
+          consistent units and its "heat_of_adsorption" in J/mol
+          (K_j = K0_j exp(-dH_j / RT))
+        
+        Networks without them get None entries and skip the extra work.
         """
-        total_in = sum(inlet_conc.values())
-        total_out = sum(outlet_conc.values())
+        species = self._network_species()
+        use_sparse = len(species) >= self.SPARSE_THRESHOLD
+        key = (tuple(species), use_sparse) + tuple(
+            (tuple(sorted(reaction["stoichiometry"].items())),
+             tuple(sorted(reaction.get("reaction_order", {}).items())),
+             reaction.get("frequency_factor", 0.0),
+             reaction.get("activation_energy", 0.0),
+             reaction.get("reversible", False),
+             reaction.get("equilibrium_constant", 1.0),
+             reaction.get("heat_of_reaction"),
+             reaction.get("reference_temperature", 298.15),
+             reaction.get("temperature_exponent", 0.0),
+             json.dumps(reaction.get("rate_law"), sort_keys=True))
+            for reaction in self.reactions
+        )
+        network = getattr(self, "_network", None)
+        if network is not None and network["key"] == key:
+            return network
+        
+        index = {comp: i for i, comp in enumerate(species)}
+        n_reactions, n_species = len(self.reactions), len(species)
+        nu = np.zeros((n_reactions, n_species))
+        order = np.zeros((n_reactions, n_species))
+        for j, reaction in enumerate(self.reactions):
+            for component, stoich in reaction["stoichiometry"].items():
+                nu[j, index[component]] = stoich
+            for component, reaction_order in reaction.get("reaction_order", {}).items():
+                if component in index:
+                    order[j, index[component]] = reaction_order
+        
+        # Adsorption terms K(T) prod C^p of Hougen-Watson denominators, one row per term
+        terms = [(j, term) for j, reaction in enumerate(self.reactions)
+                 for term in (reaction.get("rate_law") or {}).get("adsorption", [])]
+        adsorption = None
+        if terms:
+            term_reaction = np.array([j for j, _ in terms])
+            term_order = np.zeros((len(terms), n_species))
+            for t, (_, term) in enumerate(terms):
+                for component, term_power in term.get("orders", {}).items():
+                    if component in index:
+                        term_order[t, index[component]] = term_power
+            adsorption = {
+                "reaction": term_reaction,
+                "K0": np.array([term["frequency_factor"] for _, term in terms], dtype=float),
+                "dH": np.array([term.get("heat_of_adsorption", 0.0) for _, term in terms], dtype=float),
+                "order": term_order,
+                "map": (term_reaction[:, None] == np.arange(n_reactions)).astype(float),
+                "exponent": np.array([(r.get("rate_law") or {}).get("exponent", 1.0) for r in self.reactions],
+                                     dtype=float),
+            }
+        temperature_exponent = np.array([r.get("temperature_exponent", 0.0) for r in self.reactions], dtype=float)
         
-        # If total moles out exceeds total moles in by more than 1%,
-        # there might be a mass balance issue
-        if total_out > total_in * 1.01:
-            # Normalize outlet concentrations to maintain mass balance
-            scale_factor = total_in / total_out
-            for comp in outlet_conc:
-                outlet_conc[comp] *= scale_factor
+        network = {
+            "key": key,
+            "species": species,
+            "index": index,
+            "nu": nu,
+            "order": order,
+            "k0": np.array([r.get("frequency_factor", 0.0) for r in self.reactions], dtype=float),
+            "Ea": np.array([r.get("activation_energy", 0.0) for r in self.reactions], dtype=float),
+            "reversible": np.array([bool(r.get("reversible", False)) for r in self.reactions]),
+            "K_eq": np.array([r.get("equilibrium_constant", 1.0) if r.get("reversible", False) else 1.0
+                              for r in self.reactions], dtype=float),
+            "has_dH": np.array(["heat_of_reaction" in r for r in self.reactions]),
+            "dH": np.array([r.get("heat_of_reaction", 0.0) for r in self.reactions], dtype=float),
+            "T_ref": np.array([r.get("reference_temperature", 298.15) for r in self.reactions], dtype=float),
+            "temperature_exponent": temperature_exponent if np.any(temperature_exponent) else None,
+            "adsorption": adsorption,
+            "sparse": use_sparse,
+        }
+        if use_sparse:
+            nu_sparse = sparse.csr_matrix(nu)
+            rows, cols = np.nonzero((order != 0) | (network["reversible"][:, None] & (nu != 0)))
+            if adsorption is not None:
+                term_rows, term_cols = np.nonzero(adsorption["order"])
+                adsorption.update({"term_rows": term_rows, "term_cols": term_cols,
+                                   "term_power": adsorption["order"][term_rows, term_cols]})
+            network.update({
+                "nu_sparse": nu_sparse,
+                "nu_T": nu_sparse.T.tocsr(),
+                "abs_nu_T": abs(nu_sparse).T.tocsr(),
+                "pattern_rows": rows,
+                "pattern_cols": cols,
+                "pattern_order": order[rows, cols],
+                "pattern_nu": nu[rows, cols],
+            })
+        else:
+            self._reaction_space(network)
+        self._network = network
+        return network
     
-    def calculate_conversion(self, inlet_conc=None, outlet_conc=None):
-        """Calculate the conversion of reactants"""
-        if inlet_conc is None:
-            inlet_conc = self.feed_composition
-        if outlet_conc is None:
-            outlet_conc = self.concentrations
+    @staticmethod
+    def _reaction_space(network):
+        """
+        Orthonormal bases of the reaction space and of the conserved moieties
         
-        conversions = {}
-        for comp in self.components:
-            if comp in inlet_conc and inlet_conc[comp] > 0:
-                conversions[comp] = (inlet_conc[comp] - outlet_conc[comp]) / inlet_conc[comp]
+        The reaction space is range(nu^T); its complement, the left null
+        space of the stoichiometric matrix, has the conserved moieties as
+        rows. The SVD costs O(n_species³), so for sparse networks it is only
+        computed (and then cached in the network) when a dense feature needs it.
         
-        return conversions
+        Returns:
+        --------
+        basis : ndarray
+            Basis of the reaction space, shape (n_species, rank)
+        moieties : ndarray
+            Conserved moieties, shape (n_species - rank, n_species)
+        """
+        if "basis" not in network:
+            nu = network["nu"]
+            n_reactions, n_species = nu.shape
+            _, singular_values, vt = np.linalg.svd(nu) if n_reactions else (None, np.zeros(0), np.eye(n_species))
+            rank = int((singular_values > 1e-10 * max(singular_values.max(initial=0.0), 1.0)).sum())
+            network["basis"] = vt[:rank].T
+            network["moieties"] = vt[rank:]
+        return network["basis"], network["moieties"]
     
-    def calculate_yield(self, product=None):
-        """Calculate the yield of the target product"""
-        if product is None:
-            product = self.target_product
+    def _feed_vector(self, network, feed_composition=None):
+        """Return the feed composition as an array ordered like the network species"""
+        if feed_composition is None:
+            feed_composition = self.feed_composition
+        return np.array([feed_composition.get(comp, 0.0) for comp in network["species"]], dtype=float)
+    
+    def _kinetics(self, network, conc, temp, k0=None, Ea=None, derivatives=False, K_eq=None):
+        """
+        Vectorized counterpart of reaction_rate for every reaction of the network
         
-        if not product:
-            return 0.0
+        Parameters:
+        -----------
+        network : dict
+            Compiled network from _compile_network
+        conc : ndarray
+            Concentrations with shape (..., n_species)
+        temp : float or ndarray
+            Temperatures broadcastable to conc.shape[:-1]
+        k0, Ea : ndarray, optional
+            Overrides of the frequency factors and activation energies,
+            broadcastable to (..., n_reactions)
+        derivatives : bool
+            If True, also return the exact derivatives of the rates
+        K_eq : ndarray, optional
+            Override of the equilibrium constants at the reference
+            temperature, broadcastable to (..., n_reactions)
         
-        # Find reaction that produces the target product
-        target_reaction = None
-        target_stoich = 0
+        Returns:
+        --------
+        rates : ndarray
+            Reaction rates with shape (..., n_reactions)
+        derivs : dict or None
+            Derivatives of the rates with respect to concentrations
+            ("conc", shape (..., n_reactions, n_species)), temperature ("temperature"),
+            frequency factors ("frequency_factor") and activation energies
+            ("activation_energy")
         
-        for reaction in self.reactions:
-            stoich = reaction["stoichiometry"].get(product, 0)
-            if stoich > 0:
-                target_reaction = reaction
-                target_stoich = stoich
-                break
+        Without overrides, the generated function of _generated_kinetics is
+        used when the network has one; its derivatives also contain
+        "production", the Jacobian of nu^T r.
+        """
+        if k0 is None and Ea is None and K_eq is None:
+            generated = self._generated_kinetics(network)
+            if generated is not None:
+                return generated(conc, temp, derivatives)
+        conc = np.asarray(conc, dtype=float)
+        temp = np.broadcast_to(np.asarray(temp, dtype=float), conc.shape[:-1])[..., None]
+        k0 = network["k0"] if k0 is None else np.asarray(k0, dtype=float)
+        Ea = network["Ea"] if Ea is None else np.asarray(Ea, dtype=float)
+        nu = network["nu"]
+        reversible = network["reversible"]
         
-        if not target_reaction:
-            return 0.0
+        # Same safeguards as reaction_rate: clipped Arrhenius exponent and capped k
+        valid_temp = temp > 0
+        safe_temp = np.where(valid_temp, temp, 1.0)
+        exp_term = -Ea / (self.R * safe_temp)
+        exp_free = (exp_term > -700) & (exp_term < 700)
+        arrhenius = np.exp(np.clip(exp_term, -700, 700))
+        temperature_exponent = network["temperature_exponent"]
+        if temperature_exponent is not None:
+            arrhenius = arrhenius * safe_temp ** temperature_exponent
+        k = k0 * arrhenius
+        k_free = k <= 1e12
+        k = np.minimum(k, 1e12)
         
-        # Find limiting reactant
-        limiting_reactant = None
-        limiting_reactant_stoich = 0
-        max_theoretical_product = float('inf')
+        # Power-law concentration term, floored like reaction_rate for negative orders
+        order = network["order"]
+        base = np.where(order < 0, np.maximum(conc, 1e-10)[..., None, :], np.maximum(conc, 0.0)[..., None, :])
+        power = np.prod(base ** order, axis=-1)
         
-        for comp, stoich in target_reaction["stoichiometry"].items():
-            if stoich < 0 and comp in self.feed_composition:
-                # Calculate theoretical product from this reactant
-                theoretical = self.feed_composition[comp] * target_stoich / abs(stoich)
-                if theoretical < max_theoretical_product:
-                    max_theoretical_product = theoretical
-                    limiting_reactant = comp
-                    limiting_reactant_stoich = stoich
+        # Equilibrium factor (1 - Q/K) for reversible reactions
+        K_eq = network["K_eq"] if K_eq is None else np.asarray(K_eq, dtype=float)
+        vant_hoff = np.where(network["has_dH"],
+                             network["dH"] / self.R * (1 / network["T_ref"] - 1 / safe_temp), 0.0)
+        vant_hoff_free = network["has_dH"] & (vant_hoff > -700) & (vant_hoff < 700)
+        K_eq = K_eq * np.exp(np.clip(vant_hoff, -700, 700))
+        K_free = K_eq > 1e-10
+        K_eq = np.maximum(K_eq, 1e-10)
+        present = conc > 0
+        log_conc = np.where(present, np.log(np.where(present, conc, 1.0)), 0.0)
+        Q = np.exp(np.minimum(log_conc @ nu.T, 700))
+        driving = np.where(reversible, 1 - Q / K_eq, 1.0)
         
-        if not limiting_reactant:
-            return 0.0
+        # Hougen-Watson inhibition 1 / (1 + sum of adsorption terms)^m
+        adsorption = network["adsorption"]
+        inhibition = 1.0
+        if adsorption is not None:
+            K_ads = adsorption["K0"] * np.exp(np.clip(-adsorption["dH"] / (self.R * safe_temp), -700, 700))
+            ads_order = adsorption["order"]
+            ads_base = np.where(ads_order < 0, np.maximum(conc, 1e-10)[..., None, :],
+                                np.maximum(conc, 0.0)[..., None, :])
+            term = K_ads * np.prod(ads_base ** ads_order, axis=-1)
+            denominator = 1 + term @ adsorption["map"]
+            inhibition = denominator ** -adsorption["exponent"]
         
-        # Calculate conversion of limiting reactant
-        feed_conc = self.feed_composition.get(limiting_reactant, 0)
-        exit_conc = self.concentrations.get(limiting_reactant, 0)
+        rate = k * power * driving * inhibition
+        rate = np.where(~reversible & (rate < 0), 0.0, rate)
+        uncapped = valid_temp & (rate < 100.0)
+        rate = np.where(valid_temp, np.minimum(rate, 100.0), 0.0)
         
-        # Adjust for recycle
-        if self.recycle_ratio > 0:
-            # Only consider the net input/output with recycle
-            net_feed = feed_conc * (1 - self.recycle_ratio)
-            net_exit = exit_conc * (1 - self.recycle_ratio)
-            conversion = (net_feed - net_exit) / net_feed if net_feed > 0 else 0
-        else:
-            conversion = (feed_conc - exit_conc) / feed_conc if feed_conc > 0 else 0
+        if not derivatives:
+            return rate, None
         
-        # Calculate selectivity (moles of product / moles of reactant consumed)
-        actual_product = self.concentrations.get(product, 0)
-        reactant_consumed = feed_conc * conversion
+        # d(power)/dC and d(driving)/dC, both proportional to 1/C
+        floored = base > np.where(order < 0, 1e-10, 0.0)
+        inv_base = np.where(floored, 1 / np.where(floored, base, 1.0), 0.0)
+        dpower_dC = (power * k)[..., None] * order * inv_base
+        inv_present = np.where(present, 1 / np.where(present, conc, 1.0), 0.0)
+        with np.errstate(over="ignore", invalid="ignore"):
+            ddriving_dC = np.where(reversible[:, None],
+                                   -(Q / K_eq)[..., None] * nu * inv_present[..., None, :], 0.0)
+        drate_dC = dpower_dC * driving[..., None] + (k * power)[..., None] * ddriving_dC
+        active = uncapped & (reversible | (rate > 0))
         
-        if reactant_consumed > 0:
-            selectivity = actual_product / (reactant_consumed * target_stoich / abs(limiting_reactant_stoich))
-        else:
-            selectivity = 0
+        kinetic_free = exp_free & k_free
+        dk_dT = np.where(kinetic_free, k * Ea / (self.R * safe_temp**2), 0.0)
+        if temperature_exponent is not None:
+            dk_dT = dk_dT + np.where(k_free, k * temperature_exponent / safe_temp, 0.0)
+        ddriving_dT = np.where(reversible & vant_hoff_free & K_free,
+                               Q / K_eq * network["dH"] / (self.R * safe_temp**2), 0.0)
+        drate_dT = dk_dT * power * driving + k * power * ddriving_dT
+        drate_dk0 = np.where(k_free, arrhenius * power * driving, 0.0)
+        drate_dEa = np.where(kinetic_free, -k * power * driving / (self.R * safe_temp), 0.0)
+        magnitude = k * power * np.where(reversible, 1 + Q / K_eq, 1.0)
         
-        # Yield = conversion * selectivity
-        yield_value = conversion * selectivity
+        if adsorption is not None:
+            # Chain rule through the denominator: d(inhibition) = -m inhibition / denominator * d(denominator)
+            ads_floored = ads_base > np.where(ads_order < 0, 1e-10, 0.0)
+            ads_inv_base = np.where(ads_floored, 1 / np.where(ads_floored, ads_base, 1.0), 0.0)
+            dterm_dC = term[..., None] * ads_order * ads_inv_base
+            dterm_dT = term * adsorption["dH"] / (self.R * safe_temp**2)
+            factor = -adsorption["exponent"] * inhibition / denominator
+            uninhibited = k * power * driving
+            drate_dC = (drate_dC * inhibition[..., None] + (uninhibited * factor)[..., None]
+                        * np.einsum("tr,...ts->...rs", adsorption["map"], dterm_dC))
+            drate_dT = drate_dT * inhibition + uninhibited * factor * (dterm_dT @ adsorption["map"])
+            drate_dk0 = drate_dk0 * inhibition
+            drate_dEa = drate_dEa * inhibition
+            magnitude = magnitude * inhibition
         
-        return max(0, min(1, yield_value))  # Ensure between 0 and 1
+        derivs = {
+            "magnitude": np.maximum(np.abs(rate), magnitude),
+            "conc": np.where(active[..., None], drate_dC, 0.0),
+            "temperature": np.where(active, drate_dT, 0.0),
+            "frequency_factor": np.where(active, drate_dk0, 0.0),
+            "activation_energy": np.where(active, drate_dEa, 0.0),
+        }
+        return rate, derivs
     
-    def objective_function(self, temperature):
-        """Objective function for temperature optimization (maximize yield)"""
-        self.solve_steady_state(temperature)
-        yield_value = self.calculate_yield()
-        return -yield_value  # Negative because we're minimizing
+    # Networks with up to this many reactions get a generated kinetics function
+    CODEGEN_MAX_REACTIONS = 200
+    # Number of generated kinetics functions kept in the cache
+    CODEGEN_CACHE_SIZE = 64
     
-    def optimize_temperature(self, bounds=(300, 1000)):
-        """Find optimal temperature to maximize product yield"""
-        # Test a more extensive grid of starting points
-        test_temps = np.linspace(bounds[0], bounds[1], 10)
-        best_yield = -1
-        best_temp = bounds[0]
+    # Generated kinetics functions shared by all simulators, keyed by network
+    # hash, from least to most recently used
+    _generated_kinetics_cache = OrderedDict()
+    
+    def _generated_kinetics(self, network):
+        """
+        Kinetics function specialized for one network, generated and compiled once
         
-        for temp in test_temps:
-            self.solve_steady_state(temp)
-            yield_value = self.calculate_yield()
-            if yield_value > best_yield:
-                best_yield = yield_value
-                best_temp = temp
+        _kinetics evaluates every (reaction, species) pair of the network
+        arrays although most of them are zero. For a fixed reaction set the
+        rate laws are known in advance, so the source of an equivalent
+        function is written out with the constants inlined and the species
+        indices of the nonzero terms hard-wired, compiled with compile() and
+        cached per hash of the network key, so that simulators of the same
+        process share it. The cache keeps the CODEGEN_CACHE_SIZE most
+        recently used functions. Besides the derivatives of _kinetics it returns
+        "production", the Jacobian of nu^T r assembled entry by entry.
         
-        # Use best temperature as starting point for optimization
-        # Use a more robust optimization configuration
-        result = minimize(
-            self.objective_function,
-            x0=[best_temp],
-            bounds=[bounds],
-            method='L-BFGS-B',
-            options={
-                'ftol': 1e-8,       # More stringent function tolerance
-                'gtol': 1e-6,       # More stringent gradient tolerance
-                'maxiter': 100,     # More iterations
-                'maxfun': 200,      # More function evaluations
-                'eps': 0.1,         # Step size for finite-difference gradient
-                'disp': False       # Don't display convergence messages
-            }
-        )
+        The same source is executed twice, with NumPy functions for batches
+        and with math functions on Python floats for a single operating
+        point, where the overhead of NumPy calls on one-element arrays
+        would dominate; the float version falls back to the NumPy one on
+        overflow. Sparse networks and networks with more than
+        CODEGEN_MAX_REACTIONS reactions keep the array kinetics.
         
-        # Verify that optimization actually improved the solution
-        optimal_temp = result.x[0]
-        optimal_yield = -result.fun  # Convert back from negative
+        Returns:
+        --------
+        callable or None
+            f(conc, temp, derivatives) returning (rates, derivs) like _kinetics,
+            with the generated code in its source attribute
+        """
+        if "generated" not in network:
+            generated = None
+            n_reactions, n_species = network["nu"].shape
+            if not network["sparse"] and 0 < n_reactions <= self.CODEGEN_MAX_REACTIONS:
+                digest = hashlib.sha1(repr((self.R, network["key"])).encode()).hexdigest()
+                cache = self._generated_kinetics_cache
+                generated = cache.pop(digest, None)
+                if generated is None:
+                    header, body = self._kinetics_source(network)
+                    code = compile("\n".join(header + body) + "\n", f"<kinetics {digest[:12]}>", "exec")
+                    batched = {"np": np, "where": np.where, "maximum": np.maximum, "minimum": np.minimum,
+                               "exp": np.exp, "log": np.log,
+                               "stack": lambda values, shape: np.stack(values, axis=-1)}
+                    exec(code, batched)
+                    single = {"np": np, "where": lambda condition, x, y: x if condition else y,
+                              "maximum": max, "minimum": min, "exp": math.exp, "log": math.log,
+                              "stack": lambda values, shape: np.array(values).reshape(shape + (-1,))}
+                    exec(code, single)
+                    batched, single = batched["kinetics"], single["kinetics"]
+                    
+                    def generated(conc, temp, derivatives=False):
+                        conc = np.asarray(conc, dtype=float)
+                        if conc.size == n_species and np.size(temp) == 1:
+                            try:
+                                return single(conc.ravel().tolist(), np.asarray(temp, dtype=float).item(),
+                                              conc.shape[:-1], derivatives)
+                            except (OverflowError, ZeroDivisionError, ValueError):
+                                pass
+                        conc_shape = conc.shape[:-1]
+                        return batched(np.moveaxis(conc, -1, 0),
+                                       np.broadcast_to(np.asarray(temp, dtype=float), conc_shape),
+                                       conc_shape, derivatives)
+                    
+                    generated.source = "\n".join(header + body)
+                cache[digest] = generated
+                while len(cache) > self.CODEGEN_CACHE_SIZE:
+                    cache.popitem(last=False)
+            network["generated"] = generated
+        return network["generated"]
+    
+    def _kinetics_source(self, network):
+        """
+        Source lines of the generated kinetics function of a network, see _generated_kinetics
         
-        # If optimization didn't improve or only slightly improved the yield,
-        # try a more detailed search around the best test point
-        if optimal_yield <= best_yield * 1.01:  # Within 1% of best test point
-            # Do a finer local search 
-            local_bounds = (max(bounds[0], best_temp - 50), min(bounds[1], best_temp + 50))
-            local_temps = np.linspace(local_bounds[0], local_bounds[1], 20)
-            
-            for temp in local_temps:
-                self.solve_steady_state(temp)
-                yield_value = self.calculate_yield()
-                if yield_value > optimal_yield:
-                    optimal_yield = yield_value
-                    optimal_temp = temp
-            
-            # Try optimization again from this better starting point
-            result = minimize(
-                self.objective_function,
-                x0=[optimal_temp],
-                bounds=[local_bounds],
-                method='L-BFGS-B',
-                options={
-                    'ftol': 1e-10,      # Very stringent function tolerance
-                    'gtol': 1e-8,       # Very stringent gradient tolerance
-                    'maxiter': 200,     # More iterations
-                    'maxfun': 400,      # More function evaluations
-                    'eps': 0.01,        # Smaller step for gradient
-                }
-            )
-            
-            # Use the result if it improved the yield
-            if -result.fun > optimal_yield:
-                optimal_temp = result.x[0]
+        The body only calls where, maximum, minimum, exp, log and stack,
+        which are bound to NumPy or math functions when it is executed.
         
-        # Apply the optimal temperature
-        self.temperature = optimal_temp
-        self.solve_steady_state(optimal_temp)
+        Returns:
+        --------
+        header, body : list of str
+        """
+        R = self.R
+        nu, order = network["nu"], network["order"]
+        n_reactions, n_species = nu.shape
+        temperature_exponent = network["temperature_exponent"]
+        adsorption = network["adsorption"]
+        lines = []
+        defined = set()
         
-        return optimal_temp
-    
-    def calculate_reaction_rates(self, temperature=None):
-        """Calculate reaction rates at current conditions"""
-        if temperature is None:
-            temperature = self.temperature
+        def num(value):
+            value = float(value)
+            return repr(value) if np.isfinite(value) else f"float('{value}')"
         
-        rates = {}
-        for i, reaction in enumerate(self.reactions):
-            rate = self.reaction_rate(self.concentrations, temperature, reaction)
-            rates[f"Reaction {i+1}: {reaction['name']}"] = rate
+        def define(name, expression):
+            # Concentration terms are written once, where they are first needed
+            if name not in defined:
+                defined.add(name)
+                lines.append(f"{name} = {expression}")
+            return name
         
-        return rates
-    
-    def run_simulation(self, optimize_temp=True, temp_bounds=(300, 1000)):
-        """Run a complete simulation with optimization"""
-        # First solve without optimization
-        self.solve_steady_state()
+        def positive(i):
+            return define(f"q{i}", f"where(c{i} > 0, c{i}, 1.0)")
         
-        # Optimize temperature if requested
-        if optimize_temp:
-            optimal_temp = self.optimize_temperature(temp_bounds)
-        else:
-            optimal_temp = self.temperature
+        def inverse(i):
+            # 1 / C for present species, 0 otherwise
+            return define(f"v{i}", f"(c{i} > 0) / {positive(i)}")
         
-        # Final solution at optimal temperature
-        final_concentrations = self.solve_steady_state(optimal_temp)
+        def base(i, power):
+            # Floored like _kinetics: at 1e-10 for negative powers, at 0 otherwise
+            if power < 0:
+                return define(f"n{i}", f"maximum(c{i}, 1e-10)")
+            return define(f"b{i}", f"maximum(c{i}, 0.0)")
         
-        # Calculate product yield
-        product_yield = self.calculate_yield()
+        def inverse_base(i, power):
+            if power < 0:
+                return define(f"w{i}", f"(c{i} > 1e-10) / {base(i, power)}")
+            return inverse(i)
         
-        # Calculate reaction rates
-        reaction_rates = self.calculate_reaction_rates()
+        def product(powers):
+            factors = [base(i, p) if p == 1 else f"{base(i, p)} ** {num(p)}" for i, p in powers]
+            return " * ".join(factors) or "1.0"
         
-        # Calculate conversions
-        conversions = self.calculate_conversion()
+        def clip(expression):
+            return f"minimum(maximum({expression}, -700.0), 700.0)"
         
-        # Calculate recycle stream composition
-        recycle_stream = {comp: conc * self.recycle_ratio 
-                         for comp, conc in final_concentrations.items()}
-
-        # Perform final mass balance check
-        inlet_mass = sum([conc for comp, conc in self.feed_composition.items()])
-        outlet_mass = sum([conc for comp, conc in final_concentrations.items()])
-        mass_balance_error = abs(outlet_mass - inlet_mass) / inlet_mass if inlet_mass > 0 else 0
+        terms = [[] for _ in range(n_reactions)]
+        if adsorption is not None:
+            for t, j in enumerate(adsorption["reaction"]):
+                terms[j].append(t)
         
-        # Calculate elemental balance
-        elemental_balance = self._calculate_elemental_balance(final_concentrations)
+        def term_powers(t):
+            return [(i, p) for i, p in enumerate(adsorption["order"][t]) if p != 0]
         
-        # Prepare results
-        results = {
-            "temperature": optimal_temp,
-            "concentrations": final_concentrations,
-            "recycle_stream": recycle_stream,
-            "yield": product_yield,
-            "reaction_rates": reaction_rates,
-            "conversions": conversions,
-            "residence_time": self.volume / self.flow_rate,
-            "catalyst": self.catalyst,
-            "mass_balance_error": mass_balance_error,
-            "elemental_balance": elemental_balance
-        }
+        # Rates
+        for j in range(n_reactions):
+            reversible = network["reversible"][j]
+            lines.append(f"# Reaction {j}")
+            lines.append(f"e_{j} = {num(-network['Ea'][j] / R)} * inv_T")
+            lines.append(f"a_{j} = exp({clip(f'e_{j}')})"
+                         + (f" * T ** {num(temperature_exponent[j])}"
+                            if temperature_exponent is not None and temperature_exponent[j] else ""))
+            lines.append(f"kr_{j} = {num(network['k0'][j])} * a_{j}")
+            lines.append(f"k_{j} = minimum(kr_{j}, 1e12)")
+            lines.append(f"p_{j} = " + product([(i, p) for i, p in enumerate(order[j]) if p != 0]))
+            factors = [f"k_{j}", f"p_{j}"]
+            if reversible:
+                if network["has_dH"][j]:
+                    lines.append(f"vh_{j} = {num(network['dH'][j] / R)} * ({num(1 / network['T_ref'][j])} - inv_T)")
+                    lines.append(f"Kr_{j} = {num(network['K_eq'][j])} * exp({clip(f'vh_{j}')})")
+                    lines.append(f"K_{j} = maximum(Kr_{j}, 1e-10)")
+                else:
+                    lines.append(f"K_{j} = {num(max(network['K_eq'][j], 1e-10))}")
+                log_Q = " + ".join(f"{num(v)} * log({positive(i)})" for i, v in enumerate(nu[j]) if v != 0)
+                lines.append(f"QK_{j} = exp(minimum({log_Q or '0.0'}, 700.0)) / K_{j}")
+                lines.append(f"d_{j} = 1 - QK_{j}")
+                factors.append(f"d_{j}")
+            if terms[j]:
+                for t in terms[j]:
+                    exponent = clip(f"{num(-adsorption['dH'][t] / R)} * inv_T")
+                    lines.append(f"A_{t} = {num(adsorption['K0'][t])} * exp({exponent}) * {product(term_powers(t))}")
+                lines.append(f"D_{j} = 1 + " + " + ".join(f"A_{t}" for t in terms[j]))
+                lines.append(f"h_{j} = D_{j} ** {num(-adsorption['exponent'][j])}")
+                factors.append(f"h_{j}")
+            lines.append(f"r_{j} = " + " * ".join(factors))
+            if not reversible:
+                lines.append(f"r_{j} = where(r_{j} < 0, 0.0, r_{j})")
+            lines.append(f"R_{j} = where(valid, minimum(r_{j}, 100.0), 0.0)")
+        lines.append(f"rate = stack([{', '.join(f'R_{j}' for j in range(n_reactions))}], shape)")
+        lines.append("if not derivatives:")
+        lines.append("    return rate, None")
         
-        return results
+        # Derivatives, following the chain rule of _kinetics term by term
+        entries = {}
+        for j in range(n_reactions):
+            reversible = network["reversible"][j]
+            driving = f" * d_{j}" if reversible else ""
+            lines.append(f"# Derivatives of reaction {j}")
+            lines.append(f"kp_{j} = k_{j} * p_{j}")
+            lines.append(f"act_{j} = valid & (r_{j} < 100.0)" + ("" if reversible else f" & (r_{j} > 0)"))
+            lines.append(f"kf_{j} = kr_{j} <= 1e12")
+            lines.append(f"ef_{j} = (e_{j} > -700) & (e_{j} < 700) & kf_{j}")
+            if terms[j]:
+                lines.append(f"u_{j} = kp_{j}{driving} * ({num(-adsorption['exponent'][j])} * h_{j} / D_{j})")
+            
+            species = set(np.flatnonzero(order[j]).tolist())
+            if reversible:
+                species |= set(np.flatnonzero(nu[j]).tolist())
+            for t in terms[j]:
+                species |= {i for i, _ in term_powers(t)}
+            for i in sorted(species):
+                inner = []
+                if order[j, i] != 0:
+                    inner.append(f"{num(order[j, i])} * {inverse_base(i, order[j, i])}{driving}")
+                if reversible and nu[j, i] != 0:
+                    inner.append(f"{num(-nu[j, i])} * QK_{j} * {inverse(i)}")
+                derivative = f"kp_{j} * ({' + '.join(inner)})" if inner else ""
+                adsorbed = [f"A_{t} * {num(p)} * {inverse_base(i, p)}"
+                            for t in terms[j] for k, p in term_powers(t) if k == i]
+                if terms[j]:
+                    derivative = " + ".join(([f"({derivative}) * h_{j}"] if derivative else [])
+                                            + ([f"u_{j} * ({' + '.join(adsorbed)})"] if adsorbed else []))
+                lines.append(f"g_{j}_{i} = where(act_{j}, {derivative}, 0.0)")
+                entries[j, i] = f"g_{j}_{i}"
+            
+            temperature = f"where(ef_{j}, k_{j} * {num(network['Ea'][j] / R)} * inv_T ** 2, 0.0)"
+            if temperature_exponent is not None and temperature_exponent[j]:
+                temperature += f" + where(kf_{j}, k_{j} * {num(temperature_exponent[j])} * inv_T, 0.0)"
+            temperature = f"({temperature}) * p_{j}{driving}"
+            if reversible and network["has_dH"][j]:
+                temperature += (f" + kp_{j} * where((vh_{j} > -700) & (vh_{j} < 700) & (Kr_{j} > 1e-10), "
+                                f"QK_{j} * {num(network['dH'][j] / R)} * inv_T ** 2, 0.0)")
+            frequency = f"where(kf_{j}, a_{j} * p_{j}{driving}, 0.0)"
+            activation = f"where(ef_{j}, {num(-1 / R)} * kp_{j}{driving} * inv_T, 0.0)"
+            magnitude = f"kp_{j} * (1 + QK_{j})" if reversible else f"kp_{j}"
+            if terms[j]:
+                heats = " + ".join(f"A_{t} * {num(adsorption['dH'][t] / R)}" for t in terms[j])
+                temperature = f"({temperature}) * h_{j} + u_{j} * ({heats}) * inv_T ** 2"
+                frequency, activation, magnitude = (f"{frequency} * h_{j}", f"{activation} * h_{j}",
+                                                    f"{magnitude} * h_{j}")
+            lines.append(f"dT_{j} = where(act_{j}, {temperature}, 0.0)")
+            lines.append(f"dk0_{j} = where(act_{j}, {frequency}, 0.0)")
+            lines.append(f"dEa_{j} = where(act_{j}, {activation}, 0.0)")
+            lines.append(f"m_{j} = {magnitude}")
         
-    def _calculate_elemental_balance(self, concentrations):
+        lines.append(f"drate_dC = np.zeros(shape + ({n_reactions}, {n_species}))")
+        for (j, i), name in entries.items():
+            lines.append(f"drate_dC[..., {j}, {i}] = {name}")
+        lines.append(f"production = np.zeros(shape + ({n_species}, {n_species}))")
+        for s in range(n_species):
+            for i in range(n_species):
+                contributions = [f"{num(nu[j, s])} * {entries[j, i]}" for j in range(n_reactions)
+                                 if nu[j, s] != 0 and (j, i) in entries]
+                if contributions:
+                    lines.append(f"production[..., {s}, {i}] = " + " + ".join(contributions))
+        
+        def stacked(prefix):
+            return f"stack([{', '.join(f'{prefix}_{j}' for j in range(n_reactions))}], shape)"
+        
+        lines.append("derivs = {")
+        lines.append(f"    \"magnitude\": np.maximum(np.abs(rate), {stacked('m')}),")
+        lines.append("    \"conc\": drate_dC,")
+        lines.append(f"    \"temperature\": {stacked('dT')},")
+        lines.append(f"    \"frequency_factor\": {stacked('dk0')},")
+        lines.append(f"    \"activation_energy\": {stacked('dEa')},")
+        lines.append("    \"production\": production,")
+        lines.append("}")
+        lines.append("return rate, derivs")
+        
+        # Species-major concentrations (n_species, ...) or a list of floats, and the batch shape
+        used = sorted(int(i) for i in {name[1:] for name in defined if name[0] in "qvnbw"})
+        header = ["def kinetics(conc, temp, shape, derivatives=False):"]
+        header += [f"    c{i} = conc[{i}]" for i in used]
+        header += ["    valid = temp > 0",
+                   "    T = where(valid, temp, 1.0)",
+                   "    inv_T = 1 / T"]
+        return header, ["    " + line for line in lines]
+    
+    def _steady_state_residual(self, network, conc, temp, tau, recycle_ratio, feed, k0=None, Ea=None,
+                               derivatives=False, K_eq=None):
+        """
+        Residual of the CSTR balance with recycle and, optionally, its Jacobian
+        
+        F(C) = (1 - R) (C_feed - C) + tau * nu^T r(C, T)
+        
+        Returns the residual, the Jacobian (None unless derivatives) and the
+        rates with their derivatives (None unless derivatives).
         """
-        Perform a simple check on elemental balance
-        This is a simplified version - in reality, you would need molecular formulas
+        rate, derivs = self._kinetics(network, conc, temp, k0, Ea, derivatives, K_eq)
+        tau = np.asarray(tau, dtype=float)[..., None]
+        fresh = 1 - np.asarray(recycle_ratio, dtype=float)[..., None]
+        residual = fresh * (feed - conc) + tau * (rate @ network["nu"])
+        if not derivatives:
+            return residual, None, (rate, None)
+        n_species = conc.shape[-1]
+        production = derivs.get("production")
+        if production is None:
+            production = np.einsum("rs,...rt->...st", network["nu"], derivs["conc"])
+        jacobian = -fresh[..., None] * np.eye(n_species) + tau[..., None] * production
+        return residual, jacobian, (rate, derivs)
+    
+    def _newton_step(self, network, jacobian, residual, sigma, recycle_ratio, conc):
         """
-        # For this simple version, we'll just indicate if output moles > input moles
-        total_input = sum([conc for comp, conc in self.feed_composition.items()])
-        total_output = sum([conc for comp, conc in concentrations.items()])
+        Solve (sigma I - J) dC = F for a batch of steady-state Newton steps
         
-        return {
-            "total_input_conc": total_input,
-            "total_output_conc": total_output,
-            "difference_percent": (total_output - total_input) / total_input * 100 if total_input > 0 else 0
-        }
+        Steady states differ from the feed only within the reaction space
+        range(nu^T); along the conserved moieties (the left null space of
+        the stoichiometric matrix) the Jacobian is -(1 - R) I. The step is
+        therefore split into that explicit component and a reduced system
+        of the size of the stoichiometric rank instead of n_species.
+        Mixing species into reduced coordinates costs absolute precision
+        on trace species, so points with concentrations spanning more than
+        eight orders of magnitude are solved in the full space.
+        """
+        basis, _ = self._reaction_space(network)
+        rank = basis.shape[1]
+        full = (conc < 1e-8 * conc.max(axis=1, keepdims=True)).any(axis=1)
+        if rank == conc.shape[1]:
+            full[:] = True
+        step = np.empty_like(residual)
+        
+        rows = np.flatnonzero(full)
+        if rows.size:
+            system = sigma[rows, None, None] * np.eye(conc.shape[1]) - jacobian[rows]
+            try:
+                step[rows] = np.linalg.solve(system, residual[rows, :, None])[..., 0]
+            except np.linalg.LinAlgError:
+                step[rows] = (np.linalg.pinv(system) @ residual[rows, :, None])[..., 0]
+        
+        rows = np.flatnonzero(~full)
+        if rows.size:
+            shift = (sigma[rows] + 1 - recycle_ratio[rows])[:, None]
+            normal = residual[rows] - (residual[rows] @ basis) @ basis.T
+            normal_step = np.divide(normal, shift, out=np.zeros_like(normal), where=shift > 0)
+            projected = basis.T @ jacobian[rows]
+            system = sigma[rows, None, None] * np.eye(rank) - projected @ basis
+            rhs = residual[rows] @ basis + (projected @ normal_step[..., None])[..., 0]
+            try:
+                reduced = np.linalg.solve(system, rhs[..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                reduced = (np.linalg.pinv(system) @ rhs[..., None])[..., 0]
+            step[rows] = normal_step + reduced @ basis.T
+        return step
     
-    def print_results(self, results=None):
-        """Print simulation results in a formatted way"""
-        if results is None:
-            results = self.run_simulation()
+    def _solve_steady_state_arrays(self, network, temp, tau, recycle_ratio, feed, initial=None,
+                                   k0=None, Ea=None, tol=1e-10, max_iterations=100, K_eq=None,
+                                   continuation=True, deadline=None):
+        """
+        Solve the steady-state balance for a batch of operating points
         
-        print("\n===== CSTR SIMULATION RESULTS =====")
-        print(f"Optimal Temperature: {results['temperature']:.2f} K")
-        print(f"Product Yield: {results['yield']*100:.2f}%")
+        Uses Newton's method globalized by pseudo-transient continuation:
+        each step solves (sigma I - J) dC = F, where sigma acts as an inverse
+        time step of the dynamic balance. Sigma is zero (pure Newton) after
+        every step that reduces the residual and grows tenfold after each
+        rejected step, which keeps stiff reversible kinetics stable. A
+        fraction-to-boundary rule keeps all concentrations non-negative.
+        All inputs are broadcast to a common batch shape.
         
-        if results.get('catalyst'):
-            print(f"Catalyst: {results['catalyst']}")
-        else:
-            print("Catalyst: None")
+        When a deadline (a time.perf_counter() value) is given, iterations
+        stop once it has passed. Accepted steps never increase the residual
+        norm and retries only replace an iterate when they converge or lower
+        its residual, so unconverged points then hold their best iterate so
+        far (not, e.g., a continuation step at a shorter residence time).
         
-        print("\nSteady State Concentrations (mol/m³):")
-        for component, conc in results["concentrations"].items():
-            if component == self.target_product:
-                print(f"  {component}: {conc:.4f} (TARGET PRODUCT)")
-            else:
-                print(f"  {component}: {conc:.4f}")
+        Returns:
+        --------
+        conc : ndarray
+            Steady-state concentrations with shape (batch, n_species)
+        converged : ndarray
+            Boolean convergence flag for each operating point
+        """
+        feed = np.atleast_2d(np.asarray(feed, dtype=float))
+        batch = np.broadcast_shapes(np.shape(temp), np.shape(tau), np.shape(recycle_ratio), feed.shape[:-1],
+                                    *(np.shape(value)[:-1] for value in (k0, Ea, K_eq) if value is not None))
+        n_species = feed.shape[-1]
+        temp = np.broadcast_to(np.asarray(temp, dtype=float), batch).reshape(-1)
+        tau = np.broadcast_to(np.asarray(tau, dtype=float), batch).reshape(-1)
+        recycle_ratio = np.broadcast_to(np.asarray(recycle_ratio, dtype=float), batch).reshape(-1)
+        feed = np.broadcast_to(feed, batch + (n_species,)).reshape(-1, n_species)
+        n_points = feed.shape[0]
+        if network.get("sparse") and k0 is None and Ea is None and K_eq is None:
+            return self._solve_steady_state_sparse(network, temp, tau, recycle_ratio, feed, initial, tol,
+                                                   max_iterations, deadline)
+        if k0 is not None:
+            k0 = np.broadcast_to(np.asarray(k0, dtype=float), batch + (len(network["k0"]),)).reshape(n_points, -1)
+        if Ea is not None:
+            Ea = np.broadcast_to(np.asarray(Ea, dtype=float), batch + (len(network["Ea"]),)).reshape(n_points, -1)
+        if K_eq is not None:
+            K_eq = np.broadcast_to(np.asarray(K_eq, dtype=float), batch + (len(network["K_eq"]),)).reshape(n_points, -1)
         
-        print("\nRecycle Stream Concentrations (mol/m³):")
-        for component, conc in results["recycle_stream"].items():
-            print(f"  {component}: {conc:.4f}")
+        scale = 1.0 + feed.max(axis=1)
+        warm_start = initial is not None
+        if not warm_start:
+            initial = feed
+        else:
+            # Steady states satisfy C - C_feed in range(nu^T), so a warm start
+            # from another operating point is projected onto the invariants of this feed
+            _, moieties = self._reaction_space(network)
+            shift = np.asarray(initial, dtype=float) - feed
+            initial = feed + shift - (shift @ moieties.T) @ moieties
+        # Start from a strictly positive point: reaction_rate drops absent
+        # products from the reaction quotient, so exact zeros are singular
+        conc = np.maximum(np.broadcast_to(initial, feed.shape), 1e-8 * scale[:, None])
         
-        print("\nFresh Feed Concentrations (mol/m³):")
-        for component, conc in self.feed_composition.items():
-            print(f"  {component}: {conc:.4f}")
+        def subset(value, rows):
+            return None if value is None else value[rows]
         
-        print(f"\nExit Flow Rate: {self.flow_rate:.4f} m³/s")
-        print(f"Residence Time: {results['residence_time']:.2f} s")
+        def evaluate(rows, C, derivatives=False):
+            residual, jacobian, terms = self._steady_state_residual(
+                network, C, temp[rows], tau[rows], recycle_ratio[rows], feed[rows],
+                subset(k0, rows), subset(Ea, rows), derivatives, subset(K_eq, rows))
+            norm = np.abs(residual).max(axis=1) / scale[rows]
+            if not derivatives:
+                return residual, norm
+            # Residuals below the round-off level of the balance terms count as
+            # converged, which matters for stiff reversible reactions at equilibrium
+            magnitude = terms[1]["magnitude"] @ np.abs(network["nu"])
+            noise = 1e4 * np.finfo(float).eps * (
+                (1 - recycle_ratio[rows])[:, None] * (feed[rows] + C) + tau[rows, None] * magnitude)
+            done = (np.abs(residual) <= tol * scale[rows, None] + noise).all(axis=1)
+            return residual, norm, jacobian, done
         
-        print("\nReaction Rates (mol/m³·s):")
-        for name, rate in results["reaction_rates"].items():
-            print(f"  {name}: {rate:.6f}")
+        sigma = np.zeros(n_points)
+        converged = np.zeros(n_points, dtype=bool)
+        active = np.arange(n_points)
+        residual, norm, jacobian, done = evaluate(active, conc, derivatives=True)
         
-        print("\nReactant Conversions:")
-        for component, conversion in results["conversions"].items():
-            if component in self.feed_composition:
-                print(f"  {component}: {conversion*100:.2f}%")
+        for iteration in range(max_iterations):
+            converged[active[done]] = True
+            keep = ~done
+            active, residual, norm, jacobian = active[keep], residual[keep], norm[keep], jacobian[keep]
+            if active.size == 0 or (deadline is not None and time.perf_counter() > deadline):
+                break
+            C = conc[active]
+            
+            step = self._newton_step(network, jacobian, residual, sigma[active], recycle_ratio[active], C)
+            
+            # Fraction-to-boundary rule keeps concentrations non-negative
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where(step < 0, -0.8 * C / step, np.inf)
+            alpha = np.minimum(1.0, ratio.min(axis=1))
+            
+            # Backtracking line search on the scaled residual norm
+            accepted = np.zeros(active.size, dtype=bool)
+            trial = C.copy()
+            for _ in range(30):
+                pending = np.flatnonzero(~accepted)
+                if pending.size == 0 or (deadline is not None and time.perf_counter() > deadline):
+                    break
+                candidate = np.maximum(C[pending] + alpha[pending, None] * step[pending], 1e-200)
+                _, candidate_norm = evaluate(active[pending], candidate)
+                improved = candidate_norm <= norm[pending]
+                trial[pending[improved]] = candidate[improved]
+                accepted[pending[improved]] = True
+                alpha[pending[~improved]] *= 0.5
+            
+            # Accepted steps return to Newton, rejected steps shorten the pseudo time step
+            sigma[active] = np.where(accepted, 0.0, np.maximum(10 * sigma[active], 1.0))
+            moved = np.flatnonzero(accepted)
+            conc[active[moved]] = trial[moved]
+            done = np.zeros(active.size, dtype=bool)
+            residual[moved], norm[moved], jacobian[moved], done[moved] = evaluate(
+                active[moved], trial[moved], derivatives=True)
+        else:
+            converged[active[done]] = True
+        if deadline is not None and time.perf_counter() > deadline:
+            return conc, converged
         
-        # Print mass balance information
-        if "mass_balance_error" in results:
-            print(f"\nMass Balance Error: {results['mass_balance_error']*100:.4f}%")
+        def keep_better(rows, candidate, candidate_converged):
+            # Retries cut short by the deadline may end on a worse iterate
+            _, current_norm = evaluate(rows, conc[rows])
+            _, candidate_norm = evaluate(rows, candidate)
+            better = candidate_converged | (candidate_norm < current_norm)
+            conc[rows[better]] = candidate[better]
+            converged[rows[better]] = candidate_converged[better]
         
-        if "elemental_balance" in results:
-            eb = results["elemental_balance"]
-            print("\nMass Balance Check:")
-            print(f"  Total Input Concentration: {eb['total_input_conc']:.4f} mol/m³")
-            print(f"  Total Output Concentration: {eb['total_output_conc']:.4f} mol/m³")
-            print(f"  Difference: {eb['difference_percent']:.4f}%")
+        # Operating points that failed from the warm start are retried from the feed
+        retry = np.flatnonzero(~converged)
+        if warm_start and retry.size:
+            keep_better(retry, *self._solve_steady_state_arrays(
+                network, temp[retry], tau[retry], recycle_ratio[retry], feed[retry], None,
+                subset(k0, retry), subset(Ea, retry), tol, max_iterations, subset(K_eq, retry), False,
+                deadline))
         
-        print("\n==================================")
+        # Remaining failures are continued in the residence time, starting
+        # close to the feed where Newton cannot stall at a zero concentration
+        retry = np.flatnonzero(~converged)
+        if continuation and retry.size:
+            path = None
+            for fraction in np.geomspace(1e-4, 1.0, 9):
+                path, path_converged = self._solve_steady_state_arrays(
+                    network, temp[retry], fraction * tau[retry], recycle_ratio[retry], feed[retry], path,
+                    subset(k0, retry), subset(Ea, retry), tol, max_iterations, subset(K_eq, retry), False,
+                    deadline)
+            keep_better(retry, path, path_converged)
         
-        return results
+        return conc, converged
     
-    def create_visualization(self, results=None):
-        """Create visualization of simulation results"""
-        if results is None:
-            results = self.run_simulation()
+    def _sparse_kinetics(self, network, conc, temp, derivatives=False):
+        """
+        Sparse counterpart of _kinetics for a single operating point
         
-        fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+        Concentration terms are only evaluated on the (reaction, species)
+        pairs of the rate laws, so the cost grows with the nonzeros of the
+        mechanism. Safeguards and derivatives match _kinetics.
         
-        # 1. Plot steady state concentrations
-        components = list(results["concentrations"].keys())
-        concentrations = [results["concentrations"][comp] for comp in components]
+        Returns:
+        --------
+        rates : ndarray
+            Reaction rates, shape (n_reactions,)
+        drate_dC : csr_matrix or None
+            Derivatives of the rates with respect to the concentrations
+        magnitude : ndarray or None
+            Size of the rate terms, which sets the round-off level of the residual
+        """
+        n_reactions, n_species = network["nu_sparse"].shape
+        reversible = network["reversible"]
+        valid_temp = temp > 0
+        safe_temp = temp if valid_temp else 1.0
+        exp_term = -network["Ea"] / (self.R * safe_temp)
+        k = network["k0"] * np.exp(np.clip(exp_term, -700, 700))
+        if network["temperature_exponent"] is not None:
+            k = k * safe_temp ** network["temperature_exponent"]
+        k = np.minimum(k, 1e12)
         
-        bar_colors = ['#1f77b4' if comp != self.target_product else '#ff7f0e' 
-                      for comp in components]
+        rows, cols, order = network["pattern_rows"], network["pattern_cols"], network["pattern_order"]
+        base = np.where(order < 0, np.maximum(conc[cols], 1e-10), np.maximum(conc[cols], 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_terms = np.where(order != 0, order * np.log(base), 0.0)
+        power = np.exp(np.bincount(rows, log_terms, minlength=n_reactions))
         
-        axes[0, 0].bar(components, concentrations, color=bar_colors)
-        axes[0, 0].set_ylabel('Concentration (mol/m³)')
-        axes[0, 0].set_title('Steady State Concentrations')
-        axes[0, 0].grid(axis='y', linestyle='--', alpha=0.7)
+        vant_hoff = np.where(network["has_dH"], network["dH"] / self.R * (1 / network["T_ref"] - 1 / safe_temp), 0.0)
+        K_eq = np.maximum(network["K_eq"] * np.exp(np.clip(vant_hoff, -700, 700)), 1e-10)
+        present = conc > 0
+        log_conc = np.where(present, np.log(np.where(present, conc, 1.0)), 0.0)
+        Q = np.exp(np.minimum(network["nu_sparse"] @ log_conc, 700))
+        driving = np.where(reversible, 1 - Q / K_eq, 1.0)
         
-        for i, v in enumerate(concentrations):
-            axes[0, 0].text(i, v + 0.05*max(concentrations), f"{v:.3f}", ha='center')
+        adsorption = network["adsorption"]
+        inhibition = 1.0
+        if adsorption is not None:
+            term_rows, term_cols, term_power = (adsorption["term_rows"], adsorption["term_cols"],
+                                                adsorption["term_power"])
+            ads_base = np.where(term_power < 0, np.maximum(conc[term_cols], 1e-10), np.maximum(conc[term_cols], 0.0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                log_terms = term_power * np.log(ads_base)
+            K_ads = adsorption["K0"] * np.exp(np.clip(-adsorption["dH"] / (self.R * safe_temp), -700, 700))
+            term = K_ads * np.exp(np.bincount(term_rows, log_terms, minlength=len(K_ads)))
+            denominator = 1 + np.bincount(adsorption["reaction"], term, minlength=n_reactions)
+            inhibition = denominator ** -adsorption["exponent"]
         
-        # 2. Plot temperature effect on yield
-        if self.target_product:
-            # Calculate yield at different temperatures
-            temps = np.linspace(max(300, results['temperature']-200), 
-                               min(1200, results['temperature']+200), 15)
-            yields = []
+        rate = k * power * driving * inhibition
+        rate = np.where(~reversible & (rate < 0), 0.0, rate)
+        uncapped = valid_temp & (rate < 100.0)
+        rate = np.minimum(rate, 100.0) if valid_temp else np.zeros(n_reactions)
+        if not derivatives:
+            return rate, None, None
+        
+        floored = base > np.where(order < 0, 1e-10, 0.0)
+        inv_base = np.where(floored, 1 / np.where(floored, base, 1.0), 0.0)
+        inv_present = np.where(present, 1 / np.where(present, conc, 1.0), 0.0)
+        with np.errstate(over="ignore", invalid="ignore"):
+            ddriving_dC = np.where(reversible[rows], -(Q / K_eq)[rows] * network["pattern_nu"] * inv_present[cols], 0.0)
+        values = (k * power * inhibition)[rows] * (order * inv_base * driving[rows] + ddriving_dC)
+        if adsorption is not None:
+            # Entries of the Hougen-Watson denominator, summed with the others by the CSR constructor
+            ads_floored = ads_base > np.where(term_power < 0, 1e-10, 0.0)
+            ads_inv_base = np.where(ads_floored, 1 / np.where(ads_floored, ads_base, 1.0), 0.0)
+            factor = -adsorption["exponent"] * inhibition / denominator * k * power * driving
+            ads_rows = adsorption["reaction"][term_rows]
+            rows = np.concatenate([rows, ads_rows])
+            cols = np.concatenate([cols, term_cols])
+            values = np.concatenate([values, factor[ads_rows] * term[term_rows] * term_power * ads_inv_base])
+        active = uncapped & (reversible | (rate > 0))
+        drate_dC = sparse.csr_matrix((np.where(active[rows], values, 0.0), (rows, cols)),
+                                     shape=(n_reactions, n_species))
+        magnitude = np.maximum(np.abs(rate), k * power * inhibition * np.where(reversible, 1 + Q / K_eq, 1.0))
+        return rate, drate_dC, magnitude
+    
+    def _solve_steady_state_sparse(self, network, temp, tau, recycle_ratio, feed, initial=None, tol=1e-10,
+                                   max_iterations=100, deadline=None):
+        """
+        Sparse counterpart of _solve_steady_state_arrays for large mechanisms
+        
+        Each operating point is solved on its own with the same globalized
+        Newton iteration, but the Jacobian J = -(1 - R) I + tau nu^T dr/dC is
+        assembled as a sparse matrix and (sigma I - J) is factorized with a
+        sparse LU, so memory and time grow with the nonzeros of the
+        mechanism instead of n_species². Warm starts are not projected on
+        the invariants of the feed (the converged residual restores them),
+        which avoids the dense reaction-space basis. Points that fail from a
+        warm start are retried from the feed and then by continuation in the
+        residence time, keeping the best iterate as in the dense solver.
+        Inputs are flat arrays of length n_points.
+        """
+        n_points, n_species = feed.shape
+        identity = sparse.identity(n_species, format="csr")
+        nu_T, abs_nu_T = network["nu_T"], network["abs_nu_T"]
+        if initial is not None:
+            initial = np.broadcast_to(np.asarray(initial, dtype=float), feed.shape)
+        
+        def newton(T, tau, R, f, C):
+            scale = 1.0 + f.max()
+            C = np.maximum(C, 1e-8 * scale)
             
-            for temp in temps:
-                self.solve_steady_state(temp)
-                yields.append(self.calculate_yield())
+            def evaluate(C, derivatives=False):
+                rate, drate_dC, magnitude = self._sparse_kinetics(network, C, T, derivatives)
+                return (1 - R) * (f - C) + tau * (nu_T @ rate), drate_dC, magnitude
             
-            # Reset to original results
-            self.solve_steady_state(results['temperature'])
+            def done(F, C, magnitude):
+                noise = 1e4 * np.finfo(float).eps * ((1 - R) * (f + C) + tau * (abs_nu_T @ magnitude))
+                return (np.abs(F) <= tol * scale + noise).all()
             
-            axes[0, 1].plot(temps, yields, 'b-')
-            axes[0, 1].scatter([results['temperature']], [results['yield']], 
-                             color='red', s=100)
-            axes[0, 1].set_xlabel('Temperature (K)')
-            axes[0, 1].set_ylabel('Product Yield')
-            axes[0, 1].set_title('Temperature Effect on Yield')
-            axes[0, 1].grid(True, linestyle='--', alpha=0.7)
-            axes[0, 1].text(results['temperature'], results['yield'], 
-                          f"Optimal: {results['temperature']:.1f}K", 
-                          ha='right', va='bottom')
+            F, drate_dC, magnitude = evaluate(C, derivatives=True)
+            norm = np.abs(F).max() / scale
+            sigma = 0.0
+            for iteration in range(max_iterations):
+                if done(F, C, magnitude):
+                    return C, True
+                if deadline is not None and time.perf_counter() > deadline:
+                    return C, False
+                system = ((sigma + 1 - R) * identity - tau * (nu_T @ drate_dC)).tocsc()
+                try:
+                    step = splu(system).solve(F)
+                except RuntimeError:
+                    sigma = max(10 * sigma, 1.0)
+                    continue
+                
+                # Fraction-to-boundary rule, with species below the residual
+                # tolerance damped one by one as in ReactorTrain
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    ratio = np.where((step < 0) & (C > tol * scale), -0.8 * C / step, np.inf)
+                alpha = min(1.0, ratio.min())
+                accepted = False
+                for _ in range(30):
+                    candidate = np.maximum(C + alpha * step, 0.2 * C)
+                    if np.abs(evaluate(candidate)[0]).max() / scale <= norm:
+                        accepted = True
+                        break
+                    alpha *= 0.5
+                if not accepted:
+                    sigma = max(10 * sigma, 1.0)
+                    continue
+                C, sigma = candidate, 0.0
+                F, drate_dC, magnitude = evaluate(C, derivatives=True)
+                norm = np.abs(F).max() / scale
+            return C, done(F, C, magnitude)
         
-        # 3. Plot feed, recycle, and product composition
-        comp_list = components
-        x = np.arange(len(comp_list))
-        width = 0.25
+        def residual_norm(i, C):
+            rate, _, _ = self._sparse_kinetics(network, C, temp[i])
+            return np.abs((1 - recycle_ratio[i]) * (feed[i] - C) + tau[i] * (nu_T @ rate)).max()
         
-        feed_values = [self.feed_composition.get(comp, 0) for comp in comp_list]
-        recycle_values = [results["recycle_stream"].get(comp, 0) for comp in comp_list]
-        outlet_values = [results["concentrations"].get(comp, 0) for comp in comp_list]
+        def keep_better(i, candidate, candidate_converged):
+            # Retries cut short by the deadline may end on a worse iterate
+            if candidate_converged or residual_norm(i, candidate) < residual_norm(i, conc[i]):
+                conc[i], converged[i] = candidate, candidate_converged
         
-        axes[1, 0].bar(x - width, feed_values, width=width, label='Fresh Feed')
-        axes[1, 0].bar(x, recycle_values, width=width, label='Recycle')
-        axes[1, 0].bar(x + width, outlet_values, width=width, label='Outlet')
+        conc = feed.copy()
+        converged = np.zeros(n_points, dtype=bool)
+        for i in range(n_points):
+            arguments = (temp[i], tau[i], recycle_ratio[i], feed[i])
+            if initial is not None:
+                conc[i], converged[i] = newton(*arguments, initial[i])
+            if not converged[i] and (deadline is None or time.perf_counter() <= deadline):
+                keep_better(i, *newton(*arguments, feed[i]))
+            if not converged[i] and (deadline is None or time.perf_counter() <= deadline):
+                path = feed[i]
+                for fraction in np.geomspace(1e-4, 1.0, 9):
+                    path, path_converged = newton(temp[i], fraction * tau[i], recycle_ratio[i], feed[i], path)
+                keep_better(i, path, path_converged)
+        return conc, converged
+    
+    def solve_steady_state(self, temperature=None):
+        """
+        Solve for steady-state concentrations at the given temperature
         
-        axes[1, 0].set_xlabel('Components')
-        axes[1, 0].set_ylabel('Concentration (mol/m³)')
-        axes[1, 0].set_title('Feed vs Recycle vs Outlet Composition')
-        axes[1, 0].set_xticks(x)
-        axes[1, 0].set_xticklabels(comp_list)
-        axes[1, 0].legend()
-        axes[1, 0].grid(axis='y', linestyle='--', alpha=0.7)
+        The balance with recycle, (1 - R)(C_feed - C) + tau * nu^T r(C, T) = 0,
+        is solved simultaneously for all components with a damped Newton
+        method, so the result is an exact root of the steady-state residual.
+        """
+        if temperature is None:
+            temperature = self.temperature
         
-        # 4. Plot conversions
-        if results["conversions"]:
-            components = []
-            conv_values = []
-            
-            for comp, conv in results["conversions"].items():
-                if comp in self.feed_composition and self.feed_composition[comp] > 0:
-                    components.append(comp)
-                    conv_values.append(conv * 100)  # Convert to percentage
-            
-            if components:
-                axes[1, 1].bar(components, conv_values, color='#2ca02c')
-                axes[1, 1].set_ylabel('Conversion (%)')
-                axes[1, 1].set_title('Reactant Conversion')
-                axes[1, 1].grid(axis='y', linestyle='--', alpha=0.7)
-                
-                for i, v in enumerate(conv_values):
-                    axes[1, 1].text(i, v + 1, f"{v:.1f}%", ha='center')
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        tau = self.volume / self.flow_rate  # residence time
         
-        plt.tight_layout()
+        conc, converged = self._solve_steady_state_arrays(
+            network, temperature, tau, self.recycle_ratio, feed)
+        self.converged = bool(converged[0])
         
-        return fig, axes
-
-
+        self.concentrations = {comp: float(conc[0, i]) for i, comp in enumerate(network["species"])}
+        return self.concentrations
+    
+    def set_jacket(self, heat_transfer_coefficient, coolant_temperature, feed_temperature=None,
+                   heat_capacity=None):
+        """
+        Set the cooling jacket used by the non-isothermal model
+        
+        Parameters:
+        -----------
+        heat_transfer_coefficient : float
+            Jacket heat transfer coefficient times area, UA, in W/K
+        coolant_temperature : float
+            Coolant temperature in K
+        feed_temperature : float, optional
+            Feed temperature in K (defaults to the current reactor temperature)
+        heat_capacity : float, optional
+            Volumetric heat capacity of the reacting mixture, rho * cp, in
+            J/(m³·K). Defaults to 35 J/(mol·K) times the total feed
+            concentration, i.e. a gas-phase mixture.
+        """
+        if feed_temperature is None:
+            feed_temperature = self.temperature
+        if heat_capacity is None:
+            heat_capacity = 35.0 * sum(self.feed_composition.values())
+        self.jacket = {
+            "heat_transfer_coefficient": heat_transfer_coefficient,
+            "coolant_temperature": coolant_temperature,
+            "feed_temperature": feed_temperature,
+            "heat_capacity": heat_capacity,
+        }
+    
+    def _heat_balance(self, network, conc, temp, tau, recycle_ratio, feed, feed_temp, coolant_temp, cooling,
+                      heat_capacity):
+        """
+        Energy balance residual along the isothermal steady states and its total temperature derivative
+        
+        E(T) = (1 - R)(T_feed - T) + tau / (rho cp) * (sum_j (-dH_j) r_j - UA / V (T - T_coolant)),
+        evaluated at the steady state C(T) of the species balances, with
+        cooling = UA / V and heat_capacity = rho cp. The derivative includes
+        dC/dT from the implicit function theorem, so Newton on E(T) is
+        Newton on the coupled species and energy system with the species
+        eliminated.
+        
+        Returns:
+        --------
+        energy, denergy_dT : ndarray
+            Residual in K and its derivative, shape (batch,)
+        generation, dgeneration_dT : tuple of ndarray
+            Heat generation term tau / (rho cp) * sum_j (-dH_j) r_j in K and
+            its total temperature derivative
+        """
+        _, jacobian, (rate, derivs) = self._steady_state_residual(network, conc, temp, tau, recycle_ratio, feed,
+                                                                  derivatives=True)
+        release = -network["dH"]
+        factor = tau / heat_capacity
+        fresh = 1 - recycle_ratio
+        generation = factor * (rate @ release)
+        energy = fresh * (feed_temp - temp) + generation - factor * cooling * (temp - coolant_temp)
+        
+        dF_dT = tau[:, None] * (derivs["temperature"] @ network["nu"])
+        try:
+            dC_dT = -np.linalg.solve(jacobian, dF_dT[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            dC_dT = -(np.linalg.pinv(jacobian) @ dF_dT[..., None])[..., 0]
+        dgeneration_dT = factor * (derivs["temperature"] @ release
+                                   + np.einsum("r,...rs,...s->...", release, derivs["conc"], dC_dT))
+        denergy_dT = -fresh + dgeneration_dT - factor * cooling
+        return energy, denergy_dT, (generation, dgeneration_dT)
+    
+    def _solve_energy_balance_arrays(self, network, coolant_temp, tau, recycle_ratio, feed, feed_temp, cooling,
+                                     heat_capacity, initial_temp=None, tol=1e-10, max_iterations=100):
+        """
+        Solve the coupled species and energy balances for a batch of operating points
+        
+        The species balances are solved at each trial temperature by the
+        batched isothermal solver (warm-started from the previous trial),
+        and the energy balance E(T) = 0 by safeguarded Newton with the exact
+        total derivative from _heat_balance. Starting from initial_temp,
+        the iterates march in steps of at most 3 % towards the sign of the
+        energy imbalance until a sign change brackets a steady state; from
+        then on Newton steps leaving the bracket are replaced by bisection.
+        When several steady states exist, this finds the one next to the
+        starting temperature (the default is the warmer of feed and
+        coolant). All inputs are broadcast to a common batch shape.
+        
+        Returns:
+        --------
+        conc : ndarray
+            Steady-state concentrations with shape (batch, n_species)
+        temp : ndarray
+            Steady-state reactor temperatures, shape (batch,)
+        converged : ndarray
+            Boolean convergence flag for each operating point
+        """
+        feed = np.atleast_2d(np.asarray(feed, dtype=float))
+        if initial_temp is None:
+            initial_temp = np.maximum(feed_temp, coolant_temp)
+        batch = np.broadcast_shapes(np.shape(coolant_temp), np.shape(tau), np.shape(recycle_ratio),
+                                    feed.shape[:-1], np.shape(feed_temp), np.shape(cooling),
+                                    np.shape(heat_capacity), np.shape(initial_temp))
+        n_species = feed.shape[-1]
+        
+        def flat(value):
+            return np.broadcast_to(np.asarray(value, dtype=float), batch).reshape(-1)
+        
+        coolant_temp, tau, recycle_ratio = flat(coolant_temp), flat(tau), flat(recycle_ratio)
+        feed_temp, cooling, heat_capacity = flat(feed_temp), flat(cooling), flat(heat_capacity)
+        feed = np.broadcast_to(feed, batch + (n_species,)).reshape(-1, n_species)
+        
+        def evaluate(rows, T, initial=None):
+            C, converged = self._solve_steady_state_arrays(network, T, tau[rows], recycle_ratio[rows], feed[rows],
+                                                           initial=initial)
+            energy, slope, _ = self._heat_balance(network, C, T, tau[rows], recycle_ratio[rows], feed[rows],
+                                                  feed_temp[rows], coolant_temp[rows], cooling[rows],
+                                                  heat_capacity[rows])
+            return C, converged, energy, slope
+        
+        temp = flat(initial_temp).copy()
+        lower = np.full(temp.shape, -np.inf)
+        upper = np.full(temp.shape, np.inf)
+        converged = np.zeros(temp.shape, dtype=bool)
+        conc = np.zeros_like(feed)
+        active = np.arange(temp.size)
+        initial = None
+        for iteration in range(max_iterations):
+            conc[active], species_converged, energy, slope = evaluate(active, temp[active], initial)
+            settled = np.abs(energy) <= tol * np.maximum(feed_temp[active], coolant_temp[active])
+            settled |= upper[active] - lower[active] <= 4 * np.finfo(float).eps * temp[active]
+            converged[active] = settled & species_converged
+            lower[active] = np.where(energy > 0, np.maximum(lower[active], temp[active]), lower[active])
+            upper[active] = np.where(energy < 0, np.minimum(upper[active], temp[active]), upper[active])
+            active, energy, slope = active[~settled], energy[~settled], slope[~settled]
+            if active.size == 0:
+                break
+            T = temp[active]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                newton = T - energy / slope
+            # Until a sign change brackets a root, march towards it in limited steps
+            march = T + np.sign(energy) * 0.03 * T
+            uphill = (newton - T) * energy > 0
+            march = np.where(uphill & (np.abs(newton - T) < 0.03 * T), newton, march)
+            bracketed = np.isfinite(lower[active]) & np.isfinite(upper[active])
+            inside = (newton > lower[active]) & (newton < upper[active])
+            temp[active] = np.where(bracketed, np.where(inside, newton, 0.5 * (lower[active] + upper[active])),
+                                    march)
+            initial = conc[active]
+        
+        return conc, temp, converged
+    
+    def solve_nonisothermal(self, coolant_temperature=None, initial_temperature=None):
+        """
+        Solve the coupled species and energy balances of the jacketed reactor
+        
+        Uses the jacket set with set_jacket. The reactor temperature becomes
+        an unknown: heat released by the reactions (heat_of_reaction, J/mol
+        of reaction as written) is removed by the through-flow and the
+        jacket. The solution updates temperature, concentrations and the
+        convergence flag of the simulator.
+        
+        Parameters:
+        -----------
+        coolant_temperature : float, optional
+            Overrides the jacket coolant temperature in K
+        initial_temperature : float, optional
+            Starting temperature in K, which selects the steady state when
+            several exist (defaults to the warmer of feed and coolant)
+        
+        Returns:
+        --------
+        dict
+            "temperature" in K, "concentrations" and "converged"
+        """
+        jacket = self.jacket
+        if coolant_temperature is None:
+            coolant_temperature = jacket["coolant_temperature"]
+        network = self._compile_network()
+        conc, temp, converged = self._solve_energy_balance_arrays(
+            network, coolant_temperature, self.volume / self.flow_rate, self.recycle_ratio,
+            self._feed_vector(network), jacket["feed_temperature"],
+            jacket["heat_transfer_coefficient"] / self.volume, jacket["heat_capacity"], initial_temperature)
+        
+        self.temperature = float(temp[0])
+        self.converged = bool(converged[0])
+        self.concentrations = {comp: float(conc[0, i]) for i, comp in enumerate(network["species"])}
+        return {"temperature": self.temperature, "concentrations": self.concentrations,
+                "converged": self.converged}
+    
+    def coolant_sweep(self, coolant_temperatures, initial_temperature=None):
+        """
+        Non-isothermal steady states over a range of coolant temperatures
+        
+        All coolant temperatures are solved in one batched Newton solve
+        (see solve_nonisothermal); the simulator state is not changed.
+        
+        Parameters:
+        -----------
+        coolant_temperatures : array_like
+            Coolant temperatures in K
+        initial_temperature : float or array_like, optional
+            Starting temperatures, e.g. a high value to follow the ignited branch
+        
+        Returns:
+        --------
+        DataFrame
+            "coolant_temperature", reactor "temperature", the concentration
+            of each species, "yield" and "converged"
+        """
+        jacket = self.jacket
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        coolant_temperatures = np.asarray(coolant_temperatures, dtype=float).reshape(-1)
+        if initial_temperature is not None:
+            initial_temperature = np.broadcast_to(np.asarray(initial_temperature, dtype=float),
+                                                  coolant_temperatures.shape)
+        conc, temp, converged = self._solve_energy_balance_arrays(
+            network, coolant_temperatures, self.volume / self.flow_rate, self.recycle_ratio, feed,
+            jacket["feed_temperature"], jacket["heat_transfer_coefficient"] / self.volume,
+            jacket["heat_capacity"], initial_temperature)
+        yields, _, _ = self._yield_array(network, conc, feed, self.recycle_ratio)
+        
+        results = pd.DataFrame(conc, columns=network["species"])
+        results.insert(0, "temperature", temp)
+        results.insert(0, "coolant_temperature", coolant_temperatures)
+        results["yield"] = yields
+        results["converged"] = converged
+        return results
+    
+    def heat_balance_curves(self, coolant_temperatures=None, feed_scales=1.0, temp_bounds=(300, 1000),
+                            n_temperatures=501, polish_iterations=4):
+        """
+        Heat generation and removal curves for runaway screening
+        
+        Along the isothermal steady states, heat generation
+        G(T) = tau / (rho cp) * sum_j (-dH_j) r_j and heat removal
+        Q(T) = (1 - R)(T - T_feed) + tau UA / (V rho cp) (T - T_coolant),
+        both in K, are evaluated on a temperature grid for every scenario in
+        one batched solve (the generation curve only depends on the feed,
+        so it is solved once per feed scale). Their intersections are the
+        steady states of the jacketed reactor (see solve_nonisothermal); an
+        intersection is stable when Q rises faster than G. Tangency points
+        of G - s T, with s = dQ/dT, give the ignition and extinction
+        temperatures, and the coolant temperatures at which the low branch
+        ignites or the high branch extinguishes.
+        
+        The operating point is the lowest steady state. Its runaway margins
+        are the coolant temperature rise before ignition, the reactor
+        temperature rise to the ignition tangency (both inf when the
+        reactor cannot ignite) and the slope margin 1 - (dG/dT) / s.
+        
+        Parameters:
+        -----------
+        coolant_temperatures : array_like, optional
+            Coolant temperatures in K (defaults to the jacket setting)
+        feed_scales : array_like
+            Factors applied to the feed composition; broadcast against the
+            coolant temperatures to form the scenarios
+        temp_bounds : tuple
+            Temperature range of the grid in K
+        n_temperatures : int
+            Number of grid temperatures
+        polish_iterations : int
+            Newton iterations refining each intersection inside its grid interval
+        
+        Returns:
+        --------
+        dict
+            "temperature" grid, "generation" and "removal" curves with shape
+            (n_scenarios, n_temperatures), "scenarios" (a DataFrame with the
+            coolant temperature, feed scale, number of steady states,
+            operating point and margins of each scenario) and
+            "steady_states" (a DataFrame of all intersections)
+        """
+        jacket = self.jacket
+        if coolant_temperatures is None:
+            coolant_temperatures = jacket["coolant_temperature"]
+        coolant, scales = np.broadcast_arrays(np.atleast_1d(np.asarray(coolant_temperatures, dtype=float)),
+                                              np.atleast_1d(np.asarray(feed_scales, dtype=float)))
+        coolant, scales = coolant.reshape(-1), scales.reshape(-1)
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        tau = self.volume / self.flow_rate
+        fresh = 1 - self.recycle_ratio
+        heat_capacity = jacket["heat_capacity"]
+        feed_temp = jacket["feed_temperature"]
+        jacket_slope = tau * jacket["heat_transfer_coefficient"] / (self.volume * heat_capacity)
+        slope = fresh + jacket_slope
+        grid = np.linspace(temp_bounds[0], temp_bounds[1], n_temperatures)
+        
+        def generation_curve(T, scale, initial=None):
+            n = T.size
+            feeds = scale[:, None] * feed
+            C, converged = self._solve_steady_state_arrays(network, T, np.full(n, tau), np.full(n, self.recycle_ratio),
+                                                           feeds, initial=initial)
+            _, _, (G, dG) = self._heat_balance(network, C, T, np.full(n, tau), np.full(n, self.recycle_ratio), feeds,
+                                               np.zeros(n), np.zeros(n), np.zeros(n), np.full(n, heat_capacity))
+            return G, dG, C, converged
+        
+        unique_scales, which = np.unique(scales, return_inverse=True)
+        T_flat = np.tile(grid, unique_scales.size)
+        G, dG, conc, converged = generation_curve(T_flat, np.repeat(unique_scales, n_temperatures))
+        shape = (unique_scales.size, n_temperatures)
+        G, dG, converged = G.reshape(shape)[which], dG.reshape(shape)[which], converged.reshape(shape)[which]
+        conc = conc.reshape(shape + (feed.size,))
+        removal = fresh * (grid - feed_temp) + jacket_slope * (grid - coolant[:, None])
+        excess = G - removal
+        
+        # Intersections: sign changes of G - Q between grid temperatures
+        scenario, index = np.nonzero(np.sign(excess[:, :-1]) * np.sign(excess[:, 1:]) < 0)
+        low, high = grid[index], grid[index + 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            T = low - excess[scenario, index] * (high - low) / (excess[scenario, index + 1] - excess[scenario, index])
+        dG_root = dG[scenario, index]
+        for _ in range(polish_iterations if T.size else 0):
+            G_root, dG_root, _, _ = generation_curve(T, scales[scenario], conc[which[scenario], index])
+            residual = G_root - (fresh * (T - feed_temp) + jacket_slope * (T - coolant[scenario]))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                T = np.clip(T - residual / (dG_root - slope), low, high)
+        stable = dG_root < slope
+        
+        count = np.bincount(scenario, minlength=coolant.size)
+        operating = np.full(coolant.size, np.nan)
+        operating_slope = np.full(coolant.size, np.nan)
+        # Intersections are sorted by temperature within a scenario, so the last write is the lowest
+        operating[scenario[::-1]] = T[::-1]
+        operating_slope[scenario[::-1]] = dG_root[::-1]
+        
+        # Tangency points: extrema of G - s T above the operating point
+        turning = dG - slope
+        above = grid[None, :-1] >= np.nan_to_num(operating, nan=np.inf)[:, None]
+        ignition_mask = above & (turning[:, :-1] < 0) & (turning[:, 1:] >= 0)
+        ignites = ignition_mask.any(axis=1)
+        ignition_index = np.argmax(ignition_mask, axis=1)
+        extinction_mask = ((np.arange(n_temperatures - 1)[None, :] > ignition_index[:, None])
+                           & (turning[:, :-1] > 0) & (turning[:, 1:] <= 0))
+        extinguishes = ignites & extinction_mask.any(axis=1)
+        extinction_index = np.argmax(extinction_mask, axis=1)
+        
+        def tangency(mask, idx):
+            rows = np.arange(coolant.size)
+            t0, t1 = turning[rows, idx], turning[rows, idx + 1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                weight = np.clip(t0 / (t0 - t1), 0.0, 1.0)
+            temperature = grid[idx] + weight * (grid[idx + 1] - grid[idx])
+            height = G[rows, idx] + weight * (G[rows, idx + 1] - G[rows, idx])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                coolant_at = temperature - (height - fresh * (temperature - feed_temp)) / jacket_slope
+            if jacket_slope == 0:
+                coolant_at = np.full(coolant.size, np.nan)
+            return np.where(mask, temperature, np.nan), np.where(mask, coolant_at, np.nan)
+        
+        ignition_temperature, ignition_coolant = tangency(ignites, ignition_index)
+        extinction_temperature, extinction_coolant = tangency(extinguishes, extinction_index)
+        
+        scenarios = pd.DataFrame({
+            "coolant_temperature": coolant,
+            "feed_scale": scales,
+            "n_steady_states": count,
+            "operating_temperature": operating,
+            "ignition_temperature": ignition_temperature,
+            "extinction_temperature": extinction_temperature,
+            "ignition_coolant_temperature": ignition_coolant,
+            "extinction_coolant_temperature": extinction_coolant,
+            "coolant_margin": np.where(ignites, ignition_coolant - coolant, np.inf),
+            "temperature_margin": np.where(ignites, ignition_temperature - operating, np.inf),
+            "slope_margin": 1 - operating_slope / slope,
+            "converged": converged.all(axis=1),
+        })
+        steady_states = pd.DataFrame({"scenario": scenario, "coolant_temperature": coolant[scenario],
+                                      "feed_scale": scales[scenario], "temperature": T, "stable": stable})
+        return {"temperature": grid, "generation": G, "removal": removal, "scenarios": scenarios,
+                "steady_states": steady_states}
+    
+    def set_polymerization(self, kinetics):
+        """
+        Set the free-radical polymerization kinetics used by the moment model
+        
+        Parameters:
+        -----------
+        kinetics : dict
+            "monomer" species, "monomer_molar_mass" in g/mol, "initiator_feed"
+            in mol/m³, "initiator_efficiency", and dictionaries with the
+            "frequency_factor" and "activation_energy" of the steps
+            "initiator_decomposition", "propagation", "transfer_to_monomer",
+            "termination_combination" and "termination_disproportionation"
+        """
+        self.polymerization = kinetics
+    
+    # Columns of the moment-model state vector
+    POLYMER_STATE = ("initiator", "monomer", "live_0", "live_1", "live_2", "dead_0", "dead_1", "dead_2")
+    
+    def _polymerization_inputs(self, temperature, residence_time, recycle_ratio, initiator_feed):
+        """Broadcast the operating points and evaluate the rate constants of every step"""
+        kinetics = getattr(self, "polymerization", None)
+        if kinetics is None:
+            raise ValueError("No polymerization kinetics set, call set_polymerization first")
+        inputs = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(self.temperature if temperature is None else temperature, dtype=float)),
+            np.atleast_1d(np.asarray(self.volume / self.flow_rate if residence_time is None
+                                     else residence_time, dtype=float)),
+            np.atleast_1d(np.asarray(self.recycle_ratio if recycle_ratio is None else recycle_ratio,
+                                     dtype=float)),
+            np.atleast_1d(np.asarray(kinetics["initiator_feed"] if initiator_feed is None else initiator_feed,
+                                     dtype=float)))
+        temp, tau, recycle, initiator = (x.ravel() for x in inputs)
+        constants = [kinetics[step]["frequency_factor"] * np.exp(-kinetics[step]["activation_energy"]
+                                                                 / (self.R * temp))
+                     for step in ("initiator_decomposition", "propagation", "transfer_to_monomer",
+                                  "termination_combination", "termination_disproportionation")]
+        feed = np.stack([initiator, np.full_like(temp, self.feed_composition[kinetics["monomer"]])], axis=1)
+        return (temp, tau, recycle, initiator), constants, (1 - recycle) / tau, feed
+    
+    def _polymerization_rates(self, state, constants, dilution, feed):
+        """
+        Time derivatives of the moment equations and their Jacobian
+        
+        Returns:
+        --------
+        derivative : ndarray
+            dy/dt with shape (batch, 8), in the order of POLYMER_STATE
+        jacobian : ndarray
+            d(dy/dt)/dy with shape (batch, 8, 8)
+        """
+        kd, kp, ktrm, ktc, ktd = constants
+        efficiency = self.polymerization.get("initiator_efficiency", 1.0)
+        I, M, l0, l1, l2, m0, m1, m2 = state.T
+        D = dilution
+        kt = ktc + ktd
+        # Radicals formed by initiator decomposition, each starting a chain of length one
+        initiation = 2 * efficiency * kd * I
+        loss = ktrm * M + kt * l0 + D
+        derivative = np.stack([
+            D * (feed[:, 0] - I) - kd * I,
+            D * (feed[:, 1] - M) - initiation - (kp + ktrm) * M * l0,
+            initiation - kt * l0 ** 2 - D * l0,
+            initiation + (kp + ktrm) * M * l0 - loss * l1,
+            initiation + kp * M * (l0 + 2 * l1) + ktrm * M * l0 - loss * l2,
+            ktrm * M * l0 + (ktd + 0.5 * ktc) * l0 ** 2 - D * m0,
+            (ktrm * M + kt * l0) * l1 - D * m1,
+            (ktrm * M + ktd * l0) * l2 + ktc * (l0 * l2 + l1 ** 2) - D * m2,
+        ], axis=1)
+        
+        jacobian = np.zeros(state.shape + (8,))
+        dinitiation = 2 * efficiency * kd
+        jacobian[:, 0, 0] = -D - kd
+        jacobian[:, 1:5, 0] = np.array([-1.0, 1.0, 1.0, 1.0]) * dinitiation[:, None]
+        jacobian[:, 1, 1] = -D - (kp + ktrm) * l0
+        jacobian[:, 1, 2] = -(kp + ktrm) * M
+        jacobian[:, 2, 2] = -2 * kt * l0 - D
+        jacobian[:, 3, 1] = (kp + ktrm) * l0 - ktrm * l1
+        jacobian[:, 3, 2] = (kp + ktrm) * M - kt * l1
+        jacobian[:, 3, 3] = -loss
+        jacobian[:, 4, 1] = kp * (l0 + 2 * l1) + ktrm * (l0 - l2)
+        jacobian[:, 4, 2] = (kp + ktrm) * M - kt * l2
+        jacobian[:, 4, 3] = 2 * kp * M
+        jacobian[:, 4, 4] = -loss
+        jacobian[:, 5, 1] = ktrm * l0
+        jacobian[:, 5, 2] = ktrm * M + (2 * ktd + ktc) * l0
+        jacobian[:, 5, 5] = -D
+        jacobian[:, 6, 1] = ktrm * l1
+        jacobian[:, 6, 2] = kt * l1
+        jacobian[:, 6, 3] = ktrm * M + kt * l0
+        jacobian[:, 6, 6] = -D
+        jacobian[:, 7, 1] = ktrm * l2
+        jacobian[:, 7, 2] = kt * l2
+        jacobian[:, 7, 3] = 2 * ktc * l1
+        jacobian[:, 7, 4] = ktrm * M + kt * l0
+        jacobian[:, 7, 7] = -D
+        return derivative, jacobian
+    
+    def _polymer_frame(self, inputs, state, monomer_feed):
+        """Tabulate moment-model states with conversion and molar-mass averages"""
+        frame = pd.DataFrame({"temperature": inputs[0], "residence_time": inputs[1],
+                              "recycle_ratio": inputs[2], "initiator_feed": inputs[3]})
+        for i, name in enumerate(self.POLYMER_STATE):
+            frame[name] = state[:, i]
+        molar_mass = self.polymerization["monomer_molar_mass"]
+        chains = state[:, 2] + state[:, 5]
+        units = state[:, 3] + state[:, 6]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frame["conversion"] = 1 - state[:, 1] / monomer_feed
+            frame["polymer"] = units
+            frame["Mn"] = molar_mass * units / chains
+            frame["Mw"] = molar_mass * (state[:, 4] + state[:, 7]) / units
+            frame["PDI"] = frame["Mw"] / frame["Mn"]
+        return frame
+    
+    def solve_polymerization(self, temperature=None, residence_time=None, recycle_ratio=None,
+                             initiator_feed=None):
+        """
+        Solve the steady-state method-of-moments model of free-radical polymerization
+        
+        Instead of tracking every chain length, the population balances of
+        live radicals P_n and dead chains D_n are replaced by their first
+        three moments, lambda_k = sum n^k P_n and mu_k = sum n^k D_n, under
+        initiator decomposition, propagation, chain transfer to monomer and
+        termination by combination and disproportionation. At steady state
+        the moment equations are triangular (initiator, then live radicals,
+        monomer, higher live moments and dead moments), so they are solved
+        in closed form for all operating points at once. The recycle ratio
+        enters through the dilution rate (1 - R) / tau as in the lumped model.
+        
+        Parameters:
+        -----------
+        temperature, residence_time, recycle_ratio, initiator_feed : float or array_like, optional
+            Operating points, broadcast together. Default to the current
+            temperature, V / F and recycle ratio and to the initiator feed of
+            the kinetics
+        
+        Returns:
+        --------
+        DataFrame
+            One row per operating point with the initiator and monomer
+            concentrations and the live ("live_k") and dead ("dead_k")
+            moments in mol/m³, the monomer "conversion", the "polymer"
+            concentration in monomer units, the number- and weight-average
+            molar masses "Mn" and "Mw" in g/mol and the dispersity "PDI"
+        """
+        inputs, constants, D, feed = self._polymerization_inputs(temperature, residence_time, recycle_ratio,
+                                                                 initiator_feed)
+        kd, kp, ktrm, ktc, ktd = constants
+        kt = ktc + ktd
+        efficiency = self.polymerization.get("initiator_efficiency", 1.0)
+        
+        I = feed[:, 0] * D / (D + kd)
+        initiation = 2 * efficiency * kd * I
+        # Positive root of initiation = kt l0² + D l0, in a form that stays accurate for kt l0 << D
+        l0 = 2 * initiation / (D + np.sqrt(D ** 2 + 4 * kt * initiation))
+        M = np.maximum(feed[:, 1] - initiation / D, 0.0) / (1 + (kp + ktrm) * l0 / D)
+        loss = ktrm * M + kt * l0 + D
+        l1 = (initiation + (kp + ktrm) * M * l0) / loss
+        l2 = (initiation + kp * M * (l0 + 2 * l1) + ktrm * M * l0) / loss
+        m0 = (ktrm * M * l0 + (ktd + 0.5 * ktc) * l0 ** 2) / D
+        m1 = (ktrm * M + kt * l0) * l1 / D
+        m2 = ((ktrm * M + ktd * l0) * l2 + ktc * (l0 * l2 + l1 ** 2)) / D
+        
+        state = np.stack([I, M, l0, l1, l2, m0, m1, m2], axis=1)
+        return self._polymer_frame(inputs, state, feed[:, 1])
+    
+    def simulate_polymerization(self, duration, n_steps=200, temperature=None, residence_time=None,
+                                recycle_ratio=None, initiator_feed=None, initial=None, tol=1e-10,
+                                max_iterations=20):
+        """
+        Integrate the method-of-moments polymerization model in time
+        
+        All operating points are integrated together with fixed-step BDF2
+        (BDF1 for the first step) and Newton iterations on the batched
+        analytic Jacobians, as in simulate_closed_loop. The default start-up
+        has the reactor filled with monomer at its feed concentration and
+        without initiator or polymer.
+        
+        Parameters:
+        -----------
+        duration : float
+            Simulated time in s
+        n_steps : int
+            Number of integration steps
+        temperature, residence_time, recycle_ratio, initiator_feed : float or array_like, optional
+            Operating points, as in solve_polymerization
+        initial : DataFrame, optional
+            Initial states, e.g. a result of solve_polymerization at other
+            conditions (one row, or one row per operating point)
+        tol : float
+            Relative tolerance of the Newton iterations
+        max_iterations : int
+            Maximum Newton iterations per step
+        
+        Returns:
+        --------
+        DataFrame
+            The columns of solve_polymerization for every step and operating
+            point, preceded by "time" and the operating "point" index
+        """
+        inputs, constants, D, feed = self._polymerization_inputs(temperature, residence_time, recycle_ratio,
+                                                                 initiator_feed)
+        batch = len(D)
+        if initial is None:
+            state = np.zeros((batch, len(self.POLYMER_STATE)))
+            state[:, 1] = feed[:, 1]
+        else:
+            state = np.broadcast_to(initial[list(self.POLYMER_STATE)].to_numpy(dtype=float),
+                                    (batch, len(self.POLYMER_STATE))).copy()
+        h = duration / n_steps
+        identity = np.eye(len(self.POLYMER_STATE))
+        states = [state]
+        previous = None
+        for step in range(n_steps):
+            # BDF1 on the first step, BDF2 afterwards: y - history - gamma h f(y) = 0
+            if previous is None:
+                history, gamma = state, 1.0
+            else:
+                history, gamma = (4 * state - previous) / 3, 2.0 / 3.0
+            y = state.copy()
+            for _ in range(max_iterations):
+                derivative, jacobian = self._polymerization_rates(y, constants, D, feed)
+                residual = y - history - gamma * h * derivative
+                dy = np.linalg.solve(identity - gamma * h * jacobian, -residual[..., None])[..., 0]
+                y = np.maximum(y + dy, 0.0)
+                if np.all(np.abs(dy) <= tol * np.abs(y) + 1e-300):
+                    break
+            previous, state = state, y
+            states.append(state)
+        
+        states = np.concatenate(states)
+        frame = self._polymer_frame([np.tile(x, n_steps + 1) for x in inputs], states, np.tile(feed[:, 1], n_steps + 1))
+        frame.insert(0, "point", np.tile(np.arange(batch), n_steps + 1))
+        frame.insert(0, "time", np.repeat(np.arange(n_steps + 1) * h, batch))
+        return frame
+    
+    @staticmethod
+    def residence_time_distribution(times, residence_time, n_tanks=1.0):
+        """
+        Residence-time density E(t) of a cascade of equal ideal tanks
+        
+        The tanks-in-series (gamma) distribution, with a non-integer number
+        of tanks allowed; one tank is the ideal CSTR, many tanks approach
+        plug flow.
+        
+        Parameters:
+        -----------
+        times : array_like
+            Times in s
+        residence_time : float or array_like
+            Mean residence time of the cascade in s
+        n_tanks : float or array_like
+            Number of tanks, broadcast with residence_time
+        
+        Returns:
+        --------
+        ndarray
+            E(t) in 1/s with shape broadcast(residence_time, n_tanks) + times.shape
+        """
+        times = np.asarray(times, dtype=float)
+        tau = np.asarray(residence_time, dtype=float)[..., None]
+        N = np.asarray(n_tanks, dtype=float)[..., None]
+        with np.errstate(divide="ignore"):
+            log_t = np.log(times)
+        log_E = N * np.log(N / tau) + (N - 1) * log_t - N * times / tau - gammaln(N)
+        return np.where(times > 0, np.exp(log_E), np.where(N == 1, 1 / tau, 0.0) * (times == 0))
+    
+    def _batch_trajectories(self, network, temperatures, times, feed, tol=1e-10, max_iterations=20):
+        """
+        Batch-reactor concentrations from the feed on a time grid, cached per temperature
+        
+        All temperatures missing from the cache are integrated together with
+        variable-step BDF2 (BDF1 for the first step) and Newton iterations on
+        the batched Jacobians. The cache is reset when the network, the feed
+        or the grid changes.
+        
+        Returns:
+        --------
+        ndarray
+            Concentrations with shape (n_temperatures, n_times, n_species)
+        """
+        grid_key = (network["key"], tuple(feed), times[0], times[-1], len(times))
+        cache = getattr(self, "_batch_cache", None)
+        if cache is None or cache["key"] != grid_key:
+            cache = self._batch_cache = {"key": grid_key, "paths": {}}
+        paths = cache["paths"]
+        missing = [T for T in dict.fromkeys(np.asarray(temperatures, dtype=float).tolist()) if T not in paths]
+        
+        if missing:
+            nu = network["nu"]
+            temp = np.array(missing)
+            identity = np.eye(len(feed))
+            scale = np.maximum(np.abs(feed).sum(), 1e-300)
+            conc = np.tile(feed, (len(temp), 1))
+            trajectory = [conc]
+            previous = None
+            for k in range(1, len(times)):
+                h = times[k] - times[k - 1]
+                # Variable-step BDF2: y - history = gamma nu^T r(y)
+                if previous is None:
+                    history, gamma = conc, h
+                else:
+                    w = h / (times[k - 1] - times[k - 2])
+                    history = ((1 + w) ** 2 * conc - w ** 2 * previous) / (1 + 2 * w)
+                    gamma = h * (1 + w) / (1 + 2 * w)
+                # Absent species start slightly positive: at exactly zero a product is left out of
+                # the reaction quotient, which can point the step out of the feasible region. The
+                # first Newton step restores the conserved moieties whatever the initial guess.
+                y = np.where(conc > 0, conc, 1e-12 * scale)
+                for _ in range(max_iterations):
+                    rate, derivs = self._kinetics(network, y, temp, derivatives=True)
+                    residual = y - history - gamma * (rate @ nu)
+                    production = derivs.get("production")
+                    if production is None:
+                        production = np.einsum("rs,brt->bst", nu, derivs["conc"])
+                    jacobian = identity - gamma * production
+                    dy = np.linalg.solve(jacobian, -residual[..., None])[..., 0]
+                    # Fraction to the boundary, which keeps the conserved moieties; species below
+                    # 1e-150 of the feed are only damped element-wise so that they cannot underflow
+                    shrinking = (dy < 0) & (y > 1e-150 * scale)
+                    with np.errstate(divide="ignore", over="ignore"):
+                        alpha = np.min(np.where(shrinking, 0.8 * y / np.where(shrinking, -dy, 1.0), 1.0),
+                                       axis=1, keepdims=True)
+                    y = np.maximum(y + np.minimum(alpha, 1.0) * dy, np.maximum(0.2 * y, 1e-300))
+                    if np.all(np.abs(dy) <= tol * scale):
+                        break
+                previous, conc = conc, y
+                trajectory.append(conc)
+            for T, path in zip(missing, np.stack(trajectory, axis=1)):
+                paths[T] = path
+        return np.stack([paths[T] for T in np.asarray(temperatures, dtype=float).tolist()])
+    
+    def solve_segregated(self, temperature=None, residence_time=None, n_tanks=1.0, time_bounds=(1e-3, 1e6),
+                         n_points=1000):
+        """
+        Outlet concentrations of a completely segregated reactor
+        
+        Each fluid element behaves as a batch reactor for the time it spends
+        in the vessel, so the outlet is the batch trajectory averaged over the
+        residence-time distribution, C = integral C_batch(t) E(t) dt, with
+        the tanks-in-series distribution of residence_time_distribution (the
+        maximum-mixedness counterpart of the cascade is
+        ReactorTrain.from_simulator). Batch trajectories are computed once
+        per temperature on a shared geometric time grid and cached, and the
+        integral uses exact weights for the piecewise-linear trajectory
+        (from differences of the gamma distribution function), with the tail
+        beyond the grid taken at the last point. A whole batch of residence
+        times and tank numbers therefore costs one matrix product. The
+        recycle ratio is not used (once-through vessel).
+        
+        Parameters:
+        -----------
+        temperature, residence_time, n_tanks : float or array_like, optional
+            Operating points, broadcast together. Default to the current
+            temperature and V / F and to an ideally macromixed tank
+        time_bounds : tuple
+            First positive and last time of the shared grid in s
+        n_points : int
+            Number of grid points (t = 0 included)
+        
+        Returns:
+        --------
+        DataFrame
+            One row per operating point with "temperature", "residence_time",
+            "n_tanks" and the concentration of each species
+        """
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        temp, tau, N = (x.ravel() for x in np.broadcast_arrays(
+            np.atleast_1d(np.asarray(self.temperature if temperature is None else temperature, dtype=float)),
+            np.atleast_1d(np.asarray(self.volume / self.flow_rate if residence_time is None else residence_time,
+                                     dtype=float)),
+            np.atleast_1d(np.asarray(n_tanks, dtype=float))))
+        times = np.concatenate([[0.0], np.geomspace(time_bounds[0], time_bounds[1], n_points - 1)])
+        unique_temp, inverse = np.unique(temp, return_inverse=True)
+        paths = self._batch_trajectories(network, unique_temp, times, feed)
+        
+        # Distribution function and first partial moment of the gamma RTD at the grid points
+        x = N[:, None] * times / tau[:, None]
+        F = gammainc(N[:, None], x)
+        G = tau[:, None] * gammainc(N[:, None] + 1, x)
+        P, Q = np.diff(F, axis=1), np.diff(G, axis=1)
+        dt = np.diff(times)
+        weights = np.zeros((len(temp), len(times)))
+        weights[:, :-1] += (times[1:] * P - Q) / dt
+        weights[:, 1:] += (Q - times[:-1] * P) / dt
+        weights[:, -1] += 1 - F[:, -1]
+        conc = np.einsum("bm,bms->bs", weights, paths[inverse])
+        
+        results = pd.DataFrame({"temperature": temp, "residence_time": tau, "n_tanks": N})
+        for i, comp in enumerate(network["species"]):
+            results[comp] = conc[:, i]
+        return results
+    
+    @staticmethod
+    def fit_residence_time_distribution(times, response, inlet=None, n_tanks_bounds=(0.5, 100.0)):
+        """
+        Fit the tanks-in-series distribution to a tracer experiment
+        
+        The predicted outlet is the inlet tracer signal convolved with the
+        RTD, computed by FFT for a whole batch of candidate parameters at
+        once. Candidates around the moment estimates (tau = mean residence
+        time, N = tau² / variance) are screened this way before a
+        least-squares refinement.
+        
+        Parameters:
+        -----------
+        times : array_like
+            Uniformly spaced sampling times in s, starting at the injection
+        response : array_like
+            Outlet tracer concentrations
+        inlet : array_like, optional
+            Inlet tracer concentrations at the same times. Defaults to an
+            ideal pulse carrying the tracer found at the outlet
+        n_tanks_bounds : tuple
+            Bounds on the number of tanks
+        
+        Returns:
+        --------
+        dict
+            "residence_time", "n_tanks", root-mean-square error "rmse" and
+            the fitted outlet "response"
+        """
+        times = np.asarray(times, dtype=float)
+        response = np.asarray(response, dtype=float)
+        dt = times[1] - times[0]
+        if not np.allclose(np.diff(times), dt):
+            raise ValueError("Tracer data must be sampled at uniform times")
+        lags = times - times[0]
+        if inlet is None:
+            inlet = np.zeros_like(response)
+            inlet[0] = response.sum()
+        else:
+            inlet = np.asarray(inlet, dtype=float)
+        length = 2 * len(times)
+        inlet_spectrum = np.fft.rfft(inlet, length)
+        
+        def predict(tau, N):
+            # Probability of each sampling interval, so that the tracer is conserved
+            edges = np.concatenate([[0.0], lags[1:] - dt / 2, [lags[-1] + dt / 2]])
+            F = gammainc(np.asarray(N)[..., None], np.asarray(N)[..., None] * edges
+                         / np.asarray(tau)[..., None])
+            kernel = np.diff(F, axis=-1)
+            return np.fft.irfft(np.fft.rfft(kernel, length) * inlet_spectrum, length)[..., :len(times)]
+        
+        # Moment estimates, corrected for the spread of the inlet signal
+        weights = response / response.sum()
+        inlet_weights = inlet / inlet.sum()
+        mean = weights @ lags - inlet_weights @ lags
+        variance = max(weights @ lags ** 2 - (weights @ lags) ** 2
+                       - (inlet_weights @ lags ** 2 - (inlet_weights @ lags) ** 2), 1e-12 * mean ** 2)
+        tau0 = max(mean, dt)
+        N0 = np.clip(mean ** 2 / variance, *n_tanks_bounds)
+        
+        tau_grid, N_grid = np.meshgrid(tau0 * np.geomspace(0.5, 2.0, 25),
+                                       np.clip(N0 * np.geomspace(0.25, 4.0, 25), *n_tanks_bounds))
+        errors = ((predict(tau_grid, N_grid) - response) ** 2).sum(axis=-1)
+        best = np.unravel_index(np.argmin(errors), errors.shape)
+        start = np.log([tau_grid[best], N_grid[best]])
+        fit = least_squares(lambda p: predict(np.exp(p[0]), np.exp(p[1])) - response, start,
+                            bounds=([-np.inf, np.log(n_tanks_bounds[0])], [np.inf, np.log(n_tanks_bounds[1])]),
+                            x_scale=1.0)
+        tau, N = np.exp(fit.x)
+        fitted = predict(tau, N)
+        return {"residence_time": float(tau), "n_tanks": float(N),
+                "rmse": float(np.sqrt(np.mean((fitted - response) ** 2))), "response": fitted}
+    
+    def _verify_mass_balance(self, inlet_conc, outlet_conc):
+        """
+        Verify that mass balance is maintained in the reactor
+        
+        Reactions can only move the composition within the reaction space
+        range(nu^T), so every conserved moiety (a row of the left null space
+        of the stoichiometric matrix) has the same value in the outlet as in
+        the feed. The outlet is left untouched.
+        
+        Returns:
+        --------
+        float
+            Largest relative violation of the conserved moieties
+        """
+        network = self._compile_network()
+        _, moieties = self._reaction_space(network)
+        if moieties.shape[0] == 0:
+            return 0.0
+        inlet = self._feed_vector(network, inlet_conc)
+        outlet = self._feed_vector(network, outlet_conc)
+        error = np.abs(moieties @ (outlet - inlet))
+        scale = np.abs(moieties) @ np.maximum(np.abs(inlet), np.abs(outlet))
+        return float(np.max(error / np.where(scale > 0, scale, 1.0)))
+    
+    def calculate_conversion(self, inlet_conc=None, outlet_conc=None):
+        """Calculate the conversion of reactants"""
+        if inlet_conc is None:
+            inlet_conc = self.feed_composition
+        if outlet_conc is None:
+            outlet_conc = self.concentrations
+        
+        conversions = {}
+        for comp in self.components:
+            if comp in inlet_conc and inlet_conc[comp] > 0:
+                conversions[comp] = (inlet_conc[comp] - outlet_conc[comp]) / inlet_conc[comp]
+        
+        return conversions
+    
+    def calculate_yield(self, product=None):
+        """Calculate the yield of the target product"""
+        if product is None:
+            product = self.target_product
+        
+        if not product:
+            return 0.0
+        
+        # Find reaction that produces the target product
+        target_reaction = None
+        target_stoich = 0
+        
+        for reaction in self.reactions:
+            stoich = reaction["stoichiometry"].get(product, 0)
+            if stoich > 0:
+                target_reaction = reaction
+                target_stoich = stoich
+                break
+        
+        if not target_reaction:
+            return 0.0
+        
+        # Find limiting reactant
+        limiting_reactant = None
+        limiting_reactant_stoich = 0
+        max_theoretical_product = float('inf')
+        
+        for comp, stoich in target_reaction["stoichiometry"].items():
+            if stoich < 0 and comp in self.feed_composition:
+                # Calculate theoretical product from this reactant
+                theoretical = self.feed_composition[comp] * target_stoich / abs(stoich)
+                if theoretical < max_theoretical_product:
+                    max_theoretical_product = theoretical
+                    limiting_reactant = comp
+                    limiting_reactant_stoich = stoich
+        
+        if not limiting_reactant:
+            return 0.0
+        
+        # Calculate conversion of limiting reactant
+        feed_conc = self.feed_composition.get(limiting_reactant, 0)
+        exit_conc = self.concentrations.get(limiting_reactant, 0)
+        
+        # Adjust for recycle
+        if self.recycle_ratio > 0:
+            # Only consider the net input/output with recycle
+            net_feed = feed_conc * (1 - self.recycle_ratio)
+            net_exit = exit_conc * (1 - self.recycle_ratio)
+            conversion = (net_feed - net_exit) / net_feed if net_feed > 0 else 0
+        else:
+            conversion = (feed_conc - exit_conc) / feed_conc if feed_conc > 0 else 0
+        
+        # Calculate selectivity (moles of product / moles of reactant consumed)
+        actual_product = self.concentrations.get(product, 0)
+        reactant_consumed = feed_conc * conversion
+        
+        if reactant_consumed > 0:
+            selectivity = actual_product / (reactant_consumed * target_stoich / abs(limiting_reactant_stoich))
+        else:
+            selectivity = 0
+        
+        # Yield = conversion * selectivity
+        yield_value = conversion * selectivity
+        
+        return float(max(0, min(1, yield_value)))  # Ensure between 0 and 1
+    
+    def _yield_array(self, network, conc, feed, recycle_ratio=0.0, product=None):
+        """
+        Vectorized calculate_yield for a batch of steady states
+        
+        Returns:
+        --------
+        yields : ndarray
+            Product yield for each operating point, shape (batch,)
+        dyield_dconc : ndarray
+            Derivative of the yield with respect to the outlet concentrations
+        dyield_dfeed : ndarray
+            Derivative of the yield with respect to the feed concentrations
+        """
+        if product is None:
+            product = self.target_product
+        conc = np.atleast_2d(np.asarray(conc, dtype=float))
+        feed = np.broadcast_to(np.asarray(feed, dtype=float), conc.shape)
+        yields = np.zeros(conc.shape[:-1])
+        dyield_dconc = np.zeros(conc.shape)
+        dyield_dfeed = np.zeros(conc.shape)
+        
+        target_reaction = None
+        if product and product in network["index"]:
+            for reaction in self.reactions:
+                if reaction["stoichiometry"].get(product, 0) > 0:
+                    target_reaction = reaction
+                    break
+        if target_reaction is None:
+            return yields, dyield_dconc, dyield_dfeed
+        
+        target_stoich = target_reaction["stoichiometry"][product]
+        candidates = [(network["index"][comp], abs(stoich))
+                      for comp, stoich in target_reaction["stoichiometry"].items()
+                      if stoich < 0 and comp in self.feed_composition]
+        if not candidates:
+            return yields, dyield_dconc, dyield_dfeed
+        
+        # Limiting reactant: smallest theoretical product from the feed
+        reactant_index = np.array([i for i, _ in candidates])
+        reactant_stoich = np.array([s for _, s in candidates], dtype=float)
+        theoretical = feed[..., reactant_index] * target_stoich / reactant_stoich
+        pick = np.argmin(theoretical, axis=-1)
+        limiting = reactant_index[pick]
+        limiting_stoich = reactant_stoich[pick]
+        feed_limiting = np.take_along_axis(feed, limiting[..., None], axis=-1)[..., 0]
+        exit_limiting = np.take_along_axis(conc, limiting[..., None], axis=-1)[..., 0]
+        
+        # Yield = conversion * selectivity = C_product |nu_limiting| / (nu_product C_feed,limiting)
+        recycle_ratio = np.broadcast_to(np.asarray(recycle_ratio, dtype=float), yields.shape)
+        valid = (feed_limiting > 0) & (feed_limiting - exit_limiting > 0) & (recycle_ratio < 1)
+        safe_feed = np.where(valid, feed_limiting, 1.0)
+        raw = conc[..., network["index"][product]] * limiting_stoich / (target_stoich * safe_feed)
+        yields = np.where(valid, np.clip(raw, 0.0, 1.0), 0.0)
+        
+        interior = valid & (raw > 0) & (raw < 1)
+        dyield_dconc[..., network["index"][product]] = np.where(
+            interior, limiting_stoich / (target_stoich * safe_feed), 0.0)
+        np.put_along_axis(dyield_dfeed, limiting[..., None],
+                          np.where(interior, -raw / safe_feed, 0.0)[..., None], axis=-1)
+        return yields, dyield_dconc, dyield_dfeed
+    
+    def _steady_state_sensitivities(self, network, conc, temp, tau, recycle_ratio, feed, k0=None, Ea=None):
+        """
+        Exact sensitivities of a batch of steady states
+        
+        Applies the implicit function theorem to the steady-state residual,
+        dC/dp = -(dF/dC)^-1 dF/dp, with a single factorization of the
+        Jacobian shared by the right-hand sides of every parameter.
+        
+        Returns:
+        --------
+        dict
+            dC/dp for "temperature", "residence_time" and "recycle_ratio"
+            (shape (batch, n_species)), "frequency_factor" and
+            "activation_energy" (shape (batch, n_species, n_reactions)) and
+            "feed" (shape (batch, n_species, n_species))
+        """
+        conc = np.atleast_2d(np.asarray(conc, dtype=float))
+        batch = conc.shape[:-1]
+        n_species = conc.shape[-1]
+        n_reactions = len(network["k0"])
+        temp = np.broadcast_to(np.asarray(temp, dtype=float), batch)
+        tau = np.broadcast_to(np.asarray(tau, dtype=float), batch)
+        recycle_ratio = np.broadcast_to(np.asarray(recycle_ratio, dtype=float), batch)
+        feed = np.broadcast_to(np.asarray(feed, dtype=float), conc.shape)
+        
+        _, jacobian, (rate, derivs) = self._steady_state_residual(
+            network, conc, temp, tau, recycle_ratio, feed, k0, Ea, derivatives=True)
+        nu = network["nu"]
+        
+        # Partial derivatives of F = (1 - R)(C_feed - C) + tau * nu^T r(C, T; k0, Ea)
+        dF_dT = tau[..., None] * (derivs["temperature"] @ nu)
+        dF_dtau = rate @ nu
+        dF_dR = conc - feed
+        dF_dk0 = tau[..., None, None] * nu.T * derivs["frequency_factor"][..., None, :]
+        dF_dEa = tau[..., None, None] * nu.T * derivs["activation_energy"][..., None, :]
+        dF_dfeed = (1 - recycle_ratio)[..., None, None] * np.eye(n_species)
+        
+        rhs = np.concatenate([dF_dT[..., None], dF_dtau[..., None], dF_dR[..., None],
+                              dF_dk0, dF_dEa, dF_dfeed], axis=-1)
+        try:
+            solution = -np.linalg.solve(jacobian, rhs)
+        except np.linalg.LinAlgError:
+            solution = -(np.linalg.pinv(jacobian) @ rhs)
+        
+        return {
+            "temperature": solution[..., 0],
+            "residence_time": solution[..., 1],
+            "recycle_ratio": solution[..., 2],
+            "frequency_factor": solution[..., 3:3 + n_reactions],
+            "activation_energy": solution[..., 3 + n_reactions:3 + 2 * n_reactions],
+            "feed": solution[..., 3 + 2 * n_reactions:],
+        }
+    
+    def calculate_sensitivities(self, temperature=None):
+        """
+        Calculate exact sensitivities of the steady state and of the yield
+        
+        The derivatives are obtained with the implicit function theorem on
+        the steady-state residual, so a single linear solve at the converged
+        state gives all of them without finite differences.
+        
+        Parameters:
+        -----------
+        temperature : float, optional
+            Temperature in K (defaults to the current temperature)
+        
+        Returns:
+        --------
+        dict
+            "temperature", "concentrations" and "yield" of the steady state,
+            "concentration_sensitivities" (DataFrame of dC/dp, one column per
+            parameter) and "yield_sensitivities" (dict of dYield/dp). The
+            parameters are "temperature" (K), "residence_time" (s),
+            "recycle_ratio" and "frequency_factor_i" / "activation_energy_i"
+            for reaction i.
+        """
+        if temperature is None:
+            temperature = self.temperature
+        
+        concentrations = self.solve_steady_state(temperature)
+        product_yield = self.calculate_yield()
+        
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        tau = self.volume / self.flow_rate
+        conc = np.array([[concentrations[comp] for comp in network["species"]]])
+        
+        sens = self._steady_state_sensitivities(network, conc, temperature, tau, self.recycle_ratio, feed)
+        _, dyield_dconc, _ = self._yield_array(network, conc, feed, self.recycle_ratio)
+        
+        columns = {
+            "temperature": sens["temperature"][0],
+            "residence_time": sens["residence_time"][0],
+            "recycle_ratio": sens["recycle_ratio"][0],
+        }
+        for j in range(len(self.reactions)):
+            columns[f"frequency_factor_{j+1}"] = sens["frequency_factor"][0, :, j]
+        for j in range(len(self.reactions)):
+            columns[f"activation_energy_{j+1}"] = sens["activation_energy"][0, :, j]
+        conc_sens = pd.DataFrame(columns, index=network["species"])
+        
+        yield_sens = {param: float(dyield_dconc[0] @ values) for param, values in columns.items()}
+        
+        return {
+            "temperature": temperature,
+            "concentrations": concentrations,
+            "yield": product_yield,
+            "concentration_sensitivities": conc_sens,
+            "yield_sensitivities": yield_sens
+        }
+    
+    def linearize(self, temperature=None, flow_rate=None, recycle_ratio=None, feed=None, cache_size=4096):
+        """
+        Linearized state-space model of the dynamic CSTR at its steady state
+        
+        The dynamic balance dC/dt = f(C, u) = (F / V)(1 - R)(C_feed - C) + nu^T r(C, T)
+        is linearized at the steady state of each operating point, giving
+        d(dC)/dt = A dC + B du with A = df/dC and B = df/du for the inputs
+        u = (T, F, C_feed). The Jacobians come from the exact kinetics
+        derivatives, so no finite differences are involved.
+        
+        Operating points are solved and linearized in one batch. Results are
+        cached by operating point (with the reactor volume and reaction
+        network), so repeated requests only cost a dictionary lookup.
+        
+        Parameters:
+        -----------
+        temperature, flow_rate, recycle_ratio : float or array_like, optional
+            Operating points (default to the current simulator values); all
+            arguments are broadcast to a common batch shape
+        feed : dict or array_like, optional
+            Feed concentrations, a dict or an array of shape (..., n_species)
+            ordered like "states"
+        cache_size : int
+            Maximum number of cached operating points (oldest dropped first)
+        
+        Returns:
+        --------
+        dict
+            "states" (species) and "inputs" names, the "steady_state"
+            concentrations and "converged" flags, "A" (batch, n_states, n_states),
+            "B" (batch, n_states, n_inputs), the "eigenvalues" of A sorted
+            from the slowest mode and the corresponding "time_constants"
+            1 / |Re(lambda)| in seconds
+        """
+        network = self._compile_network()
+        species = network["species"]
+        n_species = len(species)
+        if feed is None:
+            feed = self._feed_vector(network)
+        elif isinstance(feed, dict):
+            feed = self._feed_vector(network, feed)
+        temp = np.asarray(self.temperature if temperature is None else temperature, dtype=float)
+        flow = np.asarray(self.flow_rate if flow_rate is None else flow_rate, dtype=float)
+        recycle = np.asarray(self.recycle_ratio if recycle_ratio is None else recycle_ratio, dtype=float)
+        feed = np.asarray(feed, dtype=float)
+        batch = np.broadcast_shapes(temp.shape, flow.shape, recycle.shape, feed.shape[:-1])
+        temp = np.broadcast_to(temp, batch).reshape(-1)
+        flow = np.broadcast_to(flow, batch).reshape(-1)
+        recycle = np.broadcast_to(recycle, batch).reshape(-1)
+        feed = np.broadcast_to(feed, batch + (n_species,)).reshape(-1, n_species)
+        
+        cache = getattr(self, "_linearization_cache", None)
+        if cache is None or cache["key"] != network["key"]:
+            cache = {"key": network["key"], "points": {}}
+            self._linearization_cache = cache
+        points = cache["points"]
+        keys = [(self.volume, t, f, r) + tuple(c) for t, f, r, c in
+                zip(temp.tolist(), flow.tolist(), recycle.tolist(), feed.tolist())]
+        missing = np.array([i for i, key in enumerate(keys) if key not in points], dtype=int)
+        fresh = {}
+        
+        if missing.size:
+            temp_m, flow_m, recycle_m, feed_m = temp[missing], flow[missing], recycle[missing], feed[missing]
+            tau = self.volume / flow_m
+            conc, converged = self._solve_steady_state_arrays(network, temp_m, tau, recycle_m, feed_m)
+            _, jacobian, (_, derivs) = self._steady_state_residual(
+                network, conc, temp_m, tau, recycle_m, feed_m, derivatives=True)
+            
+            # The residual is tau * f, so A follows from its Jacobian
+            A = jacobian / tau[:, None, None]
+            dilution = (1 - recycle_m) / self.volume
+            B = np.empty((missing.size, n_species, 2 + n_species))
+            B[:, :, 0] = derivs["temperature"] @ network["nu"]
+            B[:, :, 1] = dilution[:, None] * (feed_m - conc)
+            B[:, :, 2:] = (dilution * flow_m)[:, None, None] * np.eye(n_species)
+            eigenvalues = np.linalg.eigvals(A)
+            eigenvalues = np.take_along_axis(eigenvalues, np.argsort(-eigenvalues.real, axis=1), axis=1)
+            
+            for row, i in enumerate(missing):
+                fresh[i] = (conc[row], converged[row], A[row], B[row], eigenvalues[row])
+                # Failed solves are returned but not cached
+                if converged[row]:
+                    points[keys[i]] = fresh[i]
+            while len(points) > cache_size:
+                points.pop(next(iter(points)))
+        
+        entries = [fresh[i] if i in fresh else points[key] for i, key in enumerate(keys)]
+        conc, converged, A, B, eigenvalues = (np.array(values) for values in zip(*entries))
+        with np.errstate(divide="ignore"):
+            time_constants = 1.0 / np.abs(eigenvalues.real)
+        
+        return {
+            "states": list(species),
+            "inputs": ["temperature", "flow_rate"] + [f"feed_{comp}" for comp in species],
+            "steady_state": conc.reshape(batch + (n_species,)),
+            "converged": converged.reshape(batch),
+            "A": A.reshape(batch + A.shape[1:]),
+            "B": B.reshape(batch + B.shape[1:]),
+            "eigenvalues": eigenvalues.reshape(batch + (n_species,)),
+            "time_constants": time_constants.reshape(batch + (n_species,)),
+        }
+    
+    def simulate_closed_loop(self, controller, setpoint, duration, control_interval=60.0, controlled=None,
+                             manipulated="temperature", disturbance=None, substeps=4, initial=None):
+        """
+        Simulate the dynamic CSTR under feedback control
+        
+        The dynamic balance dC/dt = (F / V)(1 - R)(C_feed - C) + nu^T r(C, T)
+        is integrated with fixed-step BDF2 and a simplified Newton method.
+        The LU factorization of the Newton matrix, reduced to the reaction
+        space since the conserved moieties evolve by dilution only, is kept
+        across steps and control intervals and is only refreshed when Newton
+        stops converging, so long scenarios cost a few residual evaluations
+        per step. The reactor is isothermal here, so the temperature acts as
+        a directly manipulated input.
+        
+        Parameters:
+        -----------
+        controller : PIDController or LinearMPC
+            Feedback controller, set up at the start of the simulation
+        setpoint : float or callable
+            Setpoint of the controlled concentration, or a function of time
+        duration : float
+            Simulated time in s
+        control_interval : float
+            Sampling time of the controller in s (inputs are held constant in between)
+        controlled : str, optional
+            Controlled species (defaults to the target product)
+        manipulated : str or list of str
+            Manipulated inputs among "temperature", "flow_rate",
+            "recycle_ratio" and "feed_<component>"
+        disturbance : callable, optional
+            Function of time returning a dict of input values that override
+            the nominal (non-manipulated) inputs, e.g. {"feed_A": 0.9}
+        substeps : int
+            Integration steps per control interval
+        initial : dict, optional
+            Initial concentrations (defaults to the steady state at the
+            current operating point)
+        
+        Returns:
+        --------
+        DataFrame
+            One row per control interval with the "time", the concentration
+            of each species, the manipulated inputs and the "setpoint"
+        """
+        network = self._compile_network()
+        species = network["species"]
+        n_species = len(species)
+        if controlled is None:
+            controlled = self.target_product
+        if isinstance(manipulated, str):
+            manipulated = [manipulated]
+        feed = self._feed_vector(network)
+        inputs = {"temperature": float(self.temperature), "flow_rate": float(self.flow_rate),
+                  "recycle_ratio": float(self.recycle_ratio)}
+        inputs.update({f"feed_{comp}": feed[i] for comp, i in network["index"].items()})
+        for name in manipulated:
+            if name not in inputs:
+                raise ValueError(f"Unknown manipulated input: {name}")
+        
+        if initial is None:
+            conc, _ = self._solve_steady_state_arrays(network, inputs["temperature"],
+                                                      self.volume / inputs["flow_rate"],
+                                                      inputs["recycle_ratio"], feed)
+            conc = conc[0]
+        else:
+            conc = self._feed_vector(network, initial)
+        controller.setup(self, manipulated, controlled, conc, inputs, control_interval)
+        
+        # Integrator state shared by all control intervals
+        temp, tau, recycle = np.empty(1), np.empty(1), np.empty(1)
+        feed_row = np.empty((1, n_species))
+        basis, _ = self._reaction_space(network)
+        identity = np.eye(basis.shape[1])
+        integrator = {"lu": None, "step": None, "projected": None, "previous": None}
+        
+        def rhs(C, derivatives=False):
+            residual, jacobian, _ = self._steady_state_residual(network, C[None], temp, tau, recycle, feed_row,
+                                                                derivatives=derivatives)
+            if derivatives:
+                return residual[0] / tau[0], jacobian[0] / tau[0]
+            return residual[0] / tau[0]
+        
+        def factor(C, step):
+            _, jacobian = rhs(C, derivatives=True)
+            integrator["projected"] = basis.T @ jacobian
+            refactor(step)
+        
+        def refactor(step):
+            # Only the block of the Newton matrix on the reaction space is factorized
+            integrator["lu"] = lu_factor(identity - step * integrator["projected"] @ basis)
+            integrator["step"] = step
+        
+        def newton_solve(G, step):
+            # Along the conserved moieties I - step * J is the scalar 1 + step (1 - R) / tau
+            normal = (G - (G @ basis) @ basis.T) / (1.0 + step * (1 - recycle[0]) / tau[0])
+            reduced = lu_solve(integrator["lu"], G @ basis + step * integrator["projected"] @ normal)
+            return normal + basis @ reduced
+        
+        def implicit_step(C, previous, h):
+            # BDF2 when the previous state is available, backward Euler otherwise
+            floor = 1e-12 * (1.0 + np.abs(C).max())
+            if previous is None:
+                step, base, X = h, C, np.maximum(C, floor)
+            else:
+                step, base = 2.0 * h / 3.0, (4.0 * C - previous) / 3.0
+                X = np.maximum(2.0 * C - previous, floor)
+            if integrator["projected"] is None:
+                factor(C, step)
+            elif integrator["step"] != step:
+                refactor(step)
+            for refresh in range(2):
+                for _ in range(6):
+                    delta = newton_solve(base + step * rhs(X) - X, step)
+                    size = np.abs(delta).max()
+                    # Fraction-to-boundary damping keeps the iterate positive
+                    shrinking = delta < 0
+                    if shrinking.any():
+                        delta *= min(1.0, 0.9 * (X[shrinking] / -delta[shrinking]).min())
+                    X = X + delta
+                    if size <= 1e-9 * (1.0 + np.abs(X).max()):
+                        return X
+                factor(X if np.isfinite(X).all() else C, step)
+                X = np.maximum(C, floor)
+            
+            # The step equation (base - X) / step + f(X) = 0 is the steady state
+            # of a CSTR with a modified feed and residence time, so the globalized
+            # steady-state solver takes over when simplified Newton fails
+            rate = (1 - recycle[0]) / tau[0] + 1.0 / step
+            effective_feed = ((1 - recycle[0]) / tau[0] * feed_row[0] + base / step) / rate
+            X, converged = self._solve_steady_state_arrays(network, temp, 1.0 / rate, 0.0, effective_feed,
+                                                           initial=C)
+            if not converged[0]:
+                raise RuntimeError("Implicit integration of the CSTR dynamics failed")
+            return X[0]
+        
+        def advance(C, interval):
+            h = interval / substeps
+            for _ in range(substeps):
+                X = implicit_step(C, integrator["previous"], h)
+                integrator["previous"] = C
+                C = X
+            return C
+        
+        n_intervals = int(np.ceil(duration / control_interval))
+        times = np.arange(n_intervals + 1) * control_interval
+        history = np.empty((n_intervals + 1, n_species))
+        moves = np.empty((n_intervals + 1, len(manipulated)))
+        targets = np.empty(n_intervals + 1)
+        
+        for k, t in enumerate(times):
+            target = setpoint(t) if callable(setpoint) else setpoint
+            u = controller.update(t, conc, target)
+            history[k], moves[k], targets[k] = conc, u, target
+            if k == n_intervals:
+                break
+            
+            current = dict(inputs)
+            if disturbance is not None:
+                current.update(disturbance(t))
+            current.update(zip(manipulated, u))
+            temp[0] = current["temperature"]
+            tau[0] = self.volume / current["flow_rate"]
+            recycle[0] = current["recycle_ratio"]
+            feed_row[0] = [current[f"feed_{comp}"] for comp in species]
+            conc = advance(conc, control_interval)
+        
+        results = pd.DataFrame(history, columns=species)
+        results.insert(0, "time", times)
+        for j, name in enumerate(manipulated):
+            results[name] = moves[:, j]
+        results["setpoint"] = targets
+        return results
+    
+    def propagate_uncertainty(self, n_samples=1000, frequency_factor_uncertainty=0.2,
+                              activation_energy_uncertainty=2000.0, equilibrium_constant_uncertainty=0.2,
+                              percentiles=(5, 50, 95), chunk_size=10000, seed=None, temperature=None):
+        """
+        Monte Carlo propagation of kinetic parameter uncertainty to the steady state
+        
+        Frequency factors and equilibrium constants are sampled log-normally
+        around their nominal values and activation energies normally. Each
+        chunk of samples is solved in one batched call warm-started from the
+        nominal steady state, so memory is bounded by chunk_size. The
+        samples do not depend on chunk_size for a given seed.
+        
+        Parameters:
+        -----------
+        n_samples : int
+            Number of parameter samples
+        frequency_factor_uncertainty : float or array
+            Standard deviation of ln(frequency_factor), per reaction if an array
+        activation_energy_uncertainty : float or array
+            Standard deviation of the activation energies in J/mol
+        equilibrium_constant_uncertainty : float or array
+            Standard deviation of ln(equilibrium_constant) of reversible reactions
+        percentiles : tuple
+            Percentiles reported in the summary
+        chunk_size : int
+            Number of samples solved per batch
+        seed : int, optional
+            Seed of the random generator for reproducibility
+        temperature : float, optional
+            Temperature in K (defaults to the current temperature)
+        
+        Returns:
+        --------
+        dict
+            "yield" (array of sampled yields), "concentrations" (DataFrame of
+            sampled concentrations), "converged" (array of flags) and
+            "summary" (DataFrame with the mean, standard deviation and
+            percentiles of the yield and of every concentration)
+        """
+        if temperature is None:
+            temperature = self.temperature
+        
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        tau = self.volume / self.flow_rate
+        n_reactions = len(network["k0"])
+        nominal, _ = self._solve_steady_state_arrays(network, temperature, tau, self.recycle_ratio, feed)
+        
+        sigma_k0 = np.broadcast_to(np.asarray(frequency_factor_uncertainty, dtype=float), (n_reactions,))
+        sigma_Ea = np.broadcast_to(np.asarray(activation_energy_uncertainty, dtype=float), (n_reactions,))
+        sigma_K = np.where(network["reversible"],
+                           np.broadcast_to(np.asarray(equilibrium_constant_uncertainty, dtype=float), (n_reactions,)),
+                           0.0)
+        
+        rng = np.random.default_rng(seed)
+        yields = np.empty(n_samples)
+        conc = np.empty((n_samples, len(network["species"])))
+        converged = np.empty(n_samples, dtype=bool)
+        for start in range(0, n_samples, chunk_size):
+            stop = min(start + chunk_size, n_samples)
+            z = rng.standard_normal((stop - start, 3 * n_reactions))
+            k0 = network["k0"] * np.exp(sigma_k0 * z[:, :n_reactions])
+            Ea = network["Ea"] + sigma_Ea * z[:, n_reactions:2 * n_reactions]
+            K_eq = network["K_eq"] * np.exp(sigma_K * z[:, 2 * n_reactions:])
+            conc[start:stop], converged[start:stop] = self._solve_steady_state_arrays(
+                network, temperature, tau, self.recycle_ratio, feed, initial=nominal, k0=k0, Ea=Ea, K_eq=K_eq)
+            yields[start:stop], _, _ = self._yield_array(network, conc[start:stop], feed, self.recycle_ratio)
+        
+        samples = pd.DataFrame(conc, columns=network["species"])
+        values = pd.concat([pd.Series(yields, name="yield"), samples], axis=1)[converged]
+        summary = pd.DataFrame({"mean": values.mean(), "std": values.std()})
+        for q in percentiles:
+            summary[f"p{q:g}"] = values.quantile(q / 100)
+        
+        return {
+            "yield": yields,
+            "concentrations": samples,
+            "converged": converged,
+            "summary": summary
+        }
+    
+    def sobol_indices(self, bounds=None, n_samples=1024, chunk_size=4096, max_workers=None, seed=None):
+        """
+        Sobol first-order and total indices of the yield
+        
+        The inputs are the temperature, volume, flow rate, recycle ratio,
+        feed concentrations and the frequency factor and activation energy
+        of every reaction. A scrambled Sobol sequence gives the Saltelli
+        matrices A, B and AB_i, whose N (d + 2) operating points are solved
+        in parallel batches. First-order indices use the Saltelli (2010)
+        estimator and total indices the Jansen estimator.
+        
+        Parameters:
+        -----------
+        bounds : dict, optional
+            (low, high) bounds by input name, overriding the defaults of
+            ±10 % around the current value (±5 % for activation energies,
+            a factor of 2 for frequency factors, sampled log-uniformly,
+            and ±0.1 for the recycle ratio). Input names are "temperature",
+            "volume", "flow_rate", "recycle_ratio", "feed_<component>",
+            "frequency_factor_i" and "activation_energy_i".
+        n_samples : int
+            Base sample size N (a power of 2)
+        chunk_size : int
+            Number of operating points solved per batch
+        max_workers : int, optional
+            Number of threads for the batched solves
+        seed : int, optional
+            Seed of the scrambled Sobol sequence for reproducibility
+        
+        Returns:
+        --------
+        DataFrame
+            "first_order" and "total" indices, one row per input
+        """
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        n_reactions = len(network["k0"])
+        
+        # Default ranges around the current operating point
+        nominal = {
+            "temperature": self.temperature,
+            "volume": self.volume,
+            "flow_rate": self.flow_rate,
+            "recycle_ratio": self.recycle_ratio,
+        }
+        for comp in self.feed_composition:
+            nominal[f"feed_{comp}"] = feed[network["index"][comp]]
+        for j in range(n_reactions):
+            nominal[f"frequency_factor_{j+1}"] = network["k0"][j]
+        for j in range(n_reactions):
+            nominal[f"activation_energy_{j+1}"] = network["Ea"][j]
+        ranges = {}
+        for name, value in nominal.items():
+            if name == "recycle_ratio":
+                ranges[name] = (max(0.0, value - 0.1), min(0.95, value + 0.1))
+            elif name.startswith("frequency_factor"):
+                ranges[name] = (value / 2, value * 2)
+            elif name.startswith("activation_energy"):
+                ranges[name] = (0.95 * value, 1.05 * value)
+            else:
+                ranges[name] = (0.9 * value, 1.1 * value)
+        ranges.update(bounds or {})
+        names = list(nominal)
+        log_scale = np.array([name.startswith("frequency_factor") for name in names])
+        lower = np.array([ranges[name][0] for name in names], dtype=float)
+        upper = np.array([ranges[name][1] for name in names], dtype=float)
+        lower = np.where(log_scale, np.log(np.maximum(lower, 1e-300)), lower)
+        upper = np.where(log_scale, np.log(np.maximum(upper, 1e-300)), upper)
+        
+        # Saltelli matrices: A, B and A with column i taken from B
+        d = len(names)
+        unit = qmc.Sobol(d=2 * d, scramble=True, seed=seed).random(n_samples)
+        A = lower + unit[:, :d] * (upper - lower)
+        B = lower + unit[:, d:] * (upper - lower)
+        AB = np.repeat(A[None], d, axis=0)
+        AB[np.arange(d), :, np.arange(d)] = B.T
+        points = np.concatenate([A, B, AB.reshape(-1, d)])
+        points[:, log_scale] = np.exp(points[:, log_scale])
+        
+        feed_columns = [network["index"][comp] for comp in self.feed_composition]
+        k0_columns = slice(4 + len(feed_columns), 4 + len(feed_columns) + n_reactions)
+        Ea_columns = slice(4 + len(feed_columns) + n_reactions, None)
+        
+        def evaluate(chunk):
+            temp, volume, flow_rate, recycle_ratio = chunk[:, :4].T
+            chunk_feed = np.zeros((len(chunk), len(feed)))
+            chunk_feed[:, feed_columns] = chunk[:, 4:4 + len(feed_columns)]
+            conc, _ = self._solve_steady_state_arrays(network, temp, volume / flow_rate, recycle_ratio, chunk_feed,
+                                                      k0=chunk[:, k0_columns], Ea=chunk[:, Ea_columns])
+            return self._yield_array(network, conc, chunk_feed, recycle_ratio)[0]
+        
+        chunks = np.array_split(points, max(1, -(-len(points) // chunk_size)))
+        workers = max(1, max_workers or min(len(chunks), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            values = np.concatenate(list(executor.map(evaluate, chunks)))
+        
+        f_A = values[:n_samples]
+        f_B = values[n_samples:2 * n_samples]
+        f_AB = values[2 * n_samples:].reshape(d, n_samples)
+        mean = np.mean(np.concatenate([f_A, f_B]))
+        variance = np.var(np.concatenate([f_A, f_B]))
+        # A yield that only varies at round-off level has no meaningful indices
+        if variance > (1e-8 * max(1.0, abs(mean))) ** 2:
+            first_order = np.mean((f_B - mean) * (f_AB - f_A), axis=1) / variance
+            total = 0.5 * np.mean((f_A - f_AB) ** 2, axis=1) / variance
+        else:
+            first_order = total = np.zeros(d)
+        
+        return pd.DataFrame({"first_order": first_order, "total": total}, index=names)
+    
+    def _operating_data(self, network, frame):
+        """
+        Operating points of a DataFrame of plant data as solver arrays
+        
+        Uses the columns "temperature", "residence_time" or "flow_rate",
+        "recycle_ratio" and "feed_<component>"; missing columns take the
+        current simulator values.
+        
+        Returns:
+        --------
+        temp, tau, recycle_ratio, feed : ndarray
+        """
+        n_rows = len(frame)
+        temp = frame["temperature"].to_numpy(dtype=float)
+        if "residence_time" in frame:
+            tau = frame["residence_time"].to_numpy(dtype=float)
+        elif "flow_rate" in frame:
+            tau = self.volume / frame["flow_rate"].to_numpy(dtype=float)
+        else:
+            tau = np.full(n_rows, self.volume / self.flow_rate)
+        if "recycle_ratio" in frame:
+            recycle_ratio = frame["recycle_ratio"].to_numpy(dtype=float)
+        else:
+            recycle_ratio = np.full(n_rows, float(self.recycle_ratio))
+        feed = np.tile(self._feed_vector(network), (n_rows, 1))
+        for comp, i in network["index"].items():
+            if f"feed_{comp}" in frame:
+                feed[:, i] = frame[f"feed_{comp}"].to_numpy(dtype=float)
+        return temp, tau, recycle_ratio, feed
+    
+    def fit_kinetics(self, data, fit_orders=True, order_bounds=(0.0, 3.0), n_starts=8, max_workers=None,
+                     seed=None, apply=True):
+        """
+        Estimate frequency factors, activation energies and reaction orders from plant data
+        
+        Nonlinear least squares on the measured outlet concentrations. The
+        Arrhenius law is reparameterized around the mean temperature T_ref
+        of the data, k = exp(a) exp(-b (T_ref / T - 1)) with b = Ea / (R T_ref),
+        which removes the strong correlation between k0 and Ea. Residuals
+        and their exact Jacobian (implicit function theorem) are evaluated
+        for all data points in one batch, and the fit is restarted from
+        perturbed initial guesses in parallel.
+        
+        Parameters:
+        -----------
+        data : str or DataFrame
+            CSV file or DataFrame with one row per operating point: the
+            columns of the operating point (see _operating_data) and the
+            measured outlet concentration of any network species
+        fit_orders : bool
+            If True, also fit the orders listed in each "reaction_order"
+        order_bounds : tuple
+            Bounds of the fitted reaction orders
+        n_starts : int
+            Number of least-squares starts
+        max_workers : int, optional
+            Number of threads for the starts
+        seed : int, optional
+            Seed of the start perturbations for reproducibility
+        apply : bool
+            If True, replace self.reactions with the fitted reactions
+        
+        Returns:
+        --------
+        dict
+            "reactions" (fitted reaction dicts), "parameters" (DataFrame of
+            fitted values and standard errors), "rmse" of the scaled
+            residuals and "starts" (DataFrame describing every start)
+        """
+        frame = pd.read_csv(data) if isinstance(data, str) else pd.DataFrame(data)
+        network = self._compile_network()
+        temp, tau, recycle_ratio, feed = self._operating_data(network, frame)
+        measured_species = [comp for comp in network["species"] if comp in frame]
+        if not measured_species:
+            raise ValueError("The data contain no measured concentration column")
+        columns = [network["index"][comp] for comp in measured_species]
+        measured = frame[measured_species].to_numpy(dtype=float)
+        mask = np.isfinite(measured)
+        scale = max(float(np.nanmax(np.abs(measured))), 1e-12)
+        
+        n_reactions = len(self.reactions)
+        T_ref = float(np.mean(temp))
+        RT_ref = self.R * T_ref
+        fitted_orders = [(j, network["index"][comp])
+                         for j, reaction in enumerate(self.reactions)
+                         for comp in reaction.get("reaction_order", {}) if fit_orders and comp in network["index"]]
+        
+        def unpack(theta):
+            b = theta[n_reactions:2 * n_reactions]
+            Ea = b * RT_ref
+            k0 = np.exp(theta[:n_reactions] + b)
+            order = network["order"].copy()
+            for (j, i), value in zip(fitted_orders, theta[2 * n_reactions:]):
+                order[j, i] = value
+            return k0, Ea, order
+        
+        # Initial guess from the current reactions
+        k_ref = np.maximum(network["k0"], 1e-300) * np.exp(-network["Ea"] / RT_ref)
+        theta0 = np.concatenate([np.log(k_ref), network["Ea"] / RT_ref,
+                                 [network["order"][j, i] for j, i in fitted_orders]])
+        lower = np.concatenate([np.full(n_reactions, -np.inf), np.zeros(n_reactions),
+                                np.full(len(fitted_orders), order_bounds[0])])
+        upper = np.concatenate([np.full(2 * n_reactions, np.inf), np.full(len(fitted_orders), order_bounds[1])])
+        theta0 = np.clip(theta0, lower, upper)
+        
+        def fit(theta_start):
+            state = {"conc": None}
+            
+            def solve(theta):
+                k0, Ea, order = unpack(theta)
+                candidate = dict(network, order=order)
+                conc, _ = self._solve_steady_state_arrays(candidate, temp, tau, recycle_ratio, feed,
+                                                          initial=state["conc"], k0=k0, Ea=Ea)
+                state["conc"] = conc
+                return candidate, k0, Ea, conc
+            
+            def residuals(theta):
+                _, _, _, conc = solve(theta)
+                return ((conc[:, columns] - np.nan_to_num(measured)) / scale)[mask]
+            
+            def jacobian(theta):
+                candidate, k0, Ea, conc = solve(theta)
+                sens = self._steady_state_sensitivities(candidate, conc, temp, tau, recycle_ratio, feed, k0, Ea)
+                # Chain rule through k0 = exp(a + b) and Ea = b R T_ref
+                dC_da = sens["frequency_factor"] * k0
+                dC_db = dC_da + sens["activation_energy"] * RT_ref
+                blocks = [dC_da, dC_db]
+                if fitted_orders:
+                    rate, derivs = self._kinetics(candidate, conc, temp, k0, Ea, derivatives=True)
+                    _, jac_conc, _ = self._steady_state_residual(candidate, conc, temp, tau, recycle_ratio,
+                                                                  feed, k0, Ea, derivatives=True)
+                    active = (derivs["frequency_factor"] != 0)
+                    dF_dorder = np.stack([
+                        tau[:, None] * network["nu"][j] * np.where(
+                            active[:, j] & (conc[:, i] > 0),
+                            rate[:, j] * np.log(np.where(conc[:, i] > 0, conc[:, i], 1.0)), 0.0)[:, None]
+                        for j, i in fitted_orders], axis=-1)
+                    try:
+                        blocks.append(-np.linalg.solve(jac_conc, dF_dorder))
+                    except np.linalg.LinAlgError:
+                        blocks.append(-(np.linalg.pinv(jac_conc) @ dF_dorder))
+                full = np.concatenate(blocks, axis=-1)[:, columns, :] / scale
+                return full[mask]
+            
+            result = least_squares(residuals, theta_start, jac=jacobian, bounds=(lower, upper),
+                                   x_scale="jac", max_nfev=200)
+            return theta_start, result
+        
+        rng = np.random.default_rng(seed)
+        starts = [theta0] + [
+            np.clip(theta0 + np.concatenate([rng.normal(0.0, 1.0, n_reactions),
+                                             rng.normal(0.0, 0.2, n_reactions) * np.maximum(theta0[n_reactions:2 * n_reactions], 1.0),
+                                             rng.normal(0.0, 0.3, len(fitted_orders))]), lower, upper)
+            for _ in range(max(n_starts, 1) - 1)]
+        workers = max(1, max_workers or min(len(starts), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(fit, starts))
+        _, best = min(results, key=lambda item: item[1].cost)
+        
+        # Standard errors from the Gauss-Newton covariance at the optimum
+        k0, Ea, order = unpack(best.x)
+        n_residuals = best.fun.size
+        dof = max(n_residuals - best.x.size, 1)
+        try:
+            covariance = np.linalg.pinv(best.jac.T @ best.jac) * (2 * best.cost / dof)
+            errors = np.sqrt(np.maximum(np.diag(covariance), 0.0))
+        except np.linalg.LinAlgError:
+            errors = np.full(best.x.size, np.nan)
+        
+        reactions = []
+        rows = []
+        for j, reaction in enumerate(self.reactions):
+            fitted = dict(reaction)
+            fitted["frequency_factor"] = float(k0[j])
+            fitted["activation_energy"] = float(Ea[j])
+            fitted["reaction_order"] = {comp: float(order[j, network["index"][comp]]) if comp in network["index"]
+                                        else value for comp, value in reaction.get("reaction_order", {}).items()}
+            reactions.append(fitted)
+            row = {
+                "reaction": reaction["name"],
+                "frequency_factor": fitted["frequency_factor"],
+                "activation_energy": fitted["activation_energy"],
+                "activation_energy_std": errors[n_reactions + j] * RT_ref,
+                "log_rate_constant_std": errors[j],
+            }
+            for position, (r, i) in enumerate(fitted_orders):
+                if r == j:
+                    row[f"order_{network['species'][i]}"] = order[j, i]
+                    row[f"order_{network['species'][i]}_std"] = errors[2 * n_reactions + position]
+            rows.append(row)
+        
+        if apply:
+            self.reactions = reactions
+        
+        return {
+            "reactions": reactions,
+            "parameters": pd.DataFrame(rows),
+            "rmse": float(np.sqrt(np.mean(best.fun**2))),
+            "starts": pd.DataFrame({"cost": [result.cost for _, result in results],
+                                    "nfev": [result.nfev for _, result in results],
+                                    "success": [result.success for _, result in results]})
+        }
+    
+    def replay_historian(self, input_path, output_path, chunk_size=50000, relative_tolerance=0.1,
+                         absolute_tolerance=1e-3):
+        """
+        Replay plant historian data through the steady-state model
+        
+        The CSV file is streamed chunk by chunk, so memory is bounded by
+        chunk_size whatever the file length. Each chunk is solved in one
+        batched call warm-started from the last steady state of the
+        previous chunk, and the predictions are appended to output_path
+        as soon as the chunk is done.
+        
+        Parameters:
+        -----------
+        input_path : str
+            CSV file with one row per time stamp: the operating point (see
+            _operating_data) and, optionally, measured outlet concentrations
+            in columns named after the species
+        output_path : str
+            CSV file written with the input columns followed by the
+            predictions "pred_<species>" and "pred_yield", the "converged"
+            flag, the deviations "dev_<species>" of the measured species and
+            a "deviation_flag"
+        chunk_size : int
+            Number of rows read and solved at a time
+        relative_tolerance, absolute_tolerance : float
+            A row is flagged when a measured concentration deviates from the
+            prediction by more than absolute_tolerance + relative_tolerance * |prediction|
+        
+        Returns:
+        --------
+        dict
+            Number of "rows", "flagged" rows and "not_converged" rows
+        """
+        network = self._compile_network()
+        species = network["species"]
+        summary = {"rows": 0, "flagged": 0, "not_converged": 0}
+        previous = None
+        
+        for number, chunk in enumerate(pd.read_csv(input_path, chunksize=chunk_size)):
+            temp, tau, recycle_ratio, feed = self._operating_data(network, chunk)
+            conc, converged = self._solve_steady_state_arrays(network, temp, tau, recycle_ratio, feed,
+                                                              initial=previous)
+            yields, _, _ = self._yield_array(network, conc, feed, recycle_ratio)
+            previous = conc[-1]
+            
+            output = chunk.copy()
+            for comp, i in network["index"].items():
+                output[f"pred_{comp}"] = conc[:, i]
+            output["pred_yield"] = yields
+            output["converged"] = converged
+            flags = np.zeros(len(chunk), dtype=bool)
+            for comp in species:
+                if comp in chunk:
+                    predicted = conc[:, network["index"][comp]]
+                    deviation = chunk[comp].to_numpy(dtype=float) - predicted
+                    output[f"dev_{comp}"] = deviation
+                    flags |= np.abs(deviation) > absolute_tolerance + relative_tolerance * np.abs(predicted)
+            output["deviation_flag"] = flags
+            output.to_csv(output_path, mode="w" if number == 0 else "a", header=number == 0, index=False)
+            
+            summary["rows"] += len(chunk)
+            summary["flagged"] += int(flags.sum())
+            summary["not_converged"] += int((~converged).sum())
+        
+        return summary
+    
+    def objective_function(self, temperature):
+        """Objective function for temperature optimization (maximize yield)"""
+        self.solve_steady_state(temperature)
+        yield_value = self.calculate_yield()
+        return -yield_value  # Negative because we're minimizing
+    
+    def objective_gradient(self, temperature):
+        """Objective function for temperature optimization and its exact derivative"""
+        temperature = float(np.ravel(temperature)[0])
+        sensitivities = self.calculate_sensitivities(temperature)
+        gradient = -sensitivities["yield_sensitivities"]["temperature"]
+        return -sensitivities["yield"], np.array([gradient])
+    
+    def optimize_temperature(self, bounds=(300, 1000), global_search=False):
+        """Find optimal temperature to maximize product yield
+        
+        With global_search=True, a dense batched sweep with parallel local
+        refinements is used instead (see optimize_temperature_global).
+        """
+        if global_search:
+            return self.optimize_temperature_global(bounds)["temperature"]
+        
+        # Test a more extensive grid of starting points
+        test_temps = np.linspace(bounds[0], bounds[1], 10)
+        best_yield = -1
+        best_temp = bounds[0]
+        
+        for temp in test_temps:
+            self.solve_steady_state(temp)
+            yield_value = self.calculate_yield()
+            if yield_value > best_yield:
+                best_yield = yield_value
+                best_temp = temp
+        
+        # Use best temperature as starting point for optimization
+        # Exact gradients from the implicit function theorem replace finite differences
+        result = minimize(
+            self.objective_gradient,
+            x0=[best_temp],
+            jac=True,
+            bounds=[bounds],
+            method='L-BFGS-B',
+            options={
+                'ftol': 1e-8,       # More stringent function tolerance
+                'gtol': 1e-6,       # More stringent gradient tolerance
+                'maxiter': 100,     # More iterations
+                'maxfun': 200,      # More function evaluations
+                'disp': False       # Don't display convergence messages
+            }
+        )
+        
+        # Verify that optimization actually improved the solution
+        optimal_temp = result.x[0]
+        optimal_yield = -result.fun  # Convert back from negative
+        
+        # If optimization didn't improve or only slightly improved the yield,
+        # try a more detailed search around the best test point
+        if optimal_yield <= best_yield * 1.01:  # Within 1% of best test point
+            # Do a finer local search 
+            local_bounds = (max(bounds[0], best_temp - 50), min(bounds[1], best_temp + 50))
+            local_temps = np.linspace(local_bounds[0], local_bounds[1], 20)
+            
+            for temp in local_temps:
+                self.solve_steady_state(temp)
+                yield_value = self.calculate_yield()
+                if yield_value > optimal_yield:
+                    optimal_yield = yield_value
+                    optimal_temp = temp
+            
+            # Try optimization again from this better starting point
+            result = minimize(
+                self.objective_gradient,
+                x0=[optimal_temp],
+                jac=True,
+                bounds=[local_bounds],
+                method='L-BFGS-B',
+                options={
+                    'ftol': 1e-10,      # Very stringent function tolerance
+                    'gtol': 1e-8,       # Very stringent gradient tolerance
+                    'maxiter': 200,     # More iterations
+                    'maxfun': 400,      # More function evaluations
+                }
+            )
+            
+            # Use the result if it improved the yield
+            if -result.fun > optimal_yield:
+                optimal_temp = result.x[0]
+        
+        # Apply the optimal temperature
+        self.temperature = optimal_temp
+        self.solve_steady_state(optimal_temp)
+        
+        return optimal_temp
+    
+    def optimize_temperature_global(self, bounds=(300, 1000), n_points=200, top_k=4, max_workers=None):
+        """
+        Global temperature optimization by parallel multi-start
+        
+        A dense grid of temperatures is solved in one batched call, so
+        narrow yield peaks missed by a coarse grid are still bracketed.
+        The top_k local maxima of the grid are then refined concurrently
+        with bounded L-BFGS-B and exact gradients, each inside the bracket
+        formed by its neighbouring grid points.
+        
+        Parameters:
+        -----------
+        bounds : tuple
+            Temperature bounds in K
+        n_points : int
+            Number of grid temperatures evaluated in the batch
+        top_k : int
+            Number of local maxima refined
+        max_workers : int, optional
+            Number of threads for the refinements
+        
+        Returns:
+        --------
+        dict
+            Optimal "temperature" and "yield", the "grid" DataFrame of the
+            batched sweep and the "candidates" DataFrame of every refinement
+        """
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        tau = self.volume / self.flow_rate
+        recycle_ratio = self.recycle_ratio
+        
+        # Dense sweep in one vectorized solve
+        temps = np.linspace(bounds[0], bounds[1], max(int(n_points), 2))
+        grid_conc, grid_converged = self._solve_steady_state_arrays(network, temps, tau, recycle_ratio, feed)
+        grid_yields, _, _ = self._yield_array(network, grid_conc, feed, recycle_ratio)
+        
+        # Local maxima of the sweep, endpoints included, best first
+        padded = np.concatenate([[-np.inf], grid_yields, [-np.inf]])
+        peaks = np.flatnonzero((grid_yields >= padded[:-2]) & (grid_yields >= padded[2:]))
+        peaks = peaks[np.argsort(-grid_yields[peaks], kind="stable")][:top_k]
+        
+        def refine(index):
+            local_bounds = (temps[max(index - 1, 0)], temps[min(index + 1, len(temps) - 1)])
+            state = {"conc": grid_conc[index]}
+            
+            def objective(x):
+                temp = float(np.ravel(x)[0])
+                conc, _ = self._solve_steady_state_arrays(network, temp, tau, recycle_ratio, feed,
+                                                          initial=state["conc"])
+                state["conc"] = conc[0]
+                yields, dyield_dconc, _ = self._yield_array(network, conc, feed, recycle_ratio)
+                sens = self._steady_state_sensitivities(network, conc, temp, tau, recycle_ratio, feed)
+                return -yields[0], np.array([-dyield_dconc[0] @ sens["temperature"][0]])
+            
+            result = minimize(objective, x0=[temps[index]], jac=True, bounds=[local_bounds], method='L-BFGS-B',
+                              options={'ftol': 1e-12, 'gtol': 1e-10, 'maxiter': 100})
+            return index, local_bounds, result
+        
+        workers = max_workers or min(len(peaks), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            refinements = list(executor.map(refine, peaks))
+        
+        rows = []
+        for index, local_bounds, result in refinements:
+            # Keep the grid point if the refinement did not improve on it
+            improved = -result.fun >= grid_yields[index]
+            rows.append({
+                "start_temperature": temps[index],
+                "start_yield": grid_yields[index],
+                "lower_bound": local_bounds[0],
+                "upper_bound": local_bounds[1],
+                "temperature": result.x[0] if improved else temps[index],
+                "yield": -result.fun if improved else grid_yields[index],
+                "iterations": result.nit,
+                "success": result.success
+            })
+        candidates = pd.DataFrame(rows)
+        best = candidates.loc[candidates["yield"].idxmax()]
+        grid = pd.DataFrame({"temperature": temps, "yield": grid_yields, "converged": grid_converged})
+        
+        # Apply the optimal temperature
+        self.temperature = float(best["temperature"])
+        self.solve_steady_state(self.temperature)
+        
+        return {
+            "temperature": self.temperature,
+            "yield": self.calculate_yield(),
+            "grid": grid,
+            "candidates": candidates
+        }
+    
+    def _ratio_feed(self, base_feed, feed_ratio, key_index=0):
+        """
+        Feed concentrations for a given feed ratio and their derivative
+        
+        The feed ratio multiplies every co-reactant relative to the key
+        reactant (the first feed component) while the total feed
+        concentration is held constant, so 1.0 reproduces the base feed.
+        """
+        feed_ratio = np.asarray(feed_ratio, dtype=float)[..., None]
+        scaled_mask = np.ones_like(base_feed)
+        scaled_mask[key_index] = 0.0
+        weights = base_feed * np.where(scaled_mask > 0, feed_ratio, 1.0)
+        dweights = base_feed * scaled_mask
+        total = base_feed.sum()
+        weight_sum = weights.sum(axis=-1, keepdims=True)
+        feed = total * weights / weight_sum
+        dfeed = total * (dweights / weight_sum - weights * dweights.sum() / weight_sum**2)
+        return feed, dfeed
+    
+    def _operating_space(self, temp_bounds, flow_rate_bounds, recycle_bounds, feed_ratio_bounds):
+        """
+        Compiled network, feed and box of the operating variables
+        
+        The operating variables are (temperature, flow_rate, recycle_ratio,
+        feed_ratio). The flow rate defaults to half and twice the current
+        value and the feed ratio is fixed to 1.0 when feed_ratio_bounds is
+        None or the feed has a single component.
+        
+        Returns:
+        --------
+        network, base_feed, key_index, lower, upper
+        """
+        if flow_rate_bounds is None:
+            flow_rate_bounds = (0.5 * self.flow_rate, 2.0 * self.flow_rate)
+        if feed_ratio_bounds is None or len(self.feed_composition) < 2:
+            feed_ratio_bounds = (1.0, 1.0)
+        
+        network = self._compile_network()
+        base_feed = self._feed_vector(network)
+        key_index = network["index"][next(iter(self.feed_composition))]
+        lower = np.array([temp_bounds[0], flow_rate_bounds[0], recycle_bounds[0], feed_ratio_bounds[0]], dtype=float)
+        upper = np.array([temp_bounds[1], flow_rate_bounds[1], recycle_bounds[1], feed_ratio_bounds[1]], dtype=float)
+        return network, base_feed, key_index, lower, upper
+    
+    def _evaluate_operating_points(self, network, points, base_feed, key_index=0, initial=None, gradient=False):
+        """
+        Yield of a batch of operating points in one vectorized solve
+        
+        Parameters:
+        -----------
+        points : ndarray
+            Operating points with columns (temperature, flow_rate,
+            recycle_ratio, feed_ratio), shape (batch, 4)
+        base_feed : ndarray
+            Feed concentrations for a feed ratio of 1.0
+        initial : ndarray, optional
+            Warm-start concentrations for the Newton solver
+        gradient : bool
+            If True, also return the exact gradient of the yield with
+            respect to the four operating variables
+        
+        Returns:
+        --------
+        yields : ndarray
+        gradients : ndarray or None
+            Shape (batch, 4)
+        conc : ndarray
+            Steady-state concentrations, shape (batch, n_species)
+        converged : ndarray
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        temp, flow_rate, recycle_ratio, feed_ratio = points.T
+        tau = self.volume / flow_rate
+        feed, dfeed = self._ratio_feed(base_feed, feed_ratio, key_index)
+        
+        conc, converged = self._solve_steady_state_arrays(network, temp, tau, recycle_ratio, feed, initial)
+        yields, dyield_dconc, dyield_dfeed = self._yield_array(network, conc, feed, recycle_ratio)
+        if not gradient:
+            return yields, None, conc, converged
+        
+        sens = self._steady_state_sensitivities(network, conc, temp, tau, recycle_ratio, feed)
+        dconc_dratio = np.einsum("bij,bj->bi", sens["feed"], dfeed)
+        gradients = np.stack([
+            np.einsum("bi,bi->b", dyield_dconc, sens["temperature"]),
+            np.einsum("bi,bi->b", dyield_dconc, sens["residence_time"]) * (-self.volume / flow_rate**2),
+            np.einsum("bi,bi->b", dyield_dconc, sens["recycle_ratio"]),
+            np.einsum("bi,bi->b", dyield_dconc, dconc_dratio) + np.einsum("bi,bi->b", dyield_dfeed, dfeed),
+        ], axis=-1)
+        return yields, gradients, conc, converged
+    
+    def optimize_operating_point(self, temp_bounds=(300, 1000), flow_rate_bounds=None,
+                                 recycle_bounds=(0.0, 0.9), feed_ratio_bounds=(0.5, 2.0),
+                                 n_samples=64, n_starts=8, max_workers=None, seed=None):
+        """
+        Co-optimize temperature, flow rate, recycle ratio and feed ratio to maximize product yield
+        
+        A Latin hypercube of operating points is screened in one batched
+        solve, then bounded L-BFGS-B refinements with exact gradients are
+        started in parallel from the best samples. Solves are cached per
+        operating point and every refinement warm-starts Newton from its
+        previous steady state.
+        
+        Parameters:
+        -----------
+        temp_bounds : tuple
+            Temperature bounds in K
+        flow_rate_bounds : tuple, optional
+            Flow rate bounds in m³/s (defaults to half and twice the current flow rate)
+        recycle_bounds : tuple
+            Recycle ratio bounds (0-1)
+        feed_ratio_bounds : tuple or None
+            Bounds of the co-reactant to key reactant ratio relative to the
+            current feed (None keeps the feed unchanged)
+        n_samples : int
+            Number of Latin hypercube samples screened
+        n_starts : int
+            Number of local refinements
+        max_workers : int, optional
+            Number of threads for the refinements
+        seed : int, optional
+            Seed of the Latin hypercube for reproducibility
+        
+        Returns:
+        --------
+        dict
+            Optimal "temperature", "flow_rate", "residence_time", "recycle_ratio",
+            "feed_ratio", "feed_composition" and "yield", plus a "starts"
+            DataFrame describing every local refinement
+        """
+        network, base_feed, key_index, lower, upper = self._operating_space(
+            temp_bounds, flow_rate_bounds, recycle_bounds, feed_ratio_bounds)
+        span = upper - lower
+        
+        # Screen a Latin hypercube in one batched solve
+        sampler = qmc.LatinHypercube(d=4, seed=seed)
+        samples = lower + sampler.random(n_samples) * span
+        sample_yields, _, sample_conc, _ = self._evaluate_operating_points(network, samples, base_feed, key_index)
+        best_samples = np.argsort(-sample_yields, kind="stable")[:n_starts]
+        
+        cache = {}
+        
+        def refine(start):
+            state = {"conc": sample_conc[start]}
+            
+            def objective(unit):
+                key = tuple(np.round(unit, 12))
+                if key not in cache:
+                    point = lower + unit * span
+                    yields, gradients, conc, _ = self._evaluate_operating_points(
+                        network, point, base_feed, key_index, initial=state["conc"], gradient=True)
+                    cache[key] = (-yields[0], -gradients[0] * span)
+                    state["conc"] = conc[0]
+                return cache[key]
+            
+            unit_start = np.where(span > 0, (samples[start] - lower) / np.where(span > 0, span, 1.0), 0.0)
+            result = minimize(objective, x0=unit_start, jac=True, bounds=[(0.0, 1.0)] * 4, method='L-BFGS-B',
+                              options={'ftol': 1e-10, 'gtol': 1e-8, 'maxiter': 200})
+            return start, result
+        
+        workers = max_workers or min(len(best_samples), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            refinements = list(executor.map(refine, best_samples))
+        
+        rows = []
+        for start, result in refinements:
+            point = lower + result.x * span
+            rows.append({
+                "start_temperature": samples[start, 0],
+                "start_flow_rate": samples[start, 1],
+                "start_recycle_ratio": samples[start, 2],
+                "start_feed_ratio": samples[start, 3],
+                "start_yield": sample_yields[start],
+                "temperature": point[0],
+                "flow_rate": point[1],
+                "recycle_ratio": point[2],
+                "feed_ratio": point[3],
+                "yield": -result.fun,
+                "iterations": result.nit,
+                "success": result.success
+            })
+        starts = pd.DataFrame(rows)
+        best = starts.loc[starts["yield"].idxmax()]
+        
+        # Apply the optimal operating point
+        feed, _ = self._ratio_feed(base_feed, best["feed_ratio"], key_index)
+        self.temperature = float(best["temperature"])
+        self.flow_rate = float(best["flow_rate"])
+        self.recycle_ratio = float(best["recycle_ratio"])
+        self.feed_composition = {comp: float(feed[network["index"][comp]]) for comp in self.feed_composition}
+        self.solve_steady_state()
+        
+        return {
+            "temperature": self.temperature,
+            "flow_rate": self.flow_rate,
+            "residence_time": self.volume / self.flow_rate,
+            "recycle_ratio": self.recycle_ratio,
+            "feed_ratio": float(best["feed_ratio"]),
+            "feed_composition": dict(self.feed_composition),
+            "yield": self.calculate_yield(),
+            "starts": starts
+        }
+    
+    @staticmethod
+    def _non_dominated(objectives):
+        """
+        Mask of the non-dominated rows of a batch of objectives to maximize
+        
+        A row is dominated when another row is at least as good in every
+        objective and strictly better in one. Rows are compared in chunks
+        to bound the memory of the pairwise comparison.
+        """
+        objectives = np.asarray(objectives, dtype=float)
+        n_points = objectives.shape[0]
+        mask = np.ones(n_points, dtype=bool)
+        chunk = max(1, 2**22 // max(1, n_points * objectives.shape[1]))
+        for start in range(0, n_points, chunk):
+            block = objectives[start:start + chunk, None, :]
+            dominated = (np.all(objectives[None] >= block, axis=-1)
+                         & np.any(objectives[None] > block, axis=-1))
+            mask[start:start + chunk] = ~dominated.any(axis=1)
+        return mask
+    
+    def pareto_front(self, temp_bounds=(300, 1000), flow_rate_bounds=None, recycle_bounds=(0.0, 0.9),
+                     feed_ratio_bounds=None, n_samples=512, seed=None):
+        """
+        Pareto front of yield, throughput (flow rate) and key reactant conversion
+        
+        Operating points are drawn from a Latin hypercube, solved in one
+        batched call and filtered by non-dominated sorting.
+        
+        Parameters:
+        -----------
+        temp_bounds : tuple
+            Temperature bounds in K
+        flow_rate_bounds : tuple, optional
+            Flow rate bounds in m³/s (defaults to half and twice the current flow rate)
+        recycle_bounds : tuple
+            Recycle ratio bounds (0-1)
+        feed_ratio_bounds : tuple, optional
+            Bounds of the co-reactant to key reactant ratio (see
+            optimize_operating_point); None keeps the feed unchanged
+        n_samples : int
+            Number of operating points evaluated
+        seed : int, optional
+            Seed of the Latin hypercube for reproducibility
+        
+        Returns:
+        --------
+        DataFrame
+            Non-dominated operating points with columns "temperature",
+            "flow_rate", "residence_time", "recycle_ratio", "feed_ratio",
+            "yield" and "conversion", sorted by flow rate
+        """
+        network, base_feed, key_index, lower, upper = self._operating_space(
+            temp_bounds, flow_rate_bounds, recycle_bounds, feed_ratio_bounds)
+        
+        sampler = qmc.LatinHypercube(d=4, seed=seed)
+        points = lower + sampler.random(n_samples) * (upper - lower)
+        yields, _, conc, converged = self._evaluate_operating_points(network, points, base_feed, key_index)
+        feed, _ = self._ratio_feed(base_feed, points[:, 3], key_index)
+        key_feed = feed[:, key_index]
+        conversion = np.where(key_feed > 0, (key_feed - conc[:, key_index]) / np.where(key_feed > 0, key_feed, 1.0), 0.0)
+        
+        # Only converged steady states compete for the front
+        objectives = np.column_stack([yields, points[:, 1], conversion])[converged]
+        front = np.flatnonzero(converged)[self._non_dominated(objectives)]
+        
+        return pd.DataFrame({
+            "temperature": points[front, 0],
+            "flow_rate": points[front, 1],
+            "residence_time": self.volume / points[front, 1],
+            "recycle_ratio": points[front, 2],
+            "feed_ratio": points[front, 3],
+            "yield": yields[front],
+            "conversion": conversion[front]
+        }).sort_values("flow_rate", ignore_index=True)
+    
+    def train_surrogate(self, temp_bounds=(300, 1000), flow_rate_bounds=None, recycle_bounds=(0.0, 0.9),
+                        feed_ratio_bounds=None, n_samples=400, n_validation=100, kernel="thin_plate_spline",
+                        smoothing=0.0, max_workers=None, seed=None):
+        """
+        Fit a radial basis function surrogate of the yield and outlet concentrations
+        
+        Training and validation points are drawn from Latin hypercubes over
+        the operating variables (see optimize_operating_point) and solved
+        in parallel batches. The surrogate is validated against the held-out
+        exact solves.
+        
+        Parameters:
+        -----------
+        temp_bounds, flow_rate_bounds, recycle_bounds, feed_ratio_bounds : tuple
+            Bounds of the operating space (see optimize_operating_point)
+        n_samples : int
+            Number of training points
+        n_validation : int
+            Number of held-out validation points
+        kernel : str
+            Kernel of scipy.interpolate.RBFInterpolator
+        smoothing : float
+            Smoothing parameter of the RBF fit (0 interpolates exactly)
+        max_workers : int, optional
+            Number of threads for the batched solves
+        seed : int, optional
+            Seed of the sampling for reproducibility
+        
+        Returns:
+        --------
+        SurrogateModel
+            Fitted surrogate with its "validation" errors
+        """
+        network, base_feed, key_index, lower, upper = self._operating_space(
+            temp_bounds, flow_rate_bounds, recycle_bounds, feed_ratio_bounds)
+        rng = np.random.default_rng(seed)
+        train_points = lower + qmc.LatinHypercube(d=4, seed=rng).random(n_samples) * (upper - lower)
+        test_points = lower + qmc.LatinHypercube(d=4, seed=rng).random(n_validation) * (upper - lower)
+        points = np.vstack([train_points, test_points])
+        
+        # Solve every point in parallel batches
+        workers = max(1, max_workers or os.cpu_count() or 1)
+        chunks = np.array_split(points, min(workers, len(points)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            solved = list(executor.map(
+                lambda chunk: self._evaluate_operating_points(network, chunk, base_feed, key_index), chunks))
+        yields = np.concatenate([result[0] for result in solved])
+        conc = np.concatenate([result[2] for result in solved])
+        converged = np.concatenate([result[3] for result in solved])
+        outputs = np.column_stack([yields, conc])
+        
+        train = np.arange(len(points)) < n_samples
+        surrogate = SurrogateModel(points[train & converged], outputs[train & converged], lower, upper,
+                                   list(network["species"]), kernel=kernel, smoothing=smoothing,
+                                   metadata={"feed_composition": dict(self.feed_composition),
+                                             "reactions": [reaction.get("name", "") for reaction in self.reactions],
+                                             "target_product": self.target_product,
+                                             "volume": self.volume})
+        
+        held_out = ~train & converged
+        if held_out.any():
+            predicted_yields, predicted_conc = surrogate.predict(points[held_out])
+            yield_errors = np.abs(predicted_yields - yields[held_out])
+            conc_errors = np.abs(predicted_conc - conc[held_out])
+            surrogate.validation = {
+                "n_validation": int(held_out.sum()),
+                "yield_rmse": float(np.sqrt(np.mean(yield_errors**2))),
+                "yield_max_error": float(yield_errors.max()),
+                "concentration_rmse": dict(zip(network["species"], np.sqrt(np.mean(conc_errors**2, axis=0)).tolist()))
+            }
+        return surrogate
+    
+    def screen_with_surrogate(self, surrogate, n_candidates=10000, n_confirm=5, seed=None):
+        """
+        Screen operating points with a surrogate and confirm the best with exact solves
+        
+        The best candidates are confirmed in one batched solve that leaves
+        the simulator untouched, and only the best converged candidate is
+        applied.
+        
+        Parameters:
+        -----------
+        surrogate : SurrogateModel
+            Surrogate trained for this process (see train_surrogate)
+        n_candidates : int
+            Number of candidates predicted by the surrogate
+        n_confirm : int
+            Number of best candidates confirmed with exact solves
+        seed : int, optional
+            Seed of the candidate sampling for reproducibility
+        
+        Returns:
+        --------
+        dict
+            Confirmed optimal "temperature", "flow_rate", "residence_time",
+            "recycle_ratio", "feed_ratio", "feed_composition" and "yield",
+            plus a "candidates" DataFrame with predicted and exact yields
+        """
+        network = self._compile_network()
+        metadata = surrogate.metadata
+        mismatched = []
+        if list(surrogate.species) != list(network["species"]):
+            mismatched.append("species")
+        if "reactions" in metadata and list(metadata["reactions"]) != [
+                reaction.get("name", "") for reaction in self.reactions]:
+            mismatched.append("reactions")
+        if "target_product" in metadata and metadata["target_product"] != self.target_product:
+            mismatched.append("target_product")
+        if "volume" in metadata and not np.isclose(metadata["volume"], self.volume):
+            mismatched.append("volume")
+        if mismatched:
+            raise ValueError(f"Surrogate was trained for a different process ({', '.join(mismatched)})")
+        
+        sampler = qmc.LatinHypercube(d=4, seed=seed)
+        points = surrogate.lower + sampler.random(n_candidates) * (surrogate.upper - surrogate.lower)
+        predicted, _ = surrogate.predict(points)
+        best = np.argsort(-predicted, kind="stable")[:n_confirm]
+        
+        base_composition = dict(metadata.get("feed_composition", self.feed_composition))
+        base_feed = self._feed_vector(network, base_composition)
+        key_index = network["index"][next(iter(base_composition))]
+        
+        # Confirm the best candidates in one batched solve
+        yields, _, _, converged = self._evaluate_operating_points(network, points[best], base_feed, key_index)
+        candidates = pd.DataFrame({
+            "temperature": points[best, 0],
+            "flow_rate": points[best, 1],
+            "recycle_ratio": points[best, 2],
+            "feed_ratio": points[best, 3],
+            "predicted_yield": predicted[best],
+            "yield": yields,
+            "converged": converged
+        })
+        if not converged.any():
+            raise RuntimeError("No confirmation solve of the surrogate candidates converged")
+        optimum = candidates.loc[candidates["yield"].where(candidates["converged"]).idxmax()]
+        
+        # Apply the best confirmed operating point
+        feed, _ = self._ratio_feed(base_feed, optimum["feed_ratio"], key_index)
+        self.temperature = float(optimum["temperature"])
+        self.flow_rate = float(optimum["flow_rate"])
+        self.recycle_ratio = float(optimum["recycle_ratio"])
+        self.feed_composition = {comp: float(feed[network["index"][comp]]) for comp in base_composition}
+        self.solve_steady_state()
+        
+        return {
+            "temperature": self.temperature,
+            "flow_rate": self.flow_rate,
+            "residence_time": self.volume / self.flow_rate,
+            "recycle_ratio": self.recycle_ratio,
+            "feed_ratio": float(optimum["feed_ratio"]),
+            "feed_composition": dict(self.feed_composition),
+            "yield": self.calculate_yield(),
+            "candidates": candidates
+        }
+    
+    def build_response_table(self, path, temp_bounds=None, temp_points=41, tau_bounds=(1.0, 1e4),
+                             tau_points=25, recycle_bounds=(0.0, 0.9), recycle_points=19, name=None):
+        """
+        Precompute steady states on a (temperature, residence time, recycle ratio) grid
+        
+        The whole grid is solved in one batched call and written as a .npy
+        array next to a .json file describing the grid and the process, so
+        that ResponseTable can memory-map it and interpolate instantly.
+        
+        Parameters:
+        -----------
+        path : str
+            Output path without extension
+        temp_bounds : tuple, optional
+            Temperature bounds in K (defaults to ±50 K around the current temperature)
+        temp_points : int
+            Number of temperatures of the grid
+        tau_bounds : tuple
+            Residence time bounds in s (the grid is logarithmic)
+        tau_points : int
+            Number of residence times of the grid
+        recycle_bounds : tuple
+            Recycle ratio bounds (0-1)
+        recycle_points : int
+            Number of recycle ratios of the grid
+        name : str, optional
+            Name of the process stored with the table
+        
+        Returns:
+        --------
+        str
+            Path of the table (without extension)
+        """
+        if temp_bounds is None:
+            temp_bounds = (self.temperature - 50, self.temperature + 50)
+        network = self._compile_network()
+        feed = self._feed_vector(network)
+        temps = np.linspace(temp_bounds[0], temp_bounds[1], temp_points)
+        taus = np.geomspace(tau_bounds[0], tau_bounds[1], tau_points)
+        recycles = np.linspace(recycle_bounds[0], recycle_bounds[1], recycle_points)
+        
+        T, tau, R = np.meshgrid(temps, taus, recycles, indexing="ij")
+        conc, converged = self._solve_steady_state_arrays(network, T.ravel(), tau.ravel(), R.ravel(), feed)
+        yields, _, _ = self._yield_array(network, conc, feed, R.ravel())
+        
+        # Last two channels hold the yield and the convergence flag
+        values = np.column_stack([conc, yields, converged]).reshape(T.shape + (-1,))
+        np.save(path + ".npy", values)
+        metadata = {
+            "name": name,
+            "species": list(network["species"]),
+            "temperature": temps.tolist(),
+            "residence_time": taus.tolist(),
+            "recycle_ratio": recycles.tolist(),
+            "reactions": self.reactions,
+            "feed_composition": self.feed_composition,
+            "target_product": self.target_product,
+            "catalyst": self.catalyst
+        }
+        with open(path + ".json", "w") as file:
+            json.dump(metadata, file, indent=2)
+        return path
+    
+    def calculate_reaction_rates(self, temperature=None):
+        """Calculate reaction rates at current conditions"""
+        if temperature is None:
+            temperature = self.temperature
+        
+        network = self._compile_network()
+        rate, _ = self._kinetics(network, self._feed_vector(network, self.concentrations), temperature)
+        rates = {}
+        for i, reaction in enumerate(self.reactions):
+            rates[f"Reaction {i+1}: {reaction['name']}"] = float(rate[i])
+        
+        return rates
+    
+    def run_simulation(self, optimize_temp=True, temp_bounds=(300, 1000)):
+        """Run a complete simulation with optimization"""
+        # First solve without optimization
+        self.solve_steady_state()
+        
+        # Optimize temperature if requested
+        if optimize_temp:
+            optimal_temp = self.optimize_temperature(temp_bounds)
+        else:
+            optimal_temp = self.temperature
+        
+        # Final solution at optimal temperature
+        final_concentrations = self.solve_steady_state(optimal_temp)
+        
+        # Calculate product yield
+        product_yield = self.calculate_yield()
+        
+        # Calculate reaction rates
+        reaction_rates = self.calculate_reaction_rates()
+        
+        # Calculate conversions
+        conversions = self.calculate_conversion()
+        
+        # Calculate recycle stream composition
+        recycle_stream = {comp: conc * self.recycle_ratio 
+                         for comp, conc in final_concentrations.items()}
+
+        # Perform final mass balance check on the conserved moieties
+        mass_balance_error = self._verify_mass_balance(self.feed_composition, final_concentrations)
+        
+        # Calculate elemental balance
+        elemental_balance = self._calculate_elemental_balance(final_concentrations)
+        
+        # Prepare results
+        results = {
+            "temperature": optimal_temp,
+            "concentrations": final_concentrations,
+            "recycle_stream": recycle_stream,
+            "yield": product_yield,
+            "reaction_rates": reaction_rates,
+            "conversions": conversions,
+            "residence_time": self.volume / self.flow_rate,
+            "catalyst": self.catalyst,
+            "mass_balance_error": mass_balance_error,
+            "elemental_balance": elemental_balance
+        }
+        
+        return results
+        
+    @classmethod
+    def _parse_formula(cls, formula):
+        """
+        Count the atoms of each element in a molecular formula
+        
+        Handles nested groups with multipliers, e.g. "(CH3)2CO" or
+        "C6H5CH(CH3)2"; bond characters "=", "#" and "-" are ignored.
+        Raises ValueError for names that are not formulas.
+        """
+        stack = [{}]
+        for symbol, count, token in re.findall(r"([A-Z][a-z]?)(\d*)|(\)\d*|\(|[=#-]|.)", formula):
+            if symbol:
+                if symbol not in cls.ELEMENT_SYMBOLS:
+                    raise ValueError(f"Unknown element {symbol} in {formula}")
+                stack[-1][symbol] = stack[-1].get(symbol, 0) + int(count or 1)
+            elif token == "(":
+                stack.append({})
+            elif token.startswith(")"):
+                if len(stack) == 1:
+                    raise ValueError(f"Unbalanced parentheses in {formula}")
+                group, multiplier = stack.pop(), int(token[1:] or 1)
+                for element, atoms in group.items():
+                    stack[-1][element] = stack[-1].get(element, 0) + atoms * multiplier
+            elif token not in "=#-":
+                raise ValueError(f"Unexpected character {token!r} in {formula}")
+        if len(stack) != 1 or not stack[0]:
+            raise ValueError(f"Invalid formula {formula}")
+        return stack[0]
+    
+    def _element_matrix(self, species):
+        """
+        Element matrix (n_elements, n_species) of a species list
+        
+        Species names are parsed as molecular formulas (after lookup in
+        self.formulas) once per species list and the result is cached.
+        Elements are in Hill order (C, H, then alphabetical); species that
+        cannot be parsed get a zero column and are listed as unparsed.
+        """
+        formulas = getattr(self, "formulas", {})
+        key = (tuple(species), tuple(sorted(formulas.items())))
+        cache = getattr(self, "_element_cache", None)
+        if cache is not None and cache["key"] == key:
+            return cache
+        
+        parsed, unparsed = {}, []
+        for comp in species:
+            try:
+                parsed[comp] = self._parse_formula(formulas.get(comp, comp))
+            except ValueError:
+                unparsed.append(comp)
+        elements = sorted({element for atoms in parsed.values() for element in atoms},
+                          key=lambda element: ({"C": 0, "H": 1}.get(element, 2), element))
+        row = {element: i for i, element in enumerate(elements)}
+        matrix = np.zeros((len(elements), len(species)))
+        for j, comp in enumerate(species):
+            for element, atoms in parsed.get(comp, {}).items():
+                matrix[row[element], j] = atoms
+        
+        self._element_cache = {"key": key, "species": list(species), "elements": elements,
+                               "matrix": matrix, "unparsed": unparsed}
+        return self._element_cache
+    
+    def _calculate_elemental_balance(self, concentrations):
+        """
+        Check the elemental balance between the feed and the outlet
+        
+        Species names are parsed into an element matrix E, so the balance of
+        every element is the single product E (C_out - C_feed), which holds
+        for mole-changing reactions as well. Nothing is rescaled.
+        
+        Returns:
+        --------
+        dict
+            Total input and output concentrations and their difference in
+            percent, "elements" mapping each element to its "input" and
+            "output" atom concentrations and "error_percent", the largest
+            absolute "max_error_percent", the "unbalanced_reactions" whose
+            stoichiometry does not conserve the elements and the
+            "unparsed_species" left out of the check
+        """
+        species = list(dict.fromkeys([*self.feed_composition, *concentrations]))
+        table = self._element_matrix(species)
+        inlet = np.array([self.feed_composition.get(comp, 0.0) for comp in species], dtype=float)
+        outlet = np.array([concentrations.get(comp, 0.0) for comp in species], dtype=float)
+        element_in = table["matrix"] @ inlet
+        element_out = table["matrix"] @ outlet
+        error_percent = (element_out - element_in) / np.where(element_in > 0, element_in, 1.0) * 100
+        
+        column = {comp: j for j, comp in enumerate(species)}
+        unbalanced = []
+        for reaction in getattr(self, "reactions", []):
+            change = np.zeros(len(table["elements"]))
+            for comp, stoich in reaction["stoichiometry"].items():
+                if comp in column:
+                    change += stoich * table["matrix"][:, column[comp]]
+            if np.abs(change).max(initial=0.0) > 1e-9:
+                unbalanced.append(reaction.get("name", ""))
+        
+        total_input = inlet.sum()
+        total_output = outlet.sum()
+        return {
+            "total_input_conc": total_input,
+            "total_output_conc": total_output,
+            "difference_percent": (total_output - total_input) / total_input * 100 if total_input > 0 else 0,
+            "elements": {element: {"input": element_in[i], "output": element_out[i],
+                                   "error_percent": error_percent[i]}
+                         for i, element in enumerate(table["elements"])},
+            "max_error_percent": float(np.abs(error_percent).max(initial=0.0)),
+            "unbalanced_reactions": unbalanced,
+            "unparsed_species": list(table["unparsed"]),
+        }
+    
+    def print_results(self, results=None):
+        """Print simulation results in a formatted way"""
+        if results is None:
+            results = self.run_simulation()
+        
+        print("\n===== CSTR SIMULATION RESULTS =====")
+        print(f"Optimal Temperature: {results['temperature']:.2f} K")
+        print(f"Product Yield: {results['yield']*100:.2f}%")
+        
+        if results.get('catalyst'):
+            print(f"Catalyst: {results['catalyst']}")
+        else:
+            print("Catalyst: None")
+        
+        print("\nSteady State Concentrations (mol/m³):")
+        for component, conc in results["concentrations"].items():
+            if component == self.target_product:
+                print(f"  {component}: {conc:.4f} (TARGET PRODUCT)")
+            else:
+                print(f"  {component}: {conc:.4f}")
+        
+        print("\nRecycle Stream Concentrations (mol/m³):")
+        for component, conc in results["recycle_stream"].items():
+            print(f"  {component}: {conc:.4f}")
+        
+        print("\nFresh Feed Concentrations (mol/m³):")
+        for component, conc in self.feed_composition.items():
+            print(f"  {component}: {conc:.4f}")
+        
+        print(f"\nExit Flow Rate: {self.flow_rate:.4f} m³/s")
+        print(f"Residence Time: {results['residence_time']:.2f} s")
+        
+        print("\nReaction Rates (mol/m³·s):")
+        for name, rate in results["reaction_rates"].items():
+            print(f"  {name}: {rate:.6f}")
+        
+        print("\nReactant Conversions:")
+        for component, conversion in results["conversions"].items():
+            if component in self.feed_composition:
+                print(f"  {component}: {conversion*100:.2f}%")
+        
+        # Print mass balance information
+        if "mass_balance_error" in results:
+            print(f"\nMass Balance Error: {results['mass_balance_error']*100:.4f}%")
+        
+        if "elemental_balance" in results:
+            eb = results["elemental_balance"]
+            print("\nMass Balance Check:")
+            print(f"  Total Input Concentration: {eb['total_input_conc']:.4f} mol/m³")
+            print(f"  Total Output Concentration: {eb['total_output_conc']:.4f} mol/m³")
+            print(f"  Difference: {eb['difference_percent']:.4f}%")
+            for element, balance in eb.get("elements", {}).items():
+                print(f"  {element}: in {balance['input']:.4f}, out {balance['output']:.4f} mol/m³ "
+                      f"({balance['error_percent']:.2e}%)")
+            if eb.get("unbalanced_reactions"):
+                print(f"  Unbalanced reactions: {', '.join(eb['unbalanced_reactions'])}")
+        
+        print("\n==================================")
+        
+        return results
+    
+    def create_visualization(self, results=None):
+        """Create visualization of simulation results"""
+        if results is None:
+            results = self.run_simulation()
+        
+        fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+        
+        # 1. Plot steady state concentrations
+        components = list(results["concentrations"].keys())
+        concentrations = [results["concentrations"][comp] for comp in components]
+        
+        bar_colors = ['#1f77b4' if comp != self.target_product else '#ff7f0e' 
+                      for comp in components]
+        
+        axes[0, 0].bar(components, concentrations, color=bar_colors)
+        axes[0, 0].set_ylabel('Concentration (mol/m³)')
+        axes[0, 0].set_title('Steady State Concentrations')
+        axes[0, 0].grid(axis='y', linestyle='--', alpha=0.7)
+        
+        for i, v in enumerate(concentrations):
+            axes[0, 0].text(i, v + 0.05*max(concentrations), f"{v:.3f}", ha='center')
+        
+        # 2. Plot temperature effect on yield
+        if self.target_product:
+            # Calculate yield at different temperatures
+            temps = np.linspace(max(300, results['temperature']-200), 
+                               min(1200, results['temperature']+200), 15)
+            yields = []
+            
+            for temp in temps:
+                self.solve_steady_state(temp)
+                yields.append(self.calculate_yield())
+            
+            # Reset to original results
+            self.solve_steady_state(results['temperature'])
+            
+            axes[0, 1].plot(temps, yields, 'b-')
+            axes[0, 1].scatter([results['temperature']], [results['yield']], 
+                             color='red', s=100)
+            axes[0, 1].set_xlabel('Temperature (K)')
+            axes[0, 1].set_ylabel('Product Yield')
+            axes[0, 1].set_title('Temperature Effect on Yield')
+            axes[0, 1].grid(True, linestyle='--', alpha=0.7)
+            axes[0, 1].text(results['temperature'], results['yield'], 
+                          f"Optimal: {results['temperature']:.1f}K", 
+                          ha='right', va='bottom')
+        
+        # 3. Plot feed, recycle, and product composition
+        comp_list = components
+        x = np.arange(len(comp_list))
+        width = 0.25
+        
+        feed_values = [self.feed_composition.get(comp, 0) for comp in comp_list]
+        recycle_values = [results["recycle_stream"].get(comp, 0) for comp in comp_list]
+        outlet_values = [results["concentrations"].get(comp, 0) for comp in comp_list]
+        
+        axes[1, 0].bar(x - width, feed_values, width=width, label='Fresh Feed')
+        axes[1, 0].bar(x, recycle_values, width=width, label='Recycle')
+        axes[1, 0].bar(x + width, outlet_values, width=width, label='Outlet')
+        
+        axes[1, 0].set_xlabel('Components')
+        axes[1, 0].set_ylabel('Concentration (mol/m³)')
+        axes[1, 0].set_title('Feed vs Recycle vs Outlet Composition')
+        axes[1, 0].set_xticks(x)
+        axes[1, 0].set_xticklabels(comp_list)
+        axes[1, 0].legend()
+        axes[1, 0].grid(axis='y', linestyle='--', alpha=0.7)
+        
+        # 4. Plot conversions
+        if results["conversions"]:
+            components = []
+            conv_values = []
+            
+            for comp, conv in results["conversions"].items():
+                if comp in self.feed_composition and self.feed_composition[comp] > 0:
+                    components.append(comp)
+                    conv_values.append(conv * 100)  # Convert to percentage
+            
+            if components:
+                axes[1, 1].bar(components, conv_values, color='#2ca02c')
+                axes[1, 1].set_ylabel('Conversion (%)')
+                axes[1, 1].set_title('Reactant Conversion')
+                axes[1, 1].grid(axis='y', linestyle='--', alpha=0.7)
+                
+                for i, v in enumerate(conv_values):
+                    axes[1, 1].text(i, v + 1, f"{v:.1f}%", ha='center')
+        
+        plt.tight_layout()
+        
+        return fig, axes
+
+
+class ResponseTable:
+    """
+    Memory-mapped response-surface table of precomputed steady states
+    
+    Serves trilinearly interpolated concentrations and yields over
+    (temperature, log residence time, recycle ratio). Points outside the
+    grid are clamped to its bounds. An exact steady-state solve is
+    available on demand, and replaces the interpolation in lookup when a
+    corner of the enclosing cell did not converge.
+    """
+    
+    def __init__(self, path):
+        with open(path + ".json") as file:
+            self.metadata = json.load(file)
+        self.values = np.load(path + ".npy", mmap_mode="r")
+        # Plain ndarray view of the mapping, which avoids memmap overhead on every gather
+        self._data = np.asarray(self.values)
+        self._corners = (np.arange(8)[None, :] >> np.arange(3)[:, None]) & 1
+        self.species = self.metadata["species"]
+        self.axes = [
+            np.asarray(self.metadata["temperature"]),
+            np.log(self.metadata["residence_time"]),
+            np.asarray(self.metadata["recycle_ratio"])
+        ]
+        self._simulator = None
+    
+    @staticmethod
+    def file_stem(name):
+        """File name used for the table of a process"""
+        return "".join(c if c.isalnum() else "_" for c in name).strip("_").lower()
+    
+    def interpolate(self, temperature, residence_time, recycle_ratio):
+        """
+        Interpolate the table at a batch of operating points
+        
+        Returns:
+        --------
+        conc : ndarray
+            Concentrations with shape (batch, n_species)
+        yields : ndarray
+            Product yields, shape (batch,)
+        converged : ndarray
+            True where every corner entering the interpolation converged
+        """
+        coords = np.broadcast_arrays(np.atleast_1d(np.asarray(temperature, dtype=float)),
+                                     np.log(np.atleast_1d(np.asarray(residence_time, dtype=float))),
+                                     np.atleast_1d(np.asarray(recycle_ratio, dtype=float)))
+        index = []
+        weight = 1.0
+        for axis, x, offsets in zip(self.axes, coords, self._corners):
+            if len(axis) == 1:
+                # Single-point axis: the upper corners repeat the node and get no weight
+                index.append(np.zeros((8,) + x.shape, dtype=int))
+                weight = weight * np.where(offsets[:, None] == 1, 0.0, 1.0)
+                continue
+            i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+            w = np.clip((x - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0)
+            index.append(i + offsets[:, None])
+            weight = weight * np.where(offsets[:, None] == 1, w, 1 - w)
+        
+        # Weighted sum over the 8 corners of the enclosing cell, in one gather
+        corners = self._data[index[0], index[1], index[2], :]
+        weight = np.broadcast_to(weight, corners.shape[:2])
+        result = np.einsum("cb,cbk->bk", weight, corners[..., :-1])
+        converged = ((corners[..., -1] > 0.5) | (weight == 0)).all(axis=0)
+        return result[:, :-1], result[:, -1], converged
+    
+    def lookup(self, temperature, residence_time, recycle_ratio):
+        """
+        Interpolated concentrations and yield at one operating point
+        
+        Falls back to the exact solve (with "exact" True) when a corner of
+        the enclosing cell did not converge.
+        """
+        conc, yields, converged = self.interpolate(temperature, residence_time, recycle_ratio)
+        if not converged[0]:
+            return self.exact(temperature, residence_time, recycle_ratio)
+        return {
+            "concentrations": dict(zip(self.species, conc[0].tolist())),
+            "yield": float(yields[0]),
+            "exact": False
+        }
+    
+    def exact(self, temperature, residence_time, recycle_ratio):
+        """Exact steady-state solve at one operating point"""
+        if self._simulator is None:
+            self._simulator = CSTRSimulator()
+            self._simulator.set_parameters(
+                volume=1.0,
+                temperature=temperature,
+                flow_rate=1.0,
+                reactions=self.metadata["reactions"],
+                feed_composition=self.metadata["feed_composition"],
+                target_product=self.metadata["target_product"],
+                catalyst=self.metadata["catalyst"]
+            )
+        simulator = self._simulator
+        simulator.flow_rate = simulator.volume / residence_time
+        simulator.recycle_ratio = recycle_ratio
+        concentrations = simulator.solve_steady_state(temperature)
+        return {
+            "concentrations": {comp: concentrations[comp] for comp in self.species},
+            "yield": simulator.calculate_yield(),
+            "exact": True
+        }
+
+
+class SurrogateModel:
+    """
+    Radial basis function surrogate of the steady state over the operating variables
+    
+    Maps (temperature, flow_rate, recycle_ratio, feed_ratio) to the yield
+    and outlet concentrations. Inputs are scaled to the unit box and
+    variables with fixed bounds are dropped from the fit.
+    """
+    
+    def __init__(self, inputs, outputs, lower, upper, species, kernel="thin_plate_spline", smoothing=0.0,
+                 metadata=None, validation=None):
+        self.inputs = np.asarray(inputs, dtype=float)
+        self.outputs = np.asarray(outputs, dtype=float)
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.species = list(species)
+        self.kernel = kernel
+        self.smoothing = smoothing
+        self.metadata = metadata or {}
+        self.validation = validation or {}
+        
+        self._active = self.upper > self.lower
+        self._interpolator = RBFInterpolator(self._scale(self.inputs), self.outputs,
+                                             kernel=kernel, smoothing=smoothing)
+    
+    def _scale(self, points):
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        span = np.where(self._active, self.upper - self.lower, 1.0)
+        return ((points - self.lower) / span)[:, self._active]
+    
+    def predict(self, points):
+        """
+        Predict the yield and outlet concentrations of a batch of operating points
+        
+        Returns:
+        --------
+        yields : ndarray
+            Predicted yields clipped to [0, 1], shape (batch,)
+        conc : ndarray
+            Predicted non-negative concentrations, shape (batch, n_species)
+        """
+        values = self._interpolator(self._scale(points))
+        return np.clip(values[:, 0], 0.0, 1.0), np.maximum(values[:, 1:], 0.0)
+    
+    def save(self, path):
+        """Save the training data and settings of the surrogate to a .npz file"""
+        np.savez(path, inputs=self.inputs, outputs=self.outputs, lower=self.lower, upper=self.upper,
+                 settings=json.dumps({"species": self.species, "kernel": self.kernel,
+                                      "smoothing": self.smoothing, "metadata": self.metadata,
+                                      "validation": self.validation}))
+        return path
+    
+    @classmethod
+    def load(cls, path):
+        """Load a surrogate saved with save (the RBF system is refitted)"""
+        with np.load(path) as data:
+            settings = json.loads(str(data["settings"]))
+            return cls(data["inputs"], data["outputs"], data["lower"], data["upper"], settings["species"],
+                       kernel=settings["kernel"], smoothing=settings["smoothing"],
+                       metadata=settings["metadata"], validation=settings["validation"])
+
+
+class SoftSensor:
+    """
+    Long-lived soft sensor around the steady-state model of a simulator
+    
+    Measurement records (operating points) are read one at a time from a
+    local stream and the predicted outlet composition and yield are
+    emitted for each record within a latency budget. The reaction network
+    is compiled once, per-record inputs go into preallocated buffers and
+    each solve is warm-started from the last converged steady state. The
+    solver stops at the latency budget and returns its best iterate, which
+    is reported with the quality flag "timeout" instead of "converged".
+    
+    Parameters:
+    -----------
+    simulator : CSTRSimulator
+        Simulator whose reactions, components and current operating point
+        (used for fields missing from a record) define the model
+    latency_budget : float
+        Time allowed per record in seconds
+    histogram_edges : array_like, optional
+        Bin edges of the latency histogram in seconds (log-spaced from
+        10 µs to 10 s by default)
+    window : int
+        Number of recent latencies kept for the percentiles of latency_summary
+    """
+    
+    def __init__(self, simulator, latency_budget=0.01, histogram_edges=None, window=4096):
+        self.simulator = simulator
+        self.latency_budget = latency_budget
+        self.network = simulator._compile_network()
+        self.species = list(self.network["species"])
+        n_species = len(self.species)
+        
+        # Preallocated per-record buffers
+        self._default_feed = simulator._feed_vector(self.network)
+        self._temp = np.empty(1)
+        self._tau = np.empty(1)
+        self._recycle = np.empty(1)
+        self._feed = np.empty((1, n_species))
+        self._previous = np.empty((1, n_species))
+        self._warm = False
+        self._feed_keys = [(f"feed_{comp}", i) for comp, i in self.network["index"].items()]
+        
+        # Latency statistics: fixed histogram plus a ring buffer of recent values
+        if histogram_edges is None:
+            histogram_edges = np.geomspace(1e-5, 10.0, 61)
+        self.histogram_edges = np.asarray(histogram_edges, dtype=float)
+        self.histogram_counts = np.zeros(len(self.histogram_edges) + 1, dtype=np.int64)
+        self._latencies = np.zeros(window)
+        self.records = 0
+        self.over_budget = 0
+        self.quality_counts = {"converged": 0, "timeout": 0, "failed": 0, "invalid": 0}
+    
+    def reset(self):
+        """Forget the warm start and the latency statistics"""
+        self._warm = False
+        self.histogram_counts[:] = 0
+        self._latencies[:] = 0.0
+        self.records = 0
+        self.over_budget = 0
+        for quality in self.quality_counts:
+            self.quality_counts[quality] = 0
+    
+    def _record_latency(self, latency):
+        self.histogram_counts[np.searchsorted(self.histogram_edges, latency, side="right")] += 1
+        self._latencies[self.records % len(self._latencies)] = latency
+        self.records += 1
+        self.over_budget += latency > self.latency_budget
+    
+    def predict(self, record, start=None):
+        """
+        Predict the outlet composition and yield for one measurement record
+        
+        Parameters:
+        -----------
+        record : dict
+            Operating point with the keys "temperature", "residence_time"
+            or "flow_rate", "recycle_ratio" and "feed_<component>"; missing
+            keys take the current simulator values
+        start : float, optional
+            time.perf_counter() value at which the record arrived, by
+            default the time of the call
+        
+        Returns:
+        --------
+        dict
+            Predicted concentrations "pred_<species>", "pred_yield", the
+            "quality" flag ("converged", "timeout" or "failed"), the scaled
+            "residual" norm of the prediction and the "latency" in seconds
+        """
+        if start is None:
+            start = time.perf_counter()
+        simulator = self.simulator
+        network = self.network
+        
+        self._temp[0] = record["temperature"]
+        if "residence_time" in record:
+            self._tau[0] = record["residence_time"]
+        else:
+            self._tau[0] = simulator.volume / record.get("flow_rate", simulator.flow_rate)
+        self._recycle[0] = record.get("recycle_ratio", simulator.recycle_ratio)
+        self._feed[0] = self._default_feed
+        for key, i in self._feed_keys:
+            if key in record:
+                self._feed[0, i] = record[key]
+        
+        conc, converged = simulator._solve_steady_state_arrays(
+            network, self._temp, self._tau, self._recycle, self._feed,
+            initial=self._previous if self._warm else None, deadline=start + self.latency_budget)
+        residual, _, _ = simulator._steady_state_residual(network, conc, self._temp, self._tau,
+                                                          self._recycle, self._feed)
+        yields, _, _ = simulator._yield_array(network, conc, self._feed, self._recycle)
+        
+        if converged[0]:
+            quality = "converged"
+            self._previous[:] = conc
+            self._warm = True
+        elif time.perf_counter() - start > self.latency_budget:
+            quality = "timeout"
+        else:
+            quality = "failed"
+        
+        prediction = {f"pred_{comp}": float(conc[0, i]) for comp, i in network["index"].items()}
+        prediction["pred_yield"] = float(yields[0])
+        prediction["quality"] = quality
+        prediction["residual"] = float(np.abs(residual[0]).max() / (1.0 + self._feed[0].max()))
+        prediction["latency"] = time.perf_counter() - start
+        self.quality_counts[quality] += 1
+        self._record_latency(prediction["latency"])
+        return prediction
+    
+    def run(self, stream, output=None, max_records=None):
+        """
+        Serve predictions for the JSON-lines records of a local stream
+        
+        Parameters:
+        -----------
+        stream : iterable of str
+            Source of records, one JSON object per line: an open file or
+            pipe (e.g. sys.stdin), socket.makefile("r") or SoftSensor.follow
+            for a file that is still being written. Blank lines are skipped.
+        output : file-like, optional
+            Receives one JSON line per record with the prediction (see
+            predict) and the record's "timestamp" when present; flushed
+            after every record. Records that cannot be parsed are reported
+            with the quality "invalid".
+        max_records : int, optional
+            Stop after this many records
+        
+        Returns:
+        --------
+        dict
+            Record counts per quality and the latency_summary
+        """
+        served = 0
+        for line in stream:
+            start = time.perf_counter()
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                prediction = self.predict(record, start)
+            except (ValueError, KeyError, TypeError) as error:
+                record = {}
+                prediction = {"quality": "invalid", "error": str(error)}
+                self.quality_counts["invalid"] += 1
+            if output is not None:
+                if isinstance(record, dict) and "timestamp" in record:
+                    prediction = {"timestamp": record["timestamp"], **prediction}
+                output.write(json.dumps(prediction) + "\n")
+                output.flush()
+            served += 1
+            if max_records is not None and served >= max_records:
+                break
+        
+        return {**self.quality_counts, "latency": self.latency_summary()}
+    
+    def latency_summary(self, percentiles=(50, 95, 99)):
+        """
+        Latency statistics of the served records
+        
+        Percentiles and the mean are computed from the most recent records
+        (up to window); the histogram and the over-budget count cover all
+        records since the last reset.
+        
+        Returns:
+        --------
+        dict
+            "count", "mean", "max", "p<percentile>" in seconds and
+            "over_budget", the number of records slower than latency_budget
+        """
+        recent = self._latencies[:min(self.records, len(self._latencies))]
+        summary = {"count": self.records}
+        if recent.size == 0:
+            return summary
+        summary["mean"] = float(recent.mean())
+        summary["max"] = float(recent.max())
+        for percentile, value in zip(percentiles, np.percentile(recent, percentiles)):
+            summary[f"p{percentile}"] = float(value)
+        summary["over_budget"] = self.over_budget
+        return summary
+    
+    @staticmethod
+    def follow(handle, poll_interval=0.05, idle_timeout=None):
+        """
+        Yield the lines appended to an open file, like tail -f
+        
+        Partial lines are held back until their newline arrives. Iteration
+        stops after idle_timeout seconds without new data (never by default).
+        """
+        pending = ""
+        idle_since = time.monotonic()
+        while True:
+            chunk = handle.readline()
+            if chunk:
+                pending += chunk
+                idle_since = time.monotonic()
+                if pending.endswith("\n"):
+                    yield pending
+                    pending = ""
+                continue
+            if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                if pending:
+                    yield pending
+                return
+            time.sleep(poll_interval)
+
+
+class PIDController:
+    """
+    Discrete PID controller for CSTRSimulator.simulate_closed_loop
+    
+    u = bias + kp e + ki integral(e) - kd dy/dt, with the derivative taken
+    on the measurement to avoid kicks on setpoint changes. The integral is
+    frozen while the output saturates (conditional integration).
+    
+    Parameters:
+    -----------
+    kp, ki, kd : float
+        Proportional, integral (1/s) and derivative (s) gains in input
+        units per unit of concentration
+    bias : float, optional
+        Output at zero error (defaults to the nominal input value)
+    bounds : tuple, optional
+        (lower, upper) limits of the manipulated input
+    """
+    
+    def __init__(self, kp, ki=0.0, kd=0.0, bias=None, bounds=None):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.bias = bias
+        self.bounds = bounds
+    
+    def setup(self, simulator, manipulated, controlled, conc, inputs, control_interval):
+        """Prepare the controller for a closed-loop simulation"""
+        if len(manipulated) != 1:
+            raise ValueError("PIDController manipulates a single input")
+        self.index = simulator._compile_network()["index"][controlled]
+        self.dt = control_interval
+        self.output_bias = inputs[manipulated[0]] if self.bias is None else self.bias
+        self.integral = 0.0
+        self.previous = None
+    
+    def update(self, t, conc, setpoint):
+        """Return the manipulated input for the measured concentrations"""
+        measurement = conc[self.index]
+        error = setpoint - measurement
+        derivative = 0.0 if self.previous is None else (measurement - self.previous) / self.dt
+        self.previous = measurement
+        
+        integral = self.integral + error * self.dt
+        output = self.output_bias + self.kp * error + self.ki * integral - self.kd * derivative
+        if self.bounds is not None:
+            limited = min(max(output, self.bounds[0]), self.bounds[1])
+            if limited != output and (limited - output) * error * self.ki < 0:
+                # Integrating further would only deepen the saturation
+                integral = self.integral
+                output = self.output_bias + self.kp * error + self.ki * integral - self.kd * derivative
+                limited = min(max(output, self.bounds[0]), self.bounds[1])
+            output = limited
+        self.integral = integral
+        return np.array([output])
+
+
+class LinearMPC:
+    """
+    Linear model predictive controller for CSTRSimulator.simulate_closed_loop
+    
+    The model is the state-space linearization (CSTRSimulator.linearize) at
+    the nominal operating point, discretized with a zero-order hold. The
+    prediction is condensed once into Y = Phi x + Psi w + Gamma U, so each
+    control interval only forms the linear term of the QP
+    min sum q (y - r)^2 + rho |dU|^2 and solves it with the Cholesky factor
+    computed at setup. When the unconstrained move violates the input
+    bounds, the box-constrained QP is solved by a primal-dual active-set
+    method (accelerated projected gradient if the active set cycles).
+    The one-step prediction error is used as a constant state
+    disturbance w, which removes steady-state offset from model mismatch.
+    Outputs are scaled by the largest feed concentration and inputs by
+    their nominal values, so the weights are dimensionless.
+    
+    Parameters:
+    -----------
+    horizon : int
+        Prediction horizon in control intervals
+    control_horizon : int
+        Number of free moves (later moves hold the last one)
+    output_weight, move_weight : float
+        Weights q of the tracking error and rho of the input moves
+    bounds : dict, optional
+        (lower, upper) limits for each manipulated input name
+    max_iterations : int
+        Iteration limit of the projected gradient fallback
+    """
+    
+    def __init__(self, horizon=20, control_horizon=5, output_weight=1.0, move_weight=0.01, bounds=None,
+                 max_iterations=500):
+        self.horizon = horizon
+        self.control_horizon = min(control_horizon, horizon)
+        self.output_weight = output_weight
+        self.move_weight = move_weight
+        self.bounds = bounds or {}
+        self.max_iterations = max_iterations
+    
+    def setup(self, simulator, manipulated, controlled, conc, inputs, control_interval):
+        """Linearize the plant and precompute the condensed QP matrices"""
+        network = simulator._compile_network()
+        species = network["species"]
+        feed = np.array([inputs[f"feed_{comp}"] for comp in species])
+        model = simulator.linearize(inputs["temperature"], inputs["flow_rate"], inputs["recycle_ratio"], feed)
+        missing = [name for name in manipulated if name not in model["inputs"]]
+        if missing:
+            raise ValueError(f"LinearMPC cannot manipulate {', '.join(missing)}")
+        columns = [model["inputs"].index(name) for name in manipulated]
+        n_states, n_inputs = len(species), len(manipulated)
+        N, M = self.horizon, self.control_horizon
+        
+        self.x_s = model["steady_state"]
+        self.u_s = np.array([inputs[name] for name in manipulated], dtype=float)
+        self.u_scale = np.where(self.u_s != 0, np.abs(self.u_s), 1.0)
+        self.y_scale = max(np.abs(feed).max(), 1e-12)
+        self.y_index = network["index"][controlled]
+        
+        # Zero-order hold discretization of the scaled model
+        augmented = np.zeros((n_states + n_inputs, n_states + n_inputs))
+        augmented[:n_states, :n_states] = model["A"]
+        augmented[:n_states, n_states:] = model["B"][:, columns] * self.u_scale
+        transition = expm(augmented * control_interval)
+        self.Ad = transition[:n_states, :n_states]
+        self.Bd = transition[:n_states, n_states:]
+        
+        # Condensed prediction of the scaled output over the horizon
+        output = np.zeros(n_states)
+        output[self.y_index] = 1.0 / self.y_scale
+        rows = [output]
+        for _ in range(N):
+            rows.append(rows[-1] @ self.Ad)
+        rows = np.array(rows)  # c Ad^i for i = 0..N
+        Phi = rows[1:]
+        Psi = np.cumsum(rows[:-1], axis=0)
+        Gamma = np.zeros((N, M * n_inputs))
+        for i in range(N):
+            for j in range(i + 1):
+                block = min(j, M - 1) * n_inputs
+                Gamma[i, block:block + n_inputs] += rows[i - j] @ self.Bd
+        
+        difference = np.eye(M * n_inputs) - np.eye(M * n_inputs, k=-n_inputs)
+        hessian = self.output_weight * Gamma.T @ Gamma + self.move_weight * difference.T @ difference
+        self._factor = cho_factor(hessian)
+        self._hessian = hessian
+        self._lipschitz = np.linalg.eigvalsh(hessian)[-1]
+        self._G_state = self.output_weight * Gamma.T @ Phi
+        self._G_disturbance = self.output_weight * Gamma.T @ Psi
+        self._G_setpoint = self.output_weight * Gamma.sum(axis=0)
+        self._G_previous = -self.move_weight * difference.T[:, :n_inputs]
+        
+        lower = np.array([self.bounds.get(name, (-np.inf, np.inf))[0] for name in manipulated], dtype=float)
+        upper = np.array([self.bounds.get(name, (-np.inf, np.inf))[1] for name in manipulated], dtype=float)
+        self._lower = np.tile((lower - self.u_s) / self.u_scale, M)
+        self._upper = np.tile((upper - self.u_s) / self.u_scale, M)
+        self._moves = np.zeros(M * n_inputs)
+        self._previous_state = None
+        self._previous_input = np.zeros(n_inputs)
+        self._disturbance = np.zeros(n_states)
+    
+    def _solve_box_qp(self, gradient):
+        moves = -cho_solve(self._factor, gradient)
+        if np.all((moves >= self._lower) & (moves <= self._upper)):
+            return moves
+        
+        # Primal-dual active set: bounds whose multiplier has the right sign
+        # stay active, violated bounds become active, the rest is solved exactly
+        at_lower, at_upper = moves < self._lower, moves > self._upper
+        for _ in range(2 * moves.size):
+            free = ~(at_lower | at_upper)
+            moves = np.where(at_lower, self._lower, np.where(at_upper, self._upper, 0.0))
+            if free.any():
+                moves[free] = -np.linalg.solve(self._hessian[np.ix_(free, free)],
+                                               gradient[free] + self._hessian[np.ix_(free, ~free)] @ moves[~free])
+            multiplier = np.where(free, 0.0, self._hessian @ moves + gradient)
+            next_lower = (multiplier + self._lower - moves > 0) & np.isfinite(self._lower)
+            next_upper = (moves - self._upper - multiplier > 0) & np.isfinite(self._upper)
+            if np.array_equal(next_lower, at_lower) and np.array_equal(next_upper, at_upper):
+                return moves
+            at_lower, at_upper = next_lower, next_upper
+        
+        # Accelerated projected gradient if the active set cycles,
+        # warm-started from the shifted previous plan
+        n_inputs = len(self._previous_input)
+        start = np.concatenate([self._moves[n_inputs:], self._moves[-n_inputs:]])
+        current = np.clip(start, self._lower, self._upper)
+        point, momentum = current, 1.0
+        for _ in range(self.max_iterations):
+            following = np.clip(point - (self._hessian @ point + gradient) / self._lipschitz,
+                                self._lower, self._upper)
+            if np.abs(following - current).max() <= 1e-10 * (1.0 + np.abs(current).max()):
+                current = following
+                break
+            next_momentum = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * momentum ** 2))
+            point = following + (momentum - 1.0) / next_momentum * (following - current)
+            current, momentum = following, next_momentum
+        return current
+    
+    def update(self, t, conc, setpoint):
+        """Return the manipulated inputs for the measured concentrations"""
+        state = conc - self.x_s
+        if self._previous_state is not None:
+            self._disturbance = state - self.Ad @ self._previous_state - self.Bd @ self._previous_input
+        reference = (setpoint - self.x_s[self.y_index]) / self.y_scale
+        gradient = (self._G_state @ state + self._G_disturbance @ self._disturbance
+                    - self._G_setpoint * reference + self._G_previous @ self._previous_input)
+        self._moves = self._solve_box_qp(gradient)
+        
+        n_inputs = len(self._previous_input)
+        self._previous_input = self._moves[:n_inputs].copy()
+        self._previous_state = state
+        return self.u_s + self.u_scale * self._previous_input
+
+
+class ReactorTrain:
+    """
+    Train of CSTRs in series with optional recycle from the last stage to the first
+    
+    Every stage is a CSTRSimulator with its own volume and temperature; all
+    stages share the reaction network, the flow rate and the feed of the
+    first stage. A fraction recycle_ratio of the last-stage outlet is
+    returned to the first stage, so the first stage is fed with
+    (1 - R) C_feed + R C_N. With many equal stages the train approaches a
+    plug flow reactor.
+    
+    The stage balances are solved simultaneously by Newton's method. The
+    Jacobian is block lower bidiagonal (each stage only sees its upstream
+    neighbour) plus one corner block for the recycle, so each Newton step
+    is a forward sweep of n_species-sized solves, with the recycle handled
+    by carrying the dependence on the last stage through the sweep. The
+    cost grows linearly with the number of stages.
+    
+    Parameters:
+    -----------
+    stages : list of CSTRSimulator
+        Stages in flow order, with identical reactions and species
+    recycle_ratio : float
+        Fraction of the last-stage outlet recycled to the first stage (0-1)
+    """
+    
+    def __init__(self, stages, recycle_ratio=0.0):
+        if not stages:
+            raise ValueError("A reactor train needs at least one stage")
+        self.stages = list(stages)
+        self.recycle_ratio = recycle_ratio
+        self.network = self.stages[0]._compile_network()
+        for stage in self.stages[1:]:
+            if stage._compile_network()["key"] != self.network["key"]:
+                raise ValueError("All stages of a reactor train must share the reaction network and species")
+        self.concentrations = None
+        self.converged = False
+    
+    @classmethod
+    def from_simulator(cls, simulator, n_stages, recycle_ratio=None):
+        """
+        Split the volume of a simulator into a train of equal stages
+        
+        Parameters:
+        -----------
+        simulator : CSTRSimulator
+            Reactor whose volume, temperature, flow rate, reactions and feed are used
+        n_stages : int
+            Number of stages
+        recycle_ratio : float, optional
+            Recycle from the last stage to the first (defaults to the
+            recycle ratio of the simulator)
+        """
+        if recycle_ratio is None:
+            recycle_ratio = simulator.recycle_ratio
+        stages = []
+        for _ in range(n_stages):
+            stage = CSTRSimulator()
+            stage.set_parameters(
+                volume=simulator.volume / n_stages,
+                temperature=simulator.temperature,
+                flow_rate=simulator.flow_rate,
+                reactions=simulator.reactions,
+                feed_composition=dict(simulator.feed_composition),
+                recycle_ratio=0.0,
+                target_product=simulator.target_product,
+                catalyst=simulator.catalyst
+            )
+            stage.components = list(simulator.components)
+            stages.append(stage)
+        return cls(stages, recycle_ratio)
+    
+    def _residual(self, conc, temp, tau, feed, derivatives=False):
+        """
+        Stage balances F_k = C_in,k - C_k + tau_k nu^T r(C_k, T_k) for a batch of trains
+        
+        conc has shape (batch, n_stages, n_species). Returns the residual,
+        the diagonal Jacobian blocks dF_k/dC_k (None unless derivatives) and
+        the round-off level of the balance terms (None unless derivatives).
+        """
+        batch, n_stages, n_species = conc.shape
+        inlet = np.empty_like(conc)
+        inlet[:, 0] = (1 - self.recycle_ratio) * feed + self.recycle_ratio * conc[:, -1]
+        inlet[:, 1:] = conc[:, :-1]
+        residual, jacobian, (_, derivs) = self.stages[0]._steady_state_residual(
+            self.network, conc.reshape(-1, n_species), temp.reshape(-1), np.tile(tau, batch), 0.0,
+            inlet.reshape(-1, n_species), derivatives=derivatives)
+        residual = residual.reshape(conc.shape)
+        if not derivatives:
+            return residual, None, None
+        magnitude = (derivs["magnitude"] @ np.abs(self.network["nu"])).reshape(conc.shape)
+        noise = 1e4 * np.finfo(float).eps * (inlet + conc + tau[:, None] * magnitude)
+        return residual, jacobian.reshape(conc.shape + (n_species,)), noise
+    
+    def _newton_step(self, jacobian, residual, sigma):
+        """
+        Solve the block bidiagonal system with recycle corner, (sigma I - J) dC = F
+        
+        Row k reads (sigma I - J_k) dC_k - dC_(k-1) = F_k, and the first row
+        has - R dC_N instead of the upstream term. Each dC_k is carried as
+        a_k + B_k dC_N through the forward sweep, which closes with
+        (I - B_N) dC_N = a_N.
+        """
+        batch, n_stages, n_species = residual.shape
+        eye = np.eye(n_species)
+        recycle = self.recycle_ratio > 0
+        system = sigma[:, None, None, None] * eye - jacobian
+        offset = np.zeros((batch, n_species))
+        coupling = self.recycle_ratio * np.broadcast_to(eye, (batch, n_species, n_species))
+        steps = np.empty_like(residual)
+        couplings = np.empty(residual.shape + (n_species,)) if recycle else None
+        for k in range(n_stages):
+            rhs = (residual[:, k] + offset)[..., None]
+            if recycle:
+                rhs = np.concatenate([rhs, coupling], axis=2)
+            try:
+                solution = np.linalg.solve(system[:, k], rhs)
+            except np.linalg.LinAlgError:
+                solution = np.linalg.pinv(system[:, k]) @ rhs
+            offset = solution[..., 0]
+            steps[:, k] = offset
+            if recycle:
+                coupling = solution[..., 1:]
+                couplings[:, k] = coupling
+        if recycle:
+            try:
+                last = np.linalg.solve(eye - coupling, offset[..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                last = (np.linalg.pinv(eye - coupling) @ offset[..., None])[..., 0]
+            steps += np.einsum("bkst,bt->bks", couplings, last)
+        return steps
+    
+    def _solve_arrays(self, temp, tol=1e-10, max_iterations=100):
+        """
+        Solve the stage balances for a batch of temperature profiles
+        
+        The starting point is one pass of stage-by-stage solves without the
+        recycle. Newton steps are globalized as in
+        CSTRSimulator._solve_steady_state_arrays: pseudo-transient
+        continuation, a fraction-to-boundary rule and a backtracking line
+        search on the largest scaled stage residual.
+        
+        Parameters:
+        -----------
+        temp : ndarray
+            Stage temperatures with shape (batch, n_stages)
+        
+        Returns:
+        --------
+        conc : ndarray
+            Stage outlet concentrations, shape (batch, n_stages, n_species)
+        converged : ndarray
+            Boolean convergence flag of each profile
+        """
+        network = self.network
+        simulator = self.stages[0]
+        temp = np.atleast_2d(np.asarray(temp, dtype=float))
+        batch, n_stages = temp.shape
+        tau = np.array([stage.volume / simulator.flow_rate for stage in self.stages])
+        feed = simulator._feed_vector(network)
+        scale = 1.0 + feed.max()
+        
+        conc = np.empty((batch, n_stages, feed.size))
+        inlet = np.broadcast_to(feed, (batch, feed.size))
+        for k in range(n_stages):
+            inlet, _ = simulator._solve_steady_state_arrays(network, temp[:, k], tau[k], 0.0, inlet)
+            conc[:, k] = inlet
+        conc = np.maximum(conc, 1e-200)
+        
+        def evaluate(rows, C, derivatives=False):
+            residual, jacobian, noise = self._residual(C, temp[rows], tau, feed, derivatives)
+            norm = np.abs(residual).max(axis=(1, 2)) / scale
+            if not derivatives:
+                return residual, norm
+            done = (np.abs(residual) <= tol * scale + noise).all(axis=(1, 2))
+            return residual, norm, jacobian, done
+        
+        sigma = np.zeros(batch)
+        converged = np.zeros(batch, dtype=bool)
+        active = np.arange(batch)
+        residual, norm, jacobian, done = evaluate(active, conc, derivatives=True)
+        for iteration in range(max_iterations):
+            converged[active[done]] = True
+            keep = ~done
+            active, residual, norm, jacobian = active[keep], residual[keep], norm[keep], jacobian[keep]
+            if active.size == 0:
+                break
+            C = conc[active]
+            step = self._newton_step(jacobian, residual, sigma[active])
+            
+            # Fraction-to-boundary rule; species below the residual tolerance in
+            # some stage would otherwise stall the whole train, so they are
+            # damped one by one instead
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where((step < 0) & (C > tol * scale), -0.8 * C / step, np.inf)
+            alpha = np.minimum(1.0, ratio.min(axis=(1, 2)))
+            
+            accepted = np.zeros(active.size, dtype=bool)
+            trial = C.copy()
+            for _ in range(30):
+                pending = np.flatnonzero(~accepted)
+                if pending.size == 0:
+                    break
+                candidate = np.maximum(C[pending] + alpha[pending, None, None] * step[pending], 0.2 * C[pending])
+                _, candidate_norm = evaluate(active[pending], candidate)
+                improved = candidate_norm <= norm[pending]
+                trial[pending[improved]] = candidate[improved]
+                accepted[pending[improved]] = True
+                alpha[pending[~improved]] *= 0.5
+            
+            sigma[active] = np.where(accepted, 0.0, np.maximum(10 * sigma[active], 1.0))
+            moved = np.flatnonzero(accepted)
+            conc[active[moved]] = trial[moved]
+            done = np.zeros(active.size, dtype=bool)
+            residual[moved], norm[moved], jacobian[moved], done[moved] = evaluate(
+                active[moved], trial[moved], derivatives=True)
+        else:
+            converged[active[done]] = True
+        return conc, converged
+    
+    def solve(self, temperatures=None):
+        """
+        Solve the steady state of the train
+        
+        Parameters:
+        -----------
+        temperatures : array_like, optional
+            Stage temperatures in K (defaults to the temperature of each stage)
+        
+        Returns:
+        --------
+        DataFrame
+            One row per stage with "stage", "volume", "temperature" and the
+            outlet concentration of each species
+        """
+        if temperatures is None:
+            temperatures = [stage.temperature for stage in self.stages]
+        temperatures = np.broadcast_to(np.asarray(temperatures, dtype=float), (len(self.stages),))
+        conc, converged = self._solve_arrays(temperatures[None, :])
+        self.concentrations = conc[0]
+        self.converged = bool(converged[0])
+        for stage, T, C in zip(self.stages, temperatures, conc[0]):
+            stage.temperature = float(T)
+            stage.concentrations = {comp: float(C[i]) for i, comp in enumerate(self.network["species"])}
+            stage.converged = self.converged
+        
+        results = pd.DataFrame(conc[0], columns=self.network["species"])
+        results.insert(0, "temperature", temperatures)
+        results.insert(0, "volume", [stage.volume for stage in self.stages])
+        results.insert(0, "stage", np.arange(1, len(self.stages) + 1))
+        return results
+
+
+class Mixer:
+    """
+    Flowsheet unit adding its inlet streams
+    
+    Parameters:
+    -----------
+    inlets : list of str
+        Names of the inlet streams
+    outlet : str
+        Name of the outlet stream
+    """
+    
+    def __init__(self, inlets, outlet):
+        self.inlets = list(inlets)
+        self.outlets = [outlet]
+    
+    def run(self, streams, species):
+        return [np.sum(streams, axis=0)]
+
+
+class Reactor:
+    """
+    Flowsheet unit wrapping a CSTRSimulator
+    
+    The residence time follows from the inlet volumetric flow, the
+    reactor volume and temperature come from the simulator and the
+    volumetric flow is unchanged across the reactor. Each solve is
+    warm-started from the previous outlet.
+    
+    Parameters:
+    -----------
+    simulator : CSTRSimulator
+        Reactor model (its flow rate, feed and recycle ratio are not used)
+    inlet : str
+        Name of the inlet stream
+    outlet : str
+        Name of the outlet stream
+    """
+    
+    def __init__(self, simulator, inlet, outlet):
+        self.simulator = simulator
+        self.inlets = [inlet]
+        self.outlets = [outlet]
+        self.converged = False
+        self._previous = None
+    
+    def run(self, streams, species):
+        simulator = self.simulator
+        network = simulator._compile_network()
+        index = [species.index(comp) for comp in network["species"]]
+        stream = streams[0]
+        flow_rate = stream[-1]
+        outlet = stream.copy()
+        if flow_rate <= 0:
+            self.converged = True
+            return [outlet]
+        conc, converged = simulator._solve_steady_state_arrays(
+            network, simulator.temperature, simulator.volume / flow_rate, 0.0, stream[index] / flow_rate,
+            initial=self._previous)
+        self._previous = conc
+        self.converged = bool(converged[0])
+        outlet[index] = conc[0] * flow_rate
+        return [outlet]
+
+
+class Separator:
+    """
+    Component-split separator
+    
+    Sends a fixed fraction of each species to the first outlet and the
+    rest to the second. The volumetric flow is split like the total molar
+    flow, i.e. at constant total concentration.
+    
+    Parameters:
+    -----------
+    inlet : str
+        Name of the inlet stream
+    outlets : tuple of str
+        Names of the (recovered, remaining) outlet streams
+    split : dict
+        Fraction of each species recovered in the first outlet (0-1)
+    default_split : float
+        Fraction for the species missing from split
+    """
+    
+    def __init__(self, inlet, outlets, split, default_split=0.0):
+        self.inlets = [inlet]
+        self.outlets = list(outlets)
+        self.split = dict(split)
+        self.default_split = default_split
+    
+    def run(self, streams, species):
+        stream = streams[0]
+        fraction = np.array([self.split.get(comp, self.default_split) for comp in species])
+        recovered = stream.copy()
+        recovered[:-1] = fraction * stream[:-1]
+        total = stream[:-1].sum()
+        recovered[-1] = stream[-1] * recovered[:-1].sum() / total if total > 0 else 0.0
+        return [recovered, stream - recovered]
+
+
+class Splitter:
+    """
+    Stream splitter, e.g. a purge
+    
+    Parameters:
+    -----------
+    inlet : str
+        Name of the inlet stream
+    outlets : tuple of str
+        Names of the two outlet streams
+    fraction : float
+        Fraction of the inlet sent to the first outlet (0-1)
+    """
+    
+    def __init__(self, inlet, outlets, fraction):
+        self.inlets = [inlet]
+        self.outlets = list(outlets)
+        self.fraction = fraction
+    
+    def run(self, streams, species):
+        return [self.fraction * streams[0], (1 - self.fraction) * streams[0]]
+
+
+class Flowsheet:
+    """
+    Sequential-modular flowsheet of Mixer, Reactor, Separator and Splitter units
+    
+    Streams are vectors of species molar flows (mol/s) followed by the
+    volumetric flow (m³/s). Units are computed one at a time in an order
+    where every inlet is known; recycle loops are opened at tear streams,
+    chosen automatically as the fewest streams that break every cycle of
+    the unit graph. The tear streams are converged by successive
+    substitution accelerated with bounded Wegstein or Broyden updates.
+    
+    Parameters:
+    -----------
+    species : list of str
+        Species carried by the streams
+    """
+    
+    def __init__(self, species):
+        self.species = list(species)
+        self.feeds = {}
+        self.units = {}
+        self.streams = {}
+        self.tear_streams = []
+        self.converged = False
+        self.iterations = 0
+        self.history = []
+    
+    @classmethod
+    def recycle_loop(cls, simulator, split, purge_fraction=0.0):
+        """
+        Feed, mixer, reactor, separator, purge and recycle of a simulator
+        
+        Parameters:
+        -----------
+        simulator : CSTRSimulator
+            Reactor, fed with its flow rate and feed composition
+        split : dict
+            Fraction of each species recovered by the separator and sent back to the mixer
+        purge_fraction : float
+            Fraction of the recovered stream purged
+        """
+        species = simulator._compile_network()["species"]
+        flowsheet = cls(species)
+        flowsheet.add_feed("feed", simulator.flow_rate, simulator.feed_composition)
+        flowsheet.add_unit("mixer", Mixer(["feed", "recycle"], "reactor_inlet"))
+        flowsheet.add_unit("reactor", Reactor(simulator, "reactor_inlet", "reactor_outlet"))
+        flowsheet.add_unit("separator", Separator("reactor_outlet", ("recovered", "product"), split))
+        flowsheet.add_unit("purge", Splitter("recovered", ("purge", "recycle"), purge_fraction))
+        return flowsheet
+    
+    def add_feed(self, name, flow_rate, composition):
+        """Add a feed stream with a volumetric flow rate (m³/s) and concentrations (mol/m³)"""
+        stream = np.zeros(len(self.species) + 1)
+        for comp, conc in composition.items():
+            stream[self.species.index(comp)] = conc * flow_rate
+        stream[-1] = flow_rate
+        self.feeds[name] = stream
+    
+    def add_unit(self, name, unit):
+        """Add a unit operation under a name"""
+        self.units[name] = unit
+    
+    def _tear_streams(self):
+        """
+        Select tear streams and the calculation order
+        
+        Cycles of the unit graph are enumerated and the stream shared by
+        the most remaining cycles is torn until none is left, preferring
+        streams that enter a mixer on ties. The units are
+        then ordered so that every inlet is a feed, a tear stream or an
+        outlet of an earlier unit.
+        
+        Returns:
+        --------
+        tears : list of str
+            Tear stream names
+        order : list of str
+            Unit names in calculation order
+        """
+        producer = {stream: name for name, unit in self.units.items() for stream in unit.outlets}
+        consumer = {stream: unit for unit in self.units.values() for stream in unit.inlets}
+        edges = {name: [] for name in self.units}
+        for name, unit in self.units.items():
+            for stream in unit.inlets:
+                if stream in producer:
+                    edges[producer[stream]].append((name, stream))
+                elif stream not in self.feeds:
+                    raise ValueError(f"Stream '{stream}' is neither a feed nor a unit outlet")
+        
+        # Simple cycles as sets of streams, each found from its first unit in insertion order
+        names = list(self.units)
+        rank = {name: i for i, name in enumerate(names)}
+        cycles = []
+        for start in names:
+            stack = [(start, [], {start})]
+            while stack:
+                node, path, visited = stack.pop()
+                for target, stream in edges[node]:
+                    if target == start:
+                        cycles.append(frozenset(path + [stream]))
+                    elif target not in visited and rank[target] > rank[start]:
+                        stack.append((target, path + [stream], visited | {target}))
+        
+        tears = []
+        while cycles:
+            counts = {}
+            for cycle in cycles:
+                for stream in cycle:
+                    counts[stream] = counts.get(stream, 0) + 1
+            stream = max(counts, key=lambda s: (counts[s], isinstance(consumer[s], Mixer)))
+            tears.append(stream)
+            cycles = [cycle for cycle in cycles if stream not in cycle]
+        
+        known = set(self.feeds) | set(tears)
+        order = []
+        remaining = list(names)
+        while remaining:
+            ready = [name for name in remaining if all(stream in known for stream in self.units[name].inlets)]
+            if not ready:
+                raise ValueError("The flowsheet cannot be ordered; check the unit connections")
+            for name in ready:
+                order.append(name)
+                known.update(self.units[name].outlets)
+                remaining.remove(name)
+        return tears, order
+    
+    def _pass(self, tears, order, guess):
+        """Compute every unit once from the tear stream guesses and return the new tear values"""
+        n_values = len(self.species) + 1
+        streams = dict(self.feeds)
+        for i, stream in enumerate(tears):
+            streams[stream] = guess[i * n_values:(i + 1) * n_values]
+        computed = {}
+        for name in order:
+            unit = self.units[name]
+            outlets = unit.run([computed.get(stream, streams.get(stream)) for stream in unit.inlets], self.species)
+            computed.update(zip(unit.outlets, outlets))
+        streams.update(computed)
+        self.streams = streams
+        return np.concatenate([computed[stream] for stream in tears]) if tears else np.zeros(0)
+    
+    def solve(self, method="wegstein", tol=1e-8, max_iterations=200, bounds=(-5.0, 0.0)):
+        """
+        Converge the flowsheet
+        
+        Parameters:
+        -----------
+        method : str
+            "wegstein" (bounded Wegstein acceleration of each tear
+            variable), "broyden" (Broyden's method on x - G(x) = 0) or
+            "direct" (successive substitution)
+        tol : float
+            Convergence tolerance on the tear streams, relative to the
+            largest flow of each stream
+        max_iterations : int
+            Maximum number of passes through the flowsheet
+        bounds : tuple
+            Bounds of the Wegstein acceleration factor q
+        
+        Returns:
+        --------
+        DataFrame
+            One row per stream with its volumetric "flow_rate" (m³/s) and
+            the molar flow of each species (mol/s)
+        """
+        if method not in ("wegstein", "broyden", "direct"):
+            raise ValueError(f"Unknown method '{method}'")
+        tears, order = self._tear_streams()
+        self.tear_streams = tears
+        n_values = len(self.species) + 1
+        x = np.zeros(len(tears) * n_values)
+        
+        def error(x, g):
+            scale = np.maximum(np.abs(np.stack([x, g])).reshape(2, -1, n_values).max(axis=(0, 2)), 1e-30)
+            return (np.abs(g - x).reshape(-1, n_values) / scale[:, None]).max() if x.size else 0.0
+        
+        self.history = []
+        self.converged = False
+        previous = None
+        inverse = None
+        for iteration in range(1, max_iterations + 1):
+            g = self._pass(tears, order, x)
+            self.history.append(error(x, g))
+            if self.history[-1] <= tol:
+                self.converged = True
+                break
+            if method == "wegstein" and previous is not None:
+                dx = x - previous[0]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    slope = np.where(np.abs(dx) > 1e-14 * (1.0 + np.abs(x)), (g - previous[1]) / dx, 0.0)
+                    q = np.clip(slope / (slope - 1), *bounds)
+                q = np.where(np.isfinite(q), q, 0.0)
+                following = q * x + (1 - q) * g
+            elif method == "broyden":
+                residual = g - x
+                if inverse is None:
+                    inverse = -np.eye(x.size)
+                else:
+                    dx, dF = x - previous[0], residual - (previous[1] - previous[0])
+                    H_dF = inverse @ dF
+                    denominator = dx @ H_dF
+                    if abs(denominator) > 1e-30:
+                        inverse += np.outer(dx - H_dF, dx @ inverse) / denominator
+                following = x - inverse @ residual
+            else:
+                following = g
+            previous = (x, g)
+            x = np.maximum(following, 0.0)
+        self.iterations = iteration
+        
+        results = pd.DataFrame.from_dict(self.streams, orient="index",
+                                         columns=list(self.species) + ["flow_rate"])
+        return results[["flow_rate"] + list(self.species)]
+
+
+class Mechanism:
+    """
+    Reaction mechanism imported from a CHEMKIN or Cantera YAML file
+    
+    The file is streamed line by line: each reaction is parsed as soon as
+    its last line has been read and appended to coordinate (COO) arrays of
+    stoichiometric coefficients and orders, so the text of the file is
+    never held in memory. Parameters are converted to SI units (mol/m³,
+    J/mol) and the arrays are cached next to the file as a .npz archive,
+    which is reloaded instead of the text while the file is unchanged.
+    
+    Modified Arrhenius expressions A T^b exp(-E/RT) are imported as they
+    are, with the exponent in "temperature_exponent", and fall-off
+    reactions with their high-pressure limit. The kinetics have no [M]
+    factor, so third-body reactions are skipped and counted in skipped
+    like other unsupported forms. Reversible reactions need an
+    equilibrium constant: it is taken from explicit reverse parameters
+    (CHEMKIN REV), evaluated with the heat of reaction at fit_temperature.
+    Reactions without them, which would need thermodynamic data, are
+    imported as irreversible; load warns about them and lists their
+    equations in irreversible_imports.
+    """
+    
+    CACHE_VERSION = 2
+    
+    # Activation energy units in J/mol
+    ENERGY_UNITS = {
+        "cal/mol": 4.184, "kcal/mol": 4184.0, "j/mol": 1.0, "kj/mol": 1000.0, "j/kmol": 1e-3,
+        "kj/kmol": 1.0, "cal/kmol": 4.184e-3, "kcal/kmol": 4.184, "k": 8.314, "ev": 96485.33212,
+        "cal/mole": 4.184, "kcal/mole": 4184.0, "joules/mole": 1.0, "kjoules/mole": 1000.0,
+        "kelvins": 8.314, "evolts": 96485.33212,
+    }
+    # Length units in m and quantity units in mol
+    LENGTH_UNITS = {"m": 1.0, "cm": 1e-2, "mm": 1e-3}
+    QUANTITY_UNITS = {"mol": 1.0, "kmol": 1000.0, "moles": 1.0, "molec": 1 / 6.02214076e23,
+                      "molecules": 1 / 6.02214076e23}
+    
+    ARRAYS = ("nu_rows", "nu_cols", "nu_values", "order_rows", "order_cols", "order_values",
+              "frequency_factor", "temperature_exponent", "activation_energy", "reverse_frequency_factor",
+              "reverse_temperature_exponent", "reverse_activation_energy")
+    
+    def __init__(self, fit_temperature=1000.0):
+        self.fit_temperature = fit_temperature
+        self.R = 8.314  # J/(mol·K)
+        self.species = []
+        self.names = []
+        self.skipped = 0
+        self.irreversible_imports = []
+        self.from_cache = False
+        self._index = {}
+        self._declared = set()
+        self._arrays = {name: [] for name in self.ARRAYS}
+        self._units = (1e-2, 1.0, 4.184)  # CHEMKIN defaults: cm, mol, cal/mol
+        self._reactions = None
+    
+    @classmethod
+    def load(cls, path, cache=True, fit_temperature=1000.0):
+        """
+        Import a mechanism file, using the binary cache when it is up to date
+        
+        Parameters:
+        -----------
+        path : str
+            CHEMKIN file (REACTIONS block), or Cantera YAML file (.yaml/.yml)
+        cache : bool
+            Read and write the cache file path + ".npz"
+        fit_temperature : float
+            Temperature in K at which the equilibrium constant and heat of
+            reaction of reactions with explicit reverse parameters are evaluated
+        
+        Returns:
+        --------
+        Mechanism
+            Mechanism whose reactions property gives reaction dictionaries
+        """
+        status = os.stat(path)
+        stamp = json.dumps({"version": cls.CACHE_VERSION, "size": status.st_size,
+                            "mtime": status.st_mtime_ns})
+        cache_path = path + ".npz"
+        mechanism = cls(fit_temperature)
+        if cache and os.path.exists(cache_path):
+            with np.load(cache_path) as data:
+                if str(data["stamp"]) == stamp:
+                    mechanism.species = data["species"].tolist()
+                    mechanism.names = data["names"].tolist()
+                    mechanism._arrays = {name: data[name] for name in cls.ARRAYS}
+                    mechanism.skipped = int(data["skipped"])
+                    mechanism.irreversible_imports = data["irreversible_imports"].tolist()
+                    mechanism.from_cache = True
+        if not mechanism.from_cache:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                if path.lower().endswith((".yaml", ".yml")):
+                    mechanism._parse_yaml(handle)
+                else:
+                    mechanism._parse_chemkin(handle)
+            mechanism._arrays = {name: np.asarray(values, dtype=int if name.endswith(("rows", "cols")) else float)
+                                 for name, values in mechanism._arrays.items()}
+            if cache:
+                np.savez(cache_path, stamp=stamp, species=np.array(mechanism.species, dtype=str),
+                         names=np.array(mechanism.names, dtype=str), skipped=mechanism.skipped,
+                         irreversible_imports=np.array(mechanism.irreversible_imports, dtype=str),
+                         **mechanism._arrays)
+        if mechanism.irreversible_imports:
+            warnings.warn(f"{len(mechanism.irreversible_imports)} reversible reactions of {path} have no "
+                          f"reverse parameters and were imported as irreversible (see irreversible_imports)")
+        return mechanism
+    
+    def _parse_equation(self, equation):
+        """Split an equation into reactant and product coefficients"""
+        falloff = re.search(r"\(\s*\+\s*[A-Za-z0-9]+\s*\)", equation) is not None
+        equation = re.sub(r"\(\s*\+\s*[A-Za-z0-9]+\s*\)", " ", equation)
+        arrow = re.search(r"<=>|=>|=", equation)
+        if arrow is None:
+            raise ValueError(f"No reaction arrow in '{equation}'")
+        third_body = False
+        sides = []
+        for side in (equation[:arrow.start()], equation[arrow.end():]):
+            terms = {}
+            for token in side.split("+"):
+                token = token.strip().replace(" ", "")
+                if not token:
+                    continue
+                if token.upper() == "M":
+                    third_body = True
+                    continue
+                match = re.match(r"(\d+(?:\.\d*)?)(.+)$", token)
+                if match and token not in self._declared:
+                    coefficient, token = float(match.group(1)), match.group(2)
+                else:
+                    coefficient = 1.0
+                terms[token] = terms.get(token, 0.0) + coefficient
+            sides.append(terms)
+        return sides[0], sides[1], arrow.group() != "=>", third_body and not falloff
+    
+    def _species_index(self, name):
+        if name not in self._index:
+            self._index[name] = len(self.species)
+            self.species.append(name)
+        return self._index[name]
+    
+    def _add_reaction(self, equation, rate, reverse=None, orders=None):
+        """
+        Append one reaction to the coordinate arrays, or skip a third-body reaction
+        
+        Parameters:
+        -----------
+        equation : str
+            Reaction equation
+        rate : tuple
+            (A, b, E) in the units of the file
+        reverse : tuple, optional
+            Explicit reverse (A, b, E)
+        orders : dict, optional
+            Forward orders overriding the reactant coefficients
+        """
+        reactants, products, reversible, third_body = self._parse_equation(equation)
+        if third_body:
+            self.skipped += 1
+            return
+        forward_orders = dict(reactants)
+        forward_orders.update(orders or {})
+        length, quantity, energy = self._units
+        # Rate constants in (concentration unit)^(1-n)/s, converted to (mol/m³)^(1-n)/s
+        volume = length ** 3 / quantity
+        
+        j = len(self.names)
+        arrays = self._arrays
+        stoichiometry = {}
+        for component, coefficient in reactants.items():
+            stoichiometry[component] = stoichiometry.get(component, 0.0) - coefficient
+        for component, coefficient in products.items():
+            stoichiometry[component] = stoichiometry.get(component, 0.0) + coefficient
+        for component, coefficient in stoichiometry.items():
+            if coefficient != 0:
+                arrays["nu_rows"].append(j)
+                arrays["nu_cols"].append(self._species_index(component))
+                arrays["nu_values"].append(coefficient)
+        for component, reaction_order in forward_orders.items():
+            arrays["order_rows"].append(j)
+            arrays["order_cols"].append(self._species_index(component))
+            arrays["order_values"].append(reaction_order)
+        
+        molecularity = sum(forward_orders.values())
+        arrays["frequency_factor"].append(rate[0] * volume ** (molecularity - 1))
+        arrays["temperature_exponent"].append(rate[1])
+        arrays["activation_energy"].append(rate[2] * energy)
+        if reverse is None:
+            if reversible:
+                self.irreversible_imports.append(" ".join(equation.split()))
+            reverse = (np.nan, 0.0, 0.0)
+        molecularity = sum(products.values())
+        arrays["reverse_frequency_factor"].append(reverse[0] * volume ** (molecularity - 1))
+        arrays["reverse_temperature_exponent"].append(reverse[1])
+        arrays["reverse_activation_energy"].append(reverse[2] * energy)
+        self.names.append(" ".join(equation.split()))
+    
+    def _parse_chemkin(self, handle):
+        """Stream the SPECIES and REACTIONS blocks of a CHEMKIN file"""
+        section = None
+        pending = None
+        for line in handle:
+            line = line.split("!", 1)[0].strip()
+            if not line:
+                continue
+            words = line.split()
+            keyword = words[0].upper()
+            if section is None:
+                if keyword.startswith("SPEC"):
+                    section, words = "SPECIES", words[1:]
+                elif keyword.startswith("REAC"):
+                    section = "REACTIONS"
+                    for unit in words[1:]:
+                        unit = unit.lower()
+                        if unit in self.ENERGY_UNITS:
+                            self._units = self._units[:2] + (self.ENERGY_UNITS[unit],)
+                        elif unit in self.QUANTITY_UNITS:
+                            self._units = (self._units[0], self.QUANTITY_UNITS[unit], self._units[2])
+                    continue
+                elif keyword.startswith(("ELEM", "THER")):
+                    if "END" not in (word.upper() for word in words[1:]):
+                        section = keyword[:4]
+                    continue
+            if section == "SPECIES":
+                for word in words:
+                    if word.upper() == "END":
+                        section = None
+                        break
+                    self._declared.add(word)
+                continue
+            if section != "REACTIONS":
+                if keyword == "END":
+                    section = None
+                continue
+            
+            if keyword == "END":
+                section = None
+                if pending is not None:
+                    self._add_reaction(**pending)
+                    pending = None
+                continue
+            rate = None
+            if "=" in line and "/" not in line and len(words) >= 4:
+                try:
+                    rate = tuple(float(value) for value in words[-3:])
+                except ValueError:
+                    pass
+            if rate is not None:
+                if pending is not None:
+                    self._add_reaction(**pending)
+                pending = {"equation": "".join(words[:-3]), "rate": rate}
+            elif pending is not None:
+                # Auxiliary line: KEY / values / pairs, species efficiencies or DUPLICATE
+                for key, values in re.findall(r"([^\s/]+)\s*/([^/]*)/", line):
+                    key = key.upper()
+                    if key == "REV":
+                        pending["reverse"] = tuple(float(value) for value in values.split())
+                    elif key == "FORD":
+                        component, value = values.split()
+                        pending.setdefault("orders", {})[component] = float(value)
+        if pending is not None:
+            self._add_reaction(**pending)
+    
+    @staticmethod
+    def _flow_map(text):
+        """Parse a one-line YAML mapping such as {A: 1.0e13, b: 0.0, Ea: 100 kJ/mol}"""
+        entries = {}
+        for item in text.strip().strip("{}").split(","):
+            key, _, value = item.partition(":")
+            if key.strip():
+                entries[key.strip().strip("'\"")] = value.strip().strip("'\"")
+        return entries
+    
+    def _yaml_energy(self, value):
+        """Read a YAML activation energy, with an optional unit, in the units of the file"""
+        words = str(value).split()
+        if len(words) > 1 and words[1].lower() in self.ENERGY_UNITS:
+            return float(words[0]) * self.ENERGY_UNITS[words[1].lower()] / self._units[2]
+        return float(words[0])
+    
+    def _finish_yaml_reaction(self, item):
+        rates = item.get("rate-constant") or item.get("high-P-rate-constant")
+        if not rates and item.get("rate-constants"):
+            # Pressure-dependent Arrhenius: the last (highest pressure) expression
+            rates = item["rate-constants"][-1]
+        if not isinstance(rates, dict) or "A" not in rates or "equation" not in item:
+            self.skipped += 1
+            return
+        rate = (float(str(rates["A"]).split()[0]), float(rates.get("b", 0.0)),
+                self._yaml_energy(rates.get("Ea", 0.0)))
+        orders = {component: float(value) for component, value in item.get("orders", {}).items()}
+        self._add_reaction(item["equation"], rate, orders=orders)
+    
+    def _parse_yaml(self, handle):
+        """Stream the units, phase species and reactions list of a Cantera YAML file"""
+        # Cantera defaults: m, kmol and J/kmol
+        self._units = (1.0, 1000.0, 1e-3)
+        section = None
+        item = None
+        nested = None
+        list_indent = key_indent = 0
+        buffer = ""
+        for line in handle:
+            line = line.split("#", 1)[0].rstrip()
+            if not line.strip():
+                continue
+            if buffer:
+                line = buffer + " " + line.strip()
+            # Flow collections may wrap over several lines
+            if line.count("{") > line.count("}") or line.count("[") > line.count("]"):
+                buffer = line
+                continue
+            buffer = ""
+            indent = len(line) - len(line.lstrip())
+            text = line.strip()
+            
+            if indent == 0 and not text.startswith("-"):
+                if item is not None:
+                    self._finish_yaml_reaction(item)
+                    item = None
+                key, _, value = text.partition(":")
+                section = key.strip()
+                if section == "units":
+                    units = {k: v.lower() for k, v in self._flow_map(value).items()}
+                    self._units = (self.LENGTH_UNITS.get(units.get("length"), self._units[0]),
+                                   self.QUANTITY_UNITS.get(units.get("quantity"), self._units[1]),
+                                   self.ENERGY_UNITS.get(units.get("activation-energy"), self._units[2]))
+                continue
+            
+            if section == "phases":
+                key, _, value = text.lstrip("- ").partition(":")
+                if key.strip() == "species" and value.strip().startswith("["):
+                    self._declared.update(name.strip().strip("'\"")
+                                          for name in value.strip()[1:-1].split(",") if name.strip())
+            elif section == "reactions" or (section or "").endswith("-reactions"):
+                if text.startswith("-") and (item is None or indent <= list_indent):
+                    if item is not None:
+                        self._finish_yaml_reaction(item)
+                    item, nested = {}, None
+                    list_indent = indent
+                    text = text[1:].strip()
+                    key_indent = len(line) - len(line.lstrip("- "))
+                    indent = key_indent
+                if item is None:
+                    continue
+                if text.startswith("-"):
+                    if nested is not None:
+                        if not isinstance(item.get(nested), list):
+                            item[nested] = []
+                        item[nested].append(self._flow_map(text[1:]))
+                    continue
+                key, _, value = text.partition(":")
+                key, value = key.strip(), value.strip()
+                if indent > key_indent and nested is not None:
+                    item[nested][key] = value
+                elif not value:
+                    nested = key
+                    item[key] = {}
+                else:
+                    nested = None
+                    item[key] = self._flow_map(value) if value.startswith("{") else value.strip("'\"")
+        if item is not None:
+            self._finish_yaml_reaction(item)
+    
+    @property
+    def reactions(self):
+        """Reaction dictionaries in the simulator's format, built on first access"""
+        if self._reactions is None:
+            self._reactions = self._build_reactions()
+        return self._reactions
+    
+    def _build_reactions(self):
+        """Convert the coordinate arrays into the simulator's reaction dictionaries"""
+        arrays = self._arrays
+        T0 = self.fit_temperature
+        
+        # Forward and reverse rates matched in value and slope by A' exp(-E'/RT) at T0,
+        # which gives the equilibrium constant and heat of reaction there
+        b = arrays["temperature_exponent"]
+        k0 = arrays["frequency_factor"] * T0 ** b * np.exp(b)
+        Ea = arrays["activation_energy"] + b * self.R * T0
+        b_reverse = arrays["reverse_temperature_exponent"]
+        k0_reverse = arrays["reverse_frequency_factor"] * T0 ** b_reverse * np.exp(b_reverse)
+        Ea_reverse = arrays["reverse_activation_energy"] + b_reverse * self.R * T0
+        reversible = np.isfinite(k0_reverse) & (k0_reverse > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            K_eq = k0 / k0_reverse * np.exp((Ea_reverse - Ea) / (self.R * T0))
+        
+        n_reactions = len(self.names)
+        stoichiometry = [{} for _ in range(n_reactions)]
+        reaction_order = [{} for _ in range(n_reactions)]
+        species = self.species
+        for j, i, value in zip(arrays["nu_rows"].tolist(), arrays["nu_cols"].tolist(),
+                               arrays["nu_values"].tolist()):
+            stoichiometry[j][species[i]] = value
+        for j, i, value in zip(arrays["order_rows"].tolist(), arrays["order_cols"].tolist(),
+                               arrays["order_values"].tolist()):
+            reaction_order[j][species[i]] = value
+        
+        reactions = []
+        for j in range(n_reactions):
+            reaction = {
+                "name": self.names[j],
+                "stoichiometry": stoichiometry[j],
+                "frequency_factor": float(arrays["frequency_factor"][j]),
+                "activation_energy": float(arrays["activation_energy"][j]),
+                "reaction_order": reaction_order[j],
+                "reversible": bool(reversible[j])
+            }
+            if reversible[j]:
+                reaction["equilibrium_constant"] = float(K_eq[j])
+                reaction["heat_of_reaction"] = float(Ea[j] - Ea_reverse[j])
+                reaction["reference_temperature"] = T0
+            if b[j] != 0:
+                reaction["temperature_exponent"] = float(b[j])
+            reactions.append(reaction)
+        return reactions
+    
+    def create_simulator(self, feed_composition, temperature=None, volume=5.0, flow_rate=0.02,
+                         recycle_ratio=0.0, target_product=None):
+        """Return a CSTRSimulator for the mechanism, with species in file order"""
+        simulator = CSTRSimulator()
+        simulator.set_parameters(
+            volume=volume,
+            temperature=self.fit_temperature if temperature is None else temperature,
+            flow_rate=flow_rate,
+            reactions=self.reactions,
+            feed_composition=dict(feed_composition),
+            recycle_ratio=recycle_ratio,
+            target_product=target_product
+        )
+        simulator.components = [comp for comp in self.species if comp in simulator.concentrations]
+        return simulator
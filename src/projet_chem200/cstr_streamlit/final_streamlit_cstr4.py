@@ -12,7 +12,23 @@ import sys, os
 sys.path.append(os.path.abspath("src"))
 
 # Import your actual classes (make sure these are in the same directory or properly installed)
-from projet_chem200.cstr_simulator.functions import CSTRSimulator, ReactionDatabase
+from projet_chem200.cstr_simulator.functions import CSTRSimulator, ReactionDatabase, ResponseTable
+
+# Precomputed response-surface tables used for live feedback on slider changes
+RESPONSE_TABLE_DIR = os.path.abspath("response_tables")
+
+@st.cache_resource
+def load_response_table(reaction_name: str):
+    """Load the memory-mapped response table of a process, building it the first time"""
+    database = ReactionDatabase()
+    data = database.get_reaction_details(reaction_name)
+    path = os.path.join(RESPONSE_TABLE_DIR, ResponseTable.file_stem(reaction_name))
+    if not os.path.exists(path + ".npy"):
+        os.makedirs(RESPONSE_TABLE_DIR, exist_ok=True)
+        simulator = database.create_simulator(reaction_name)
+        simulator.build_response_table(path, temp_bounds=data['temperature_range'], name=reaction_name)
+    return ResponseTable(path)
+
 class StreamlitCSTRApp:
     """Streamlit interface for CSTR Simulator with process flow visualization"""
     
@@ -210,6 +226,35 @@ class StreamlitCSTRApp:
         
         return fig
     
+    def create_pareto_chart(self, front: pd.DataFrame):
+        """Create a chart of a precomputed Pareto front (yield vs. throughput vs. conversion)"""
+        if front is None or front.empty:
+            return None
+        
+        fig = go.Figure()
+        fig.add_trace(
+            go.Scatter(
+                x=front['flow_rate'], y=front['yield'] * 100,
+                mode='markers+lines',
+                marker=dict(size=10, color=front['conversion'] * 100, colorscale='Viridis',
+                            colorbar=dict(title="Conversion (%)")),
+                customdata=np.column_stack([front['temperature'], front['recycle_ratio']]),
+                hovertemplate="Flow rate: %{x:.4f} m³/s<br>Yield: %{y:.1f}%<br>"
+                              "T: %{customdata[0]:.0f} K<br>Recycle: %{customdata[1]:.2f}<extra></extra>",
+                showlegend=False
+            )
+        )
+        
+        fig.update_layout(
+            title="Pareto Front: Yield vs. Throughput vs. Conversion",
+            xaxis_title="Flow Rate (m³/s)",
+            yaxis_title="Product Yield (%)",
+            height=450,
+            font=dict(size=12)
+        )
+        
+        return fig
+    
     def matplotlib_to_plotly(self, fig_mpl):
         """Convert matplotlib figure to plotly for better web integration"""
         # Save matplotlib figure to bytes
@@ -275,7 +320,18 @@ def main():
             step=5
         )
         
+        # Live estimate interpolated from the precomputed response table
+        live_preview = st.checkbox("Live Preview", value=True)
+        if live_preview:
+            table = load_response_table(selected_reaction)
+            estimate = table.lookup(temperature, volume / flow_rate, recycle_ratio)
+            st.metric("Estimated Yield (interpolated)", f"{estimate['yield']*100:.1f}%")
+            if st.button("Exact Solve"):
+                exact = table.exact(temperature, volume / flow_rate, recycle_ratio)
+                st.metric("Exact Yield", f"{exact['yield']*100:.1f}%")
+        
         optimize_temp = st.checkbox("Optimize Temperature", value=True)
+        compute_pareto = st.checkbox("Compute Pareto Front", value=False)
         
         run_simulation = st.button("🚀 Run Simulation", type="primary")
     
@@ -311,6 +367,15 @@ def main():
                         catalyst=reaction_data['catalyst']
                     )
                     
+                    # The front is stored once and only rendered afterwards
+                    if compute_pareto:
+                        st.session_state['pareto_front'] = app.simulator.pareto_front(
+                            temp_bounds=temp_range,
+                            recycle_bounds=(0.0, 0.9)
+                        )
+                    else:
+                        st.session_state.pop('pareto_front', None)
+                    
                     # Run actual simulation
                     results = app.simulator.run_simulation(
                         optimize_temp=optimize_temp, 
@@ -386,7 +451,8 @@ def main():
             st.metric("Residence Time", f"{results['residence_time']:.1f} s")
         
         # Detailed results in tabs (removed reaction rates and conversions)
-        tab1, tab2, tab3 = st.tabs(["📊 Component Concentrations", "🔬 Original Plots", "🧮 Detailed Data"])
+        tab1, tab2, tab3, tab4 = st.tabs(["📊 Component Concentrations", "🔬 Original Plots", "🧮 Detailed Data",
+                                          "📈 Pareto Front"])
         
         with tab1:
             charts = app.create_results_charts(results)
@@ -440,6 +506,15 @@ def main():
             ])
             st.dataframe(conv_df, hide_index=True)
         
+        with tab4:
+            pareto_front = st.session_state.get('pareto_front')
+            pareto_chart = app.create_pareto_chart(pareto_front)
+            if pareto_chart:
+                st.plotly_chart(pareto_chart, use_container_width=True)
+                st.dataframe(pareto_front, hide_index=True)
+            else:
+                st.write("Enable **Compute Pareto Front** and run the simulation to generate the front.")
+        
         # Additional detailed results
         with st.expander("📋 Detailed Results Summary"):
             st.write("**Mass Balance Information:**")
@@ -448,6 +523,11 @@ def main():
                 st.write(f"- Total Input Concentration: {eb['total_input_conc']:.4f} mol/m³")
                 st.write(f"- Total Output Concentration: {eb['total_output_conc']:.4f} mol/m³")
                 st.write(f"- Difference: {eb['difference_percent']:.4f}%")
+                if eb.get("elements"):
+                    st.dataframe(pd.DataFrame(eb["elements"]).T.rename(columns={
+                        "input": "Input (mol/m³)", "output": "Output (mol/m³)", "error_percent": "Error (%)"}))
+                if eb.get("unbalanced_reactions"):
+                    st.warning(f"Stoichiometry does not conserve the elements: {', '.join(eb['unbalanced_reactions'])}")
             
             st.write(f"**Reactor Design:**")
             st.write(f"- Volume: {params['volume']} m³")
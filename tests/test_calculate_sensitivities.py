@@ -0,0 +1,48 @@
+import unittest
+from functions import CSTRSimulator
+
+class TestCalculateSensitivities(unittest.TestCase):
+    def test_calculate_sensitivities(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.2,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        result = sim.calculate_sensitivities()
+
+        self.assertIn("concentration_sensitivities", result)
+        self.assertIn("yield_sensitivities", result)
+        for param in ["temperature", "residence_time", "recycle_ratio",
+                      "frequency_factor_1", "activation_energy_1"]:
+            self.assertIn(param, result["yield_sensitivities"])
+
+        # Compare the temperature derivative with a central finite difference
+        step = 1e-3
+        upper = -sim.objective_function(350.0 + step)
+        lower = -sim.objective_function(350.0 - step)
+        finite_difference = (upper - lower) / (2 * step)
+        self.assertAlmostEqual(result["yield_sensitivities"]["temperature"],
+                               finite_difference, places=6)
+        self.assertGreater(result["yield_sensitivities"]["temperature"], 0.0)
+
+        # B is formed from A, so the two sensitivities are opposite
+        dC_dT = result["concentration_sensitivities"]["temperature"]
+        self.assertAlmostEqual(dC_dT["A"], -dC_dT["B"], places=8)
+
+if __name__ == '__main__':
+    unittest.main()
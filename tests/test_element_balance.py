@@ -0,0 +1,59 @@
+import unittest
+from functions import CSTRSimulator
+
+class TestElementBalance(unittest.TestCase):
+    def test_parse_formula(self):
+        self.assertEqual(CSTRSimulator._parse_formula("C2H4O"), {"C": 2, "H": 4, "O": 1})
+        self.assertEqual(CSTRSimulator._parse_formula("C6H5CH2CH3"), {"C": 8, "H": 10})
+        self.assertEqual(CSTRSimulator._parse_formula("(CH3)2CO"), {"C": 3, "H": 6, "O": 1})
+        self.assertEqual(CSTRSimulator._parse_formula("C6H5CH=CH2"), {"C": 8, "H": 8})
+        self.assertEqual(CSTRSimulator._parse_formula("NaCl"), {"Na": 1, "Cl": 1})
+        for name in ["A", "PE", "(CH3", "C2H4+"]:
+            with self.assertRaises(ValueError):
+                CSTRSimulator._parse_formula(name)
+
+    def test_element_balance(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=5.0,
+            temperature=700.0,
+            flow_rate=0.02,
+            reactions=[
+                {
+                    "name": "Ammonia synthesis",
+                    "frequency_factor": 1e8,
+                    "activation_energy": 120000.0,
+                    "reaction_order": {"N2": 1, "H2": 1.5},
+                    "stoichiometry": {"N2": -1, "H2": -3, "NH3": 2},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"N2": 25.0, "H2": 75.0},
+            recycle_ratio=0.0,
+            target_product="NH3"
+        )
+        sim.components = ["N2", "H2", "NH3"]
+
+        # Total moles change, the elements do not
+        concentrations = {"N2": 15.0, "H2": 45.0, "NH3": 20.0}
+        balance = sim._calculate_elemental_balance(concentrations)
+        self.assertAlmostEqual(balance["difference_percent"], -20.0, places=8)
+        self.assertEqual(list(balance["elements"]), ["H", "N"])
+        self.assertAlmostEqual(balance["elements"]["N"]["input"], 50.0, places=10)
+        self.assertAlmostEqual(balance["elements"]["H"]["output"], 150.0, places=10)
+        self.assertAlmostEqual(balance["max_error_percent"], 0.0, places=10)
+        self.assertEqual(balance["unbalanced_reactions"], [])
+        self.assertEqual(concentrations, {"N2": 15.0, "H2": 45.0, "NH3": 20.0})
+
+        # Per-element errors of an inconsistent outlet
+        balance = sim._calculate_elemental_balance({"N2": 15.0, "H2": 45.0, "NH3": 10.0})
+        self.assertAlmostEqual(balance["elements"]["N"]["error_percent"], -20.0, places=8)
+        self.assertAlmostEqual(balance["elements"]["H"]["error_percent"], -20.0, places=8)
+
+        # Unbalanced stoichiometry is reported
+        sim.reactions[0]["stoichiometry"] = {"N2": -1, "H2": -3, "NH3": 1}
+        balance = sim._calculate_elemental_balance(concentrations)
+        self.assertEqual(balance["unbalanced_reactions"], ["Ammonia synthesis"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from functions import CSTRSimulator
+
+class TestFitKinetics(unittest.TestCase):
+    def test_fit_kinetics(self):
+        true_reaction = {
+            "name": "A to B",
+            "frequency_factor": 1e10,
+            "activation_energy": 80000.0,
+            "reaction_order": {"A": 1.5},
+            "stoichiometry": {"A": -1, "B": 1},
+            "reversible": False
+        }
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[true_reaction],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+
+        # Synthetic plant data from the true kinetics
+        rows = []
+        for temperature in [330.0, 345.0, 360.0]:
+            for flow_rate in [0.005, 0.02, 0.05]:
+                sim.flow_rate = flow_rate
+                conc = sim.solve_steady_state(temperature)
+                rows.append({"temperature": temperature, "flow_rate": flow_rate,
+                             "A": conc["A"], "B": conc["B"]})
+        sim.flow_rate = 0.01
+
+        # Start from badly tuned parameters
+        sim.reactions = [dict(true_reaction, frequency_factor=1e9, activation_energy=75000.0,
+                              reaction_order={"A": 1.0})]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "plant.csv")
+            pd.DataFrame(rows).to_csv(path, index=False)
+            result = sim.fit_kinetics(path, n_starts=4, seed=0)
+
+        fitted = result["reactions"][0]
+        self.assertLess(result["rmse"], 1e-6)
+        self.assertAlmostEqual(fitted["activation_energy"] / 80000.0, 1.0, places=3)
+        self.assertAlmostEqual(np.log10(fitted["frequency_factor"]), 10.0, places=2)
+        self.assertAlmostEqual(fitted["reaction_order"]["A"], 1.5, places=3)
+        self.assertIn("activation_energy_std", result["parameters"].columns)
+        self.assertEqual(len(result["starts"]), 4)
+
+        # The fitted reactions are applied to the simulator
+        self.assertIs(sim.reactions[0], fitted)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator, Flowsheet, Mixer, Reactor, Separator, Splitter
+
+class TestFlowsheet(unittest.TestCase):
+    def setUp(self):
+        self.sim = CSTRSimulator()
+        self.sim.set_parameters(
+            volume=1.0,
+            temperature=330.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        self.sim.components = ["A", "B"]
+
+    def test_recycle_loop(self):
+        results = {}
+        for method in ["direct", "wegstein", "broyden"]:
+            flowsheet = Flowsheet.recycle_loop(self.sim, {"A": 0.95, "B": 0.02}, purge_fraction=0.02)
+            results[method] = flowsheet.solve(method, max_iterations=1000)
+            self.assertTrue(flowsheet.converged)
+            self.assertEqual(flowsheet.tear_streams, ["recycle"])
+            if method == "direct":
+                direct_iterations = flowsheet.iterations
+            else:
+                self.assertLess(flowsheet.iterations, direct_iterations / 5)
+        np.testing.assert_allclose(results["wegstein"], results["direct"], rtol=1e-6)
+        np.testing.assert_allclose(results["broyden"], results["direct"], rtol=1e-6)
+
+        # A -> B conserves moles: the fresh feed leaves as product and purge
+        streams = results["broyden"]
+        total = streams[["A", "B"]].sum(axis=1)
+        self.assertAlmostEqual(total["feed"], total["product"] + total["purge"], places=8)
+        self.assertAlmostEqual(streams["flow_rate"]["feed"],
+                               streams["flow_rate"]["product"] + streams["flow_rate"]["purge"], places=8)
+
+        # The reactor outlet is the CSTR steady state of the mixed inlet
+        inlet = streams.loc["reactor_inlet"]
+        k = 1e10 * np.exp(-80000.0 / (self.sim.R * 330.0))
+        tau = 1.0 / inlet["flow_rate"]
+        self.assertAlmostEqual(streams["A"]["reactor_outlet"] / inlet["A"], 1 / (1 + k * tau), places=6)
+
+    def test_tear_selection(self):
+        # Two recycle loops through the reactor are both broken by one tear
+        flowsheet = Flowsheet(["A", "B"])
+        flowsheet.add_feed("feed", 0.01, {"A": 1.0})
+        flowsheet.add_unit("mixer", Mixer(["feed", "light", "heavy"], "inlet"))
+        flowsheet.add_unit("reactor", Reactor(self.sim, "inlet", "outlet"))
+        flowsheet.add_unit("flash", Separator("outlet", ("light", "liquid"), {"A": 0.5}))
+        flowsheet.add_unit("column", Separator("liquid", ("heavy", "product"), {"A": 0.8, "B": 0.01}))
+        flowsheet.solve()
+        self.assertTrue(flowsheet.converged)
+        self.assertEqual(len(flowsheet.tear_streams), 1)
+        self.assertIn(flowsheet.tear_streams[0], ["inlet", "outlet"])
+
+        flowsheet.add_unit("purge", Splitter("nowhere", ("purge", "recycle"), 0.1))
+        with self.assertRaises(ValueError):
+            flowsheet.solve()
+
+if __name__ == "__main__":
+    unittest.main()
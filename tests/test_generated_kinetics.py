@@ -0,0 +1,104 @@
+import os
+import time
+import unittest
+import numpy as np
+from functions import CSTRSimulator, ReactionDatabase
+
+class TestGeneratedKinetics(unittest.TestCase):
+    def test_matches_array_kinetics(self):
+        db = ReactionDatabase()
+        rng = np.random.default_rng(0)
+        for name in db.reactions:
+            sim = db.create_simulator(name)
+            network = sim._compile_network()
+            self.assertIsNotNone(sim._generated_kinetics(network), name)
+            feed = sim._feed_vector(network)
+            conc = rng.uniform(0, 1, (8, len(feed))) * (feed.max() + 1)
+            conc[0] = 0.0
+            temp = rng.uniform(300, 1200, 8)
+            
+            # Explicit k0 selects the array kinetics
+            expected, expected_derivs = sim._kinetics(network, conc, temp, k0=network["k0"], derivatives=True)
+            batched = sim._kinetics(network, conc, temp, derivatives=True)
+            single = [sim._kinetics(network, conc[i], temp[i], derivatives=True) for i in range(len(temp))]
+            for rate, derivs in [batched, (np.stack([r for r, _ in single]),
+                                           {key: np.stack([d[key] for _, d in single]) for key in single[0][1]})]:
+                np.testing.assert_allclose(rate, expected, rtol=1e-10, atol=1e-300, err_msg=name)
+                for key, value in expected_derivs.items():
+                    # Reversible rates far from equilibrium cancel digits in (1 - Q/K) + Q/K
+                    scale = np.maximum(np.abs(value).max(axis=-1, keepdims=True), 1e-300)
+                    np.testing.assert_allclose(derivs[key] / scale, value / scale, rtol=1e-10, atol=1e-10,
+                                               err_msg=f"{name} {key}")
+                production = np.einsum("rs,brt->bst", network["nu"], expected_derivs["conc"])
+                np.testing.assert_allclose(derivs["production"], production, rtol=1e-10,
+                                           atol=1e-10 * np.abs(production).max() + 1e-300, err_msg=name)
+    
+    def test_cache(self):
+        db = ReactionDatabase()
+        first = db.create_simulator("Methanol Synthesis")
+        second = db.create_simulator("Methanol Synthesis")
+        generated = first._generated_kinetics(first._compile_network())
+        self.assertIs(second._generated_kinetics(second._compile_network()), generated)
+        
+        # Constants are inlined, so any parameter change compiles a new function
+        second.reactions[0]["activation_energy"] += 1000.0
+        self.assertIsNot(second._generated_kinetics(second._compile_network()), generated)
+        
+        # The cache only keeps the most recently used functions
+        sim = db.create_simulator("Methanol Synthesis")
+        sim.CODEGEN_CACHE_SIZE = 2
+        for _ in range(3):
+            sim.reactions[0]["activation_energy"] += 1000.0
+            sim._generated_kinetics(sim._compile_network())
+        self.assertEqual(len(CSTRSimulator._generated_kinetics_cache), 2)
+    
+    def test_overflow_fallback(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "2A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 2},
+                    "stoichiometry": {"A": -2, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        with np.errstate(over="ignore", invalid="ignore"):
+            rate, _ = sim._kinetics(sim._compile_network(), np.array([1e200, 0.0]), 350.0, derivatives=True)
+        self.assertEqual(rate[0], 100.0)
+    
+    @unittest.skipUnless(os.environ.get("CSTR_BENCHMARK"), "timing benchmark, set CSTR_BENCHMARK=1 to run")
+    def test_benchmark(self):
+        # Residual and Jacobian evaluations of every database process at one operating point
+        db = ReactionDatabase()
+        timings = []
+        for max_reactions in (CSTRSimulator.CODEGEN_MAX_REACTIONS, 0):
+            elapsed = np.inf
+            for _ in range(3):
+                start = time.perf_counter()
+                for name in db.reactions:
+                    sim = db.create_simulator(name)
+                    sim.CODEGEN_MAX_REACTIONS = max_reactions
+                    network = sim._compile_network()
+                    feed = sim._feed_vector(network)
+                    conc = np.maximum(feed, 1.0)[None, :]
+                    for _ in range(50):
+                        sim._steady_state_residual(network, conc, sim.temperature, sim.volume / sim.flow_rate,
+                                                   sim.recycle_ratio, feed, derivatives=True)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            timings.append(elapsed)
+        generated, arrays = timings
+        self.assertLess(generated, arrays)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator
+
+class TestHeatBalanceCurves(unittest.TestCase):
+    def test_heat_balance_curves(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=290.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False,
+                    "heat_of_reaction": -60000.0
+                }
+            ],
+            feed_composition={"A": 1000.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        sim.set_jacket(heat_transfer_coefficient=1000.0, coolant_temperature=290.0, heat_capacity=4.0e5)
+
+        curves = sim.heat_balance_curves(coolant_temperatures=[250.0, 290.0, 330.0], feed_scales=[[0.5], [1.0]],
+                                         temp_bounds=(200, 600))
+        scenarios = curves["scenarios"]
+        self.assertEqual(len(scenarios), 6)
+        self.assertEqual(curves["generation"].shape, (6, 501))
+        self.assertTrue(scenarios["converged"].all())
+
+        # Three steady states at full feed: low stable, middle unstable, ignited stable
+        states = curves["steady_states"]
+        states = states[states["scenario"] == 4]
+        self.assertEqual(list(states["stable"]), [True, False, True])
+        low = sim.solve_nonisothermal(290.0)["temperature"]
+        high = sim.solve_nonisothermal(290.0, initial_temperature=600.0)["temperature"]
+        np.testing.assert_allclose(states["temperature"].iloc[[0, 2]], [low, high], rtol=1e-8)
+        self.assertAlmostEqual(scenarios["operating_temperature"][4], low, places=6)
+
+        # The low branch ignites just above the ignition coolant temperature
+        ignition = scenarios["ignition_coolant_temperature"][4]
+        self.assertAlmostEqual(scenarios["coolant_margin"][4], ignition - 290.0)
+        below = sim.solve_nonisothermal(ignition - 1.0, initial_temperature=250.0)["temperature"]
+        above = sim.solve_nonisothermal(ignition + 1.0, initial_temperature=250.0)["temperature"]
+        self.assertLess(below, scenarios["ignition_temperature"][4])
+        self.assertGreater(above, scenarios["extinction_temperature"][4])
+        self.assertTrue((scenarios["slope_margin"] > 0).all())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator
+
+class TestLinearize(unittest.TestCase):
+    def test_linearize(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+
+        lin = sim.linearize()
+        self.assertEqual(lin["states"], ["A", "B"])
+        self.assertEqual(lin["inputs"], ["temperature", "flow_rate", "feed_A", "feed_B"])
+        self.assertTrue(lin["converged"])
+
+        # Analytic linearization of dC/dt = D (C_feed - C) + nu k C_A
+        k = 1e10 * np.exp(-80000.0 / (sim.R * 350.0))
+        D = 0.01 / 1.0
+        C_A = lin["steady_state"][0]
+        np.testing.assert_allclose(lin["A"], [[-D - k, 0.0], [k, -D]], rtol=1e-10)
+        dk_dT = k * 80000.0 / (sim.R * 350.0 ** 2)
+        np.testing.assert_allclose(lin["B"][:, 0], [-dk_dT * C_A, dk_dT * C_A], rtol=1e-10)
+        np.testing.assert_allclose(lin["B"][:, 1], (np.array([1.0, 0.0]) - lin["steady_state"]) / 1.0, rtol=1e-10)
+        np.testing.assert_allclose(lin["B"][:, 2:], D * np.eye(2), rtol=1e-12)
+        np.testing.assert_allclose(lin["eigenvalues"], [-D, -D - k], rtol=1e-10)
+        np.testing.assert_allclose(lin["time_constants"], [1 / D, 1 / (D + k)], rtol=1e-10)
+
+        # Batched points match single points; the default point (350 K) is already cached
+        temperatures = np.linspace(330.0, 370.0, 9)
+        batch = sim.linearize(temperatures, flow_rate=[[0.01], [0.02]])
+        self.assertEqual(batch["A"].shape, (2, 9, 2, 2))
+        self.assertEqual(len(sim._linearization_cache["points"]), 18)
+        single = sim.linearize(temperatures[4], flow_rate=0.02)
+        np.testing.assert_allclose(single["A"], batch["A"][1, 4])
+        self.assertEqual(len(sim._linearization_cache["points"]), 18)
+
+if __name__ == '__main__':
+    unittest.main()
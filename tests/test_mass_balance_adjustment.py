@@ -4,21 +4,41 @@ from functions import CSTRSimulator
 class TestVerifyMassBalance(unittest.TestCase):
     def test_mass_balance_adjustment(self):
         sim = CSTRSimulator()
-
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "2A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -2, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
 
         inlet = {"A": 1.0, "B": 0.0}
-        
-
-        outlet = {"A": 0.5, "B": 0.7}
-        
 
-        sim._verify_mass_balance(inlet, outlet, reaction={})
-
-        total_in = sum(inlet.values())
-        total_out = sum(outlet.values())
+        # A + 2B is conserved although the total number of moles is not
+        outlet = {"A": 0.4, "B": 0.3}
+        self.assertAlmostEqual(sim._verify_mass_balance(inlet, outlet), 0.0, places=12)
 
+        # Violations are reported without rescaling the outlet
+        outlet = {"A": 0.5, "B": 0.7}
+        error = sim._verify_mass_balance(inlet, outlet)
+        self.assertAlmostEqual(error, 0.9 / 2.4, places=12)
+        self.assertEqual(outlet, {"A": 0.5, "B": 0.7})
 
-        self.assertAlmostEqual(total_in, total_out, delta=total_in * 0.01)
+        # The computed steady state satisfies the invariants exactly
+        concentrations = sim.solve_steady_state()
+        self.assertLess(sim._verify_mass_balance(sim.feed_composition, concentrations), 1e-12)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
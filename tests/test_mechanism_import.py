@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from functions import Mechanism, ReactionDatabase
+
+CHEMKIN = """ELEMENTS H O END
+SPECIES H2 O2 H2O H O OH END
+REACTIONS CAL/MOLE
+H+O2<=>O+OH          3.547E15  -0.406  16599.  ! chain branching
+O+H2<=>H+OH          5.08E4     2.67    6290.
+  REV / 2.64E4 2.65 4880. /
+H2+OH=>H2O+H         2.16E8     1.51    3430.
+2OH+M=>O2+H2+M       1.0E18    -1.0        0.
+  H2/2.5/ H2O/12.0/
+END
+"""
+
+YAML = """units: {length: cm, time: s, quantity: mol, activation-energy: cal/mol}
+phases:
+- name: gas
+  species: [H2, O2, H2O,
+    H, O, OH]
+reactions:
+- equation: H + O2 <=> O + OH  # chain branching
+  rate-constant: {A: 3.547e+15, b: -0.406, Ea: 16599.0}
+- equation: H2 + OH => H2O + H
+  rate-constant:
+    A: 2.16e+08
+    b: 1.51
+    Ea: 14.35112 kJ/mol
+- equation: 2 OH + M => O2 + H2 + M
+  type: three-body
+  rate-constant: {A: 1.0e+18, b: -1.0, Ea: 0.0}
+  efficiencies: {H2: 2.5, H2O: 12.0}
+"""
+
+class TestMechanismImport(unittest.TestCase):
+    def test_chemkin_import(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "h2.inp")
+            with open(path, "w") as file:
+                file.write(CHEMKIN)
+            with self.assertWarns(UserWarning):
+                mechanism = Mechanism.load(path, fit_temperature=1000.0)
+            self.assertFalse(mechanism.from_cache)
+            # The kinetics have no [M] factor: the third-body reaction is skipped
+            self.assertEqual(len(mechanism.reactions), 3)
+            self.assertEqual(mechanism.skipped, 1)
+            
+            first, second, third = mechanism.reactions
+            self.assertEqual(first["stoichiometry"], {"H": -1.0, "O2": -1.0, "O": 1.0, "OH": 1.0})
+            self.assertEqual(first["reaction_order"], {"H": 1.0, "O2": 1.0})
+            # Reversible without explicit reverse parameters: imported as irreversible, and reported
+            self.assertFalse(first["reversible"])
+            self.assertEqual(mechanism.irreversible_imports, ["H+O2<=>O+OH"])
+            
+            # Modified Arrhenius form A T^b exp(-E/RT) kept in SI units
+            R, T = 8.314, 1000.0
+            k_source = 3.547e15 * 1e-6 * T ** -0.406 * np.exp(-16599.0 * 4.184 / (R * T))
+            k_imported = (first["frequency_factor"] * T ** first["temperature_exponent"]
+                          * np.exp(-first["activation_energy"] / (R * T)))
+            self.assertAlmostEqual(k_imported / k_source, 1.0, places=10)
+            self.assertEqual(first["temperature_exponent"], -0.406)
+            
+            # Explicit reverse rate gives the equilibrium constant and heat of reaction
+            self.assertTrue(second["reversible"])
+            k_forward = 5.08e4 * 1e-6 * T ** 2.67 * np.exp(-6290.0 * 4.184 / (R * T))
+            k_reverse = 2.64e4 * 1e-6 * T ** 2.65 * np.exp(-4880.0 * 4.184 / (R * T))
+            self.assertAlmostEqual(second["equilibrium_constant"] / (k_forward / k_reverse), 1.0, places=10)
+            self.assertEqual(second["reference_temperature"], T)
+            
+            self.assertFalse(third["reversible"])
+    
+    def test_yaml_matches_chemkin(self):
+        with tempfile.TemporaryDirectory() as directory:
+            chemkin_path = os.path.join(directory, "h2.inp")
+            yaml_path = os.path.join(directory, "h2.yaml")
+            with open(chemkin_path, "w") as file:
+                file.write(CHEMKIN)
+            with open(yaml_path, "w") as file:
+                file.write(YAML)
+            chemkin = Mechanism.load(chemkin_path).reactions
+            yaml = Mechanism.load(yaml_path).reactions
+            
+            self.assertEqual(len(yaml), 2)
+            for expected, reaction in zip([chemkin[0], chemkin[2]], yaml):
+                self.assertEqual(reaction["stoichiometry"], expected["stoichiometry"])
+                self.assertEqual(reaction["reaction_order"], expected["reaction_order"])
+                self.assertAlmostEqual(reaction["frequency_factor"] / expected["frequency_factor"], 1.0, places=10)
+                self.assertAlmostEqual(reaction["activation_energy"], expected["activation_energy"], places=6)
+    
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "h2.inp")
+            with open(path, "w") as file:
+                file.write(CHEMKIN)
+            parsed = Mechanism.load(path)
+            self.assertTrue(os.path.exists(path + ".npz"))
+            
+            cached = Mechanism.load(path)
+            self.assertTrue(cached.from_cache)
+            self.assertEqual(cached.species, parsed.species)
+            self.assertEqual(cached.reactions, parsed.reactions)
+            self.assertEqual(cached.skipped, parsed.skipped)
+            self.assertEqual(cached.irreversible_imports, parsed.irreversible_imports)
+            
+            # Editing the file invalidates the cache
+            with open(path, "w") as file:
+                file.write(CHEMKIN.replace("2.16E8", "3.16E8"))
+            edited = Mechanism.load(path)
+            self.assertFalse(edited.from_cache)
+            self.assertGreater(edited.reactions[2]["frequency_factor"], parsed.reactions[2]["frequency_factor"])
+    
+    def test_import_mechanism(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "h2.inp")
+            with open(path, "w") as file:
+                file.write(CHEMKIN)
+            db = ReactionDatabase()
+            name = db.import_mechanism(path, feed_composition={"H2": 20.0, "O2": 10.0, "H": 0.01},
+                                       temperature_range=(800, 1000), target_product="H2O")
+            self.assertEqual(name, "h2")
+            # Equilibrium constants from REV parameters are evaluated at the middle of the temperature range
+            self.assertEqual(db.get_reaction_details(name)["reactions"][1]["reference_temperature"], 900.0)
+            
+            sim = db.create_simulator(name)
+            results = sim.solve_steady_state()
+            self.assertGreater(results["H2O"], 0.0)
+            # Hydrogen and oxygen atoms are conserved between feed and outlet
+            hydrogen = lambda c: 2 * c["H2"] + 2 * c["H2O"] + c["H"] + c["OH"]
+            oxygen = lambda c: 2 * c["O2"] + c["H2O"] + c["O"] + c["OH"]
+            inlet = {comp: sim.feed_composition.get(comp, 0.0) for comp in results}
+            self.assertAlmostEqual(hydrogen(results) / hydrogen(inlet), 1.0, places=6)
+            self.assertAlmostEqual(oxygen(results) / oxygen(inlet), 1.0, places=6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from functions import CSTRSimulator
+
+class TestOptimizeOperatingPoint(unittest.TestCase):
+    def test_optimize_operating_point(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.1,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        initial_yield = -sim.objective_function(350.0)
+        result = sim.optimize_operating_point(temp_bounds=(300, 400),
+                                              flow_rate_bounds=(0.01, 0.1),
+                                              recycle_bounds=(0.0, 0.5),
+                                              n_samples=16, n_starts=2, seed=0)
+
+        for key in ["temperature", "flow_rate", "residence_time", "recycle_ratio",
+                    "feed_ratio", "feed_composition", "yield", "starts"]:
+            self.assertIn(key, result)
+        self.assertTrue(300 <= result["temperature"] <= 400)
+        self.assertTrue(0.01 <= result["flow_rate"] <= 0.1)
+        self.assertTrue(0.0 <= result["recycle_ratio"] <= 0.5)
+        self.assertGreaterEqual(result["yield"], initial_yield)
+
+        # The optimum is applied to the simulator
+        self.assertAlmostEqual(sim.temperature, result["temperature"])
+        self.assertAlmostEqual(sim.flow_rate, result["flow_rate"])
+        sim.solve_steady_state()
+        self.assertAlmostEqual(sim.calculate_yield(), result["yield"], places=6)
+
+if __name__ == '__main__':
+    unittest.main()
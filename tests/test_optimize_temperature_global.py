@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator
+
+class TestOptimizeTemperatureGlobal(unittest.TestCase):
+    def test_optimize_temperature_global(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e6,
+                    "activation_energy": 50000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                },
+                {
+                    "name": "B to C",
+                    "frequency_factor": 1e14,
+                    "activation_energy": 110000.0,
+                    "reaction_order": {"B": 1},
+                    "stoichiometry": {"B": -1, "C": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B", "C"]
+        result = sim.optimize_temperature_global(bounds=(300, 500), n_points=100, top_k=3)
+
+        self.assertIn("grid", result)
+        self.assertIn("candidates", result)
+        self.assertEqual(len(result["grid"]), 100)
+        self.assertLessEqual(len(result["candidates"]), 3)
+        self.assertTrue(300 <= result["temperature"] <= 500)
+
+        # The intermediate B has an interior yield maximum
+        self.assertGreater(result["temperature"], 300)
+        self.assertLess(result["temperature"], 500)
+        self.assertGreaterEqual(result["yield"], result["grid"]["yield"].max())
+        step = 1e-2
+        self.assertGreaterEqual(result["yield"], -sim.objective_function(result["temperature"] + step))
+        self.assertGreaterEqual(result["yield"], -sim.objective_function(result["temperature"] - step))
+
+        # The global mode of optimize_temperature returns the same optimum
+        optimal_temp = sim.optimize_temperature(bounds=(300, 500), global_search=True)
+        self.assertAlmostEqual(optimal_temp, sim.optimize_temperature_global(bounds=(300, 500))["temperature"], places=3)
+
+if __name__ == '__main__':
+    unittest.main()
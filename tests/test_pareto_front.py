@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator
+
+class TestParetoFront(unittest.TestCase):
+    def test_pareto_front(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        front = sim.pareto_front(temp_bounds=(300, 400), flow_rate_bounds=(0.005, 0.05),
+                                 recycle_bounds=(0.0, 0.5), n_samples=64, seed=0)
+
+        for column in ["temperature", "flow_rate", "residence_time", "recycle_ratio",
+                       "feed_ratio", "yield", "conversion"]:
+            self.assertIn(column, front.columns)
+        self.assertGreater(len(front), 1)
+        self.assertTrue(front["flow_rate"].is_monotonic_increasing)
+
+        # No point of the front dominates another one
+        objectives = front[["yield", "flow_rate", "conversion"]].values
+        for point in objectives:
+            dominates = np.all(objectives >= point, axis=1) & np.any(objectives > point, axis=1)
+            self.assertFalse(dominates.any())
+
+        # Each point matches a single steady-state solve
+        row = front.iloc[0]
+        sim.flow_rate = row["flow_rate"]
+        sim.recycle_ratio = row["recycle_ratio"]
+        sim.solve_steady_state(row["temperature"])
+        self.assertAlmostEqual(sim.calculate_yield(), row["yield"], places=6)
+        self.assertAlmostEqual(sim.calculate_conversion()["A"], row["conversion"], places=6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator
+
+class TestPropagateUncertainty(unittest.TestCase):
+    def test_propagate_uncertainty(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": True,
+                    "equilibrium_constant": 5.0
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        result = sim.propagate_uncertainty(n_samples=500, chunk_size=128, seed=42)
+
+        self.assertEqual(result["yield"].shape, (500,))
+        self.assertEqual(result["concentrations"].shape, (500, 2))
+        self.assertTrue(result["converged"].all())
+        summary = result["summary"]
+        for column in ["mean", "std", "p5", "p50", "p95"]:
+            self.assertIn(column, summary.columns)
+        self.assertLessEqual(summary.loc["yield", "p5"], summary.loc["yield", "p50"])
+        self.assertLessEqual(summary.loc["yield", "p50"], summary.loc["yield", "p95"])
+
+        # Every sample conserves A + B
+        total = result["concentrations"]["A"] + result["concentrations"]["B"]
+        np.testing.assert_allclose(total, 1.0, atol=1e-8)
+
+        # Same seed gives the same samples whatever the chunk size
+        repeat = sim.propagate_uncertainty(n_samples=500, chunk_size=500, seed=42)
+        np.testing.assert_allclose(repeat["yield"], result["yield"])
+
+        # Without uncertainty every sample is the nominal steady state
+        nominal = sim.propagate_uncertainty(n_samples=10, frequency_factor_uncertainty=0.0,
+                                            activation_energy_uncertainty=0.0,
+                                            equilibrium_constant_uncertainty=0.0, seed=0)
+        sim.solve_steady_state()
+        np.testing.assert_allclose(nominal["yield"], sim.calculate_yield(), atol=1e-10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator, ReactionDatabase
+
+class TestRateLaws(unittest.TestCase):
+    def make_simulator(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=500.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A + B to C",
+                    "frequency_factor": 1e3,
+                    "temperature_exponent": 0.7,
+                    "activation_energy": 60000.0,
+                    "reaction_order": {"A": 1, "B": 1},
+                    "stoichiometry": {"A": -1, "B": -1, "C": 1},
+                    "reversible": True,
+                    "equilibrium_constant": 5.0,
+                    "heat_of_reaction": -30000.0,
+                    "rate_law": {
+                        "adsorption": [
+                            {"orders": {"A": 1}, "frequency_factor": 1e-4, "heat_of_adsorption": -30000.0},
+                            {"orders": {"B": 0.5}, "frequency_factor": 2e-3, "heat_of_adsorption": -10000.0},
+                            {"orders": {"C": 1}, "frequency_factor": 5e-5, "heat_of_adsorption": -25000.0}
+                        ],
+                        "exponent": 2
+                    }
+                },
+                {
+                    "name": "C to D",
+                    "frequency_factor": 1e5,
+                    "activation_energy": 70000.0,
+                    "reaction_order": {"C": 1},
+                    "stoichiometry": {"C": -1, "D": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 10.0, "B": 20.0},
+            recycle_ratio=0.0,
+            target_product="C"
+        )
+        sim.components = ["A", "B", "C", "D"]
+        return sim
+    
+    def test_matches_reaction_rate(self):
+        sim = self.make_simulator()
+        network = sim._compile_network()
+        conc = np.array([4.0, 9.0, 2.0, 0.5])
+        rates, _ = sim._kinetics(network, conc, 520.0)
+        expected = [sim.reaction_rate(dict(zip(sim.components, conc)), 520.0, r) for r in sim.reactions]
+        np.testing.assert_allclose(rates, expected, rtol=1e-12)
+        
+        # Explicit Langmuir-Hinshelwood form with k0 T^n exp(-Ea / RT)
+        T, R = 520.0, sim.R
+        k = 1e3 * T ** 0.7 * np.exp(-60000.0 / (R * T))
+        K = 5.0 * np.exp(-30000.0 / R * (1 / 298.15 - 1 / T))
+        den = (1 + 1e-4 * np.exp(30000.0 / (R * T)) * 4.0 + 2e-3 * np.exp(10000.0 / (R * T)) * 3.0
+               + 5e-5 * np.exp(25000.0 / (R * T)) * 2.0)
+        self.assertAlmostEqual(rates[0] / (k * 36.0 * (1 - 2.0 / 36.0 / K) / den ** 2), 1.0, places=12)
+    
+    def test_derivatives(self):
+        sim = self.make_simulator()
+        network = sim._compile_network()
+        conc = np.array([4.0, 9.0, 2.0, 0.5])
+        rates, derivs = sim._kinetics(network, conc, 520.0, derivatives=True)
+        for i in range(len(conc)):
+            h = 1e-6 * conc[i]
+            step = np.zeros_like(conc)
+            step[i] = h
+            numerical = (sim._kinetics(network, conc + step, 520.0)[0]
+                         - sim._kinetics(network, conc - step, 520.0)[0]) / (2 * h)
+            np.testing.assert_allclose(derivs["conc"][:, i], numerical, rtol=1e-6, atol=1e-14)
+        numerical = (sim._kinetics(network, conc, 520.001)[0] - sim._kinetics(network, conc, 519.999)[0]) / 0.002
+        np.testing.assert_allclose(derivs["temperature"], numerical, rtol=1e-6)
+    
+    def test_sparse_matches_dense(self):
+        sim = self.make_simulator()
+        dense = sim._compile_network()
+        sim.SPARSE_THRESHOLD = 1
+        network = sim._compile_network()
+        self.assertTrue(network["sparse"])
+        conc = np.array([4.0, 9.0, 2.0, 0.0])
+        rates, drate_dC, magnitude = sim._sparse_kinetics(network, conc, 520.0, derivatives=True)
+        expected, derivs = sim._kinetics(dense, conc, 520.0, derivatives=True)
+        np.testing.assert_allclose(rates, expected, rtol=1e-12)
+        np.testing.assert_allclose(drate_dC.toarray(), derivs["conc"], rtol=1e-12, atol=1e-300)
+        np.testing.assert_allclose(magnitude, derivs["magnitude"], rtol=1e-12)
+        
+        sparse_result = sim.solve_steady_state()
+        sim.SPARSE_THRESHOLD = 100
+        dense_result = sim.solve_steady_state()
+        for comp in sim.components:
+            self.assertAlmostEqual(sparse_result[comp], dense_result[comp], places=8)
+    
+    def test_power_law_network(self):
+        # Power-law networks compile without the extra terms
+        db = ReactionDatabase()
+        for name in ("Methanol Synthesis", "Polyethylene Production"):
+            network = db.create_simulator(name)._compile_network()
+            self.assertIsNone(network["adsorption"])
+            self.assertIsNone(network["temperature_exponent"])
+        
+        # The Langmuir-Hinshelwood network reaches a steady state between feed and equilibrium
+        sim = self.make_simulator()
+        result = sim.solve_steady_state()
+        self.assertTrue(sim.converged)
+        self.assertGreater(result["C"], 0.0)
+        self.assertLess(result["A"], 10.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator, ReactorTrain
+
+class TestReactorTrain(unittest.TestCase):
+    def setUp(self):
+        self.sim = CSTRSimulator()
+        self.sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        self.sim.components = ["A", "B"]
+        self.k_tau = 1e10 * np.exp(-80000.0 / (self.sim.R * 350.0)) * 100.0
+
+    def test_tanks_in_series(self):
+        # C_A,N = C_A0 / (1 + k tau / N)^N, approaching the plug flow exp(-k tau)
+        for n_stages in [1, 5, 50]:
+            train = ReactorTrain.from_simulator(self.sim, n_stages)
+            results = train.solve()
+            self.assertTrue(train.converged)
+            self.assertEqual(list(results["stage"]), list(range(1, n_stages + 1)))
+            self.assertAlmostEqual(results["A"].iloc[-1], (1 + self.k_tau / n_stages) ** -n_stages, places=10)
+            np.testing.assert_allclose(results["A"] + results["B"], 1.0, rtol=1e-10)
+        self.assertAlmostEqual(results["A"].iloc[-1], np.exp(-self.k_tau), places=2)
+
+    def test_recycle(self):
+        # A single stage with recycle is the recycle CSTR of the simulator
+        self.sim.recycle_ratio = 0.6
+        train = ReactorTrain.from_simulator(self.sim, 1)
+        results = train.solve()
+        self.sim.solve_steady_state()
+        self.assertAlmostEqual(results["A"].iloc[0], self.sim.concentrations["A"], places=10)
+
+        # Linear kinetics: C_N = g C_1, C_1 = ((1 - R) C_0 + R C_N) / (1 + k tau / N)
+        train = ReactorTrain.from_simulator(self.sim, 20)
+        results = train.solve()
+        self.assertTrue(train.converged)
+        gain = (1 + self.k_tau / 20) ** -19
+        first = 0.4 / (1 + self.k_tau / 20 - 0.6 * gain)
+        self.assertAlmostEqual(results["A"].iloc[0], first, places=10)
+        self.assertAlmostEqual(results["A"].iloc[-1], first * gain, places=10)
+        self.assertAlmostEqual(train.stages[-1].concentrations["A"], first * gain, places=10)
+
+if __name__ == "__main__":
+    unittest.main()
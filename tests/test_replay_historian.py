@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from functions import CSTRSimulator
+
+class TestReplayHistorian(unittest.TestCase):
+    def test_replay_historian(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+
+        # Historian rows with measurements from the model, one of them faulty
+        temperatures = np.linspace(330.0, 370.0, 25)
+        measured = []
+        for temperature in temperatures:
+            measured.append(sim.solve_steady_state(temperature)["B"])
+        measured[7] *= 1.5
+        history = pd.DataFrame({"temperature": temperatures, "flow_rate": 0.01, "B": measured})
+
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "historian.csv")
+            output_path = os.path.join(directory, "replay.csv")
+            history.to_csv(input_path, index=False)
+            summary = sim.replay_historian(input_path, output_path, chunk_size=10)
+            output = pd.read_csv(output_path)
+
+        self.assertEqual(summary, {"rows": 25, "flagged": 1, "not_converged": 0})
+        self.assertEqual(len(output), 25)
+        for column in ["pred_A", "pred_B", "pred_yield", "converged", "dev_B", "deviation_flag"]:
+            self.assertIn(column, output.columns)
+        self.assertEqual(list(np.flatnonzero(output["deviation_flag"])), [7])
+        sim.solve_steady_state(temperatures[3])
+        self.assertAlmostEqual(output["pred_yield"][3], sim.calculate_yield(), places=8)
+
+if __name__ == '__main__':
+    unittest.main()
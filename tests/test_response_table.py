@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from functions import CSTRSimulator, ResponseTable
+
+class TestResponseTable(unittest.TestCase):
+    def make_simulator(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        return sim
+    
+    def test_response_table(self):
+        sim = self.make_simulator()
+        with tempfile.TemporaryDirectory() as directory:
+            path = sim.build_response_table(os.path.join(directory, "a_to_b"), temp_bounds=(300, 400),
+                                            temp_points=21, tau_bounds=(10.0, 1000.0), tau_points=21,
+                                            recycle_bounds=(0.0, 0.5), recycle_points=6)
+            self.assertTrue(os.path.exists(path + ".npy"))
+            self.assertTrue(os.path.exists(path + ".json"))
+
+            table = ResponseTable(path)
+            self.assertEqual(table.values.shape, (21, 21, 6, 4))
+            self.assertIsInstance(table.values, np.memmap)
+
+            # Grid nodes are reproduced exactly
+            node = table.lookup(table.axes[0][5], np.exp(table.axes[1][7]), table.axes[2][2])
+            exact = table.exact(table.axes[0][5], np.exp(table.axes[1][7]), table.axes[2][2])
+            self.assertAlmostEqual(node["yield"], exact["yield"], places=8)
+            self.assertAlmostEqual(node["concentrations"]["B"], exact["concentrations"]["B"], places=8)
+
+            # Between nodes the interpolation stays close to the exact solve
+            estimate = table.lookup(347.3, 123.4, 0.17)
+            exact = table.exact(347.3, 123.4, 0.17)
+            self.assertFalse(estimate["exact"])
+            self.assertTrue(exact["exact"])
+            self.assertAlmostEqual(estimate["yield"], exact["yield"], delta=0.02)
+
+            # Batched interpolation matches single lookups
+            conc, yields, converged = table.interpolate([347.3, 320.0], [123.4, 50.0], [0.17, 0.0])
+            self.assertEqual(conc.shape, (2, 2))
+            self.assertAlmostEqual(yields[0], estimate["yield"])
+            self.assertTrue(converged.all())
+            
+            # Corners that did not converge are not blended in
+            table._data = table._data.copy()
+            table._data[5, 7, 2, -1] = 0.0
+            _, _, converged = table.interpolate(table.axes[0][5] + 1.0, np.exp(table.axes[1][7]) * 1.1,
+                                                table.axes[2][2] + 0.01)
+            self.assertFalse(converged[0])
+            fallback = table.lookup(table.axes[0][5] + 1.0, np.exp(table.axes[1][7]) * 1.1,
+                                    table.axes[2][2] + 0.01)
+            self.assertTrue(fallback["exact"])
+            del table
+    
+    def test_single_point_axis(self):
+        sim = self.make_simulator()
+        with tempfile.TemporaryDirectory() as directory:
+            path = sim.build_response_table(os.path.join(directory, "a_to_b"), temp_bounds=(300, 400),
+                                            temp_points=11, tau_bounds=(10.0, 1000.0), tau_points=11,
+                                            recycle_bounds=(0.0, 0.0), recycle_points=1)
+            table = ResponseTable(path)
+            node = table.lookup(table.axes[0][4], np.exp(table.axes[1][6]), 0.0)
+            exact = table.exact(table.axes[0][4], np.exp(table.axes[1][6]), 0.0)
+            self.assertFalse(node["exact"])
+            self.assertAlmostEqual(node["yield"], exact["yield"], places=8)
+            self.assertAlmostEqual(node["concentrations"]["B"], exact["concentrations"]["B"], places=8)
+            del table
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator, PIDController, LinearMPC
+
+class TestSimulateClosedLoop(unittest.TestCase):
+    def test_simulate_closed_loop(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+
+        # Open loop: a PID without gains holds the input and stays at steady state
+        steady = sim.solve_steady_state()
+        results = sim.simulate_closed_loop(PIDController(kp=0.0), 0.7, 3600.0, 60.0)
+        self.assertEqual(len(results), 61)
+        self.assertEqual(list(results.columns), ["time", "A", "B", "temperature", "setpoint"])
+        np.testing.assert_allclose(results["B"], steady["B"], rtol=1e-8)
+
+        # Setpoint change followed by a feed disturbance, with the temperature manipulated
+        disturbance = lambda t: {"feed_A": 1.0 if t < 20000.0 else 0.9}
+        for controller in [PIDController(kp=20.0, ki=0.2, bounds=(300.0, 400.0)),
+                           LinearMPC(bounds={"temperature": (300.0, 365.0)})]:
+            results = sim.simulate_closed_loop(controller, 0.7, 40000.0, 60.0, disturbance=disturbance)
+            final = results.iloc[-1]
+            self.assertAlmostEqual(final["B"], 0.7, places=4)
+            self.assertTrue((results["temperature"] <= 400.0).all())
+            # The final state is the steady state at the final input
+            sim.set_parameters(1.0, final["temperature"], 0.01, sim.reactions, {"A": 0.9}, 0.0, "B")
+            sim.components = ["A", "B"]
+            self.assertAlmostEqual(sim.solve_steady_state()["B"], final["B"], places=6)
+            sim.set_parameters(1.0, 350.0, 0.01, sim.reactions, {"A": 1.0}, 0.0, "B")
+            sim.components = ["A", "B"]
+
+if __name__ == '__main__':
+    unittest.main()
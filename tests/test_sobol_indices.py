@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator
+
+class TestSobolIndices(unittest.TestCase):
+    def test_sobol_indices(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        indices = sim.sobol_indices(bounds={"volume": (1.0, 1.0)}, n_samples=512, seed=0)
+
+        self.assertEqual(list(indices.columns), ["first_order", "total"])
+        self.assertEqual(list(indices.index), ["temperature", "volume", "flow_rate", "recycle_ratio",
+                                               "feed_A", "frequency_factor_1", "activation_energy_1"])
+        # A fixed input and the feed of a first-order reaction do not affect the yield
+        self.assertAlmostEqual(indices.loc["volume", "total"], 0.0)
+        self.assertAlmostEqual(indices.loc["feed_A", "total"], 0.0, places=6)
+        # Temperature and activation energy dominate the variance
+        self.assertGreater(indices.loc["temperature", "total"], 0.2)
+        self.assertGreater(indices.loc["activation_energy_1", "total"], 0.2)
+        self.assertTrue(np.all(indices["total"] >= indices["first_order"] - 0.05))
+        self.assertLess(indices["first_order"].sum(), 1.1)
+
+if __name__ == '__main__':
+    unittest.main()
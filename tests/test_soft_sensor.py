@@ -0,0 +1,104 @@
+import io
+import itertools
+import json
+import unittest
+from unittest import mock
+import numpy as np
+import functions
+from functions import CSTRSimulator, SoftSensor
+
+class TestSoftSensor(unittest.TestCase):
+    def test_soft_sensor(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+
+        # JSON-lines stream with a blank line and a malformed record
+        lines = [json.dumps({"timestamp": k, "temperature": 340.0 + k, "flow_rate": 0.01}) + "\n"
+                 for k in range(20)]
+        lines.insert(5, "\n")
+        lines.insert(9, "not json\n")
+        sensor = SoftSensor(sim, latency_budget=1.0)
+        output = io.StringIO()
+        summary = sensor.run(lines, output)
+        predictions = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        self.assertEqual(summary["converged"], 20)
+        self.assertEqual(summary["invalid"], 1)
+        self.assertEqual(summary["latency"]["count"], 20)
+        self.assertEqual(sensor.histogram_counts.sum(), 20)
+        self.assertEqual(len(predictions), 21)
+        valid = [prediction for prediction in predictions if prediction["quality"] != "invalid"]
+        self.assertEqual([prediction["timestamp"] for prediction in valid], list(range(20)))
+        conc = sim.solve_steady_state(352.0)
+        self.assertAlmostEqual(valid[12]["pred_B"], conc["B"], places=8)
+        self.assertAlmostEqual(valid[12]["pred_yield"], sim.calculate_yield(), places=8)
+
+        # Without time to iterate, the best iterate is returned and flagged
+        sensor = SoftSensor(sim, latency_budget=0.0)
+        prediction = sensor.predict({"temperature": 400.0})
+        self.assertEqual(prediction["quality"], "timeout")
+        self.assertGreater(prediction["residual"], 1e-6)
+        self.assertEqual(sensor.latency_summary()["over_budget"], 1)
+
+    def test_timeout_after_failed_warm_start(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=400.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "2A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 60000.0,
+                    "reaction_order": {"A": 2},
+                    "stoichiometry": {"A": -2, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        network = sim._compile_network()
+        feed = sim._feed_vector(network)
+        tau = sim.volume / sim.flow_rate
+        warm_start = np.array([[0.999, 0.0005]])
+        
+        def norm(conc):
+            residual, _, _ = sim._steady_state_residual(network, conc, 400.0, tau, 0.0, feed)
+            return np.abs(residual).max()
+        
+        # Every clock reading advances one tick, so the deadline expires at each
+        # stage of the retries (main loop, retry from the feed, continuation)
+        for budget in range(0, 400, 5):
+            clock = itertools.count()
+            with mock.patch.object(functions.time, "perf_counter", lambda: float(next(clock))):
+                conc, converged = sim._solve_steady_state_arrays(network, 400.0, tau, 0.0, feed, warm_start,
+                                                                 max_iterations=2, deadline=float(budget))
+            # The best iterate of this operating point is kept, never a worse retry
+            self.assertLessEqual(norm(conc), norm(warm_start))
+            if converged[0]:
+                self.assertLess(norm(conc), 1e-8)
+
+if __name__ == '__main__':
+    unittest.main()
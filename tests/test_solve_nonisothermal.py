@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator
+
+class TestSolveNonisothermal(unittest.TestCase):
+    def setUp(self):
+        self.sim = CSTRSimulator()
+        self.sim.set_parameters(
+            volume=1.0,
+            temperature=290.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False,
+                    "heat_of_reaction": -60000.0
+                }
+            ],
+            feed_composition={"A": 1000.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        self.sim.components = ["A", "B"]
+        self.sim.set_jacket(heat_transfer_coefficient=100.0, coolant_temperature=290.0, heat_capacity=4.0e5)
+
+    def energy_residual(self, result):
+        # (T_feed - T) + tau / (rho cp) * ((-dH) k C_A - UA / V (T - T_coolant))
+        T = result["temperature"]
+        k = 1e10 * np.exp(-80000.0 / (self.sim.R * T))
+        C_A = result["concentrations"]["A"]
+        return (290.0 - T) + 100.0 / 4.0e5 * (60000.0 * k * C_A - 100.0 * (T - 290.0))
+
+    def test_solve_nonisothermal(self):
+        low = self.sim.solve_nonisothermal()
+        self.assertTrue(low["converged"])
+        self.assertAlmostEqual(self.energy_residual(low), 0.0, places=6)
+        self.assertLess(low["temperature"], 300.0)
+        self.assertEqual(self.sim.temperature, low["temperature"])
+
+        # A hot start follows the ignited branch of the same reactor
+        high = self.sim.solve_nonisothermal(initial_temperature=500.0)
+        self.assertTrue(high["converged"])
+        self.assertAlmostEqual(self.energy_residual(high), 0.0, places=6)
+        self.assertGreater(high["temperature"], 400.0)
+        self.assertAlmostEqual(sum(high["concentrations"].values()), 1000.0, places=6)
+
+    def test_coolant_sweep(self):
+        coolant = np.linspace(250.0, 330.0, 9)
+        low = self.sim.coolant_sweep(coolant)
+        high = self.sim.coolant_sweep(coolant, initial_temperature=500.0)
+        self.assertTrue(low["converged"].all())
+        self.assertTrue(high["converged"].all())
+        self.assertTrue((np.diff(low["temperature"]) > 0).all())
+        self.assertTrue((high["temperature"] > low["temperature"] + 100.0).all())
+        self.assertTrue((high["yield"] > low["yield"]).all())
+
+        # The sweep matches the single-point solve
+        self.sim.set_jacket(heat_transfer_coefficient=100.0, coolant_temperature=310.0, heat_capacity=4.0e5)
+        single = self.sim.solve_nonisothermal()
+        self.assertAlmostEqual(low["temperature"][6], single["temperature"], places=6)
+
+if __name__ == "__main__":
+    unittest.main()
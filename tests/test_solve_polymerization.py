@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from functions import ReactionDatabase
+
+class TestSolvePolymerization(unittest.TestCase):
+    def setUp(self):
+        self.sim = ReactionDatabase().create_simulator("Polyethylene Production")
+    
+    def test_steady_state(self):
+        temperatures = np.linspace(350.0, 500.0, 7)[:, None]
+        results = self.sim.solve_polymerization(temperature=temperatures, residence_time=[60.0, 250.0, 1000.0])
+        self.assertEqual(len(results), 21)
+        
+        # Monomer units are conserved between monomer, live and dead chains
+        feed = self.sim.feed_composition["C2H4"]
+        total = results["monomer"] + results["live_1"] + results["dead_1"]
+        np.testing.assert_allclose(total, feed, rtol=1e-12)
+        self.assertTrue((results["PDI"] >= 1.0).all())
+        self.assertTrue((results["conversion"] > 0).all() and (results["conversion"] < 1).all())
+        
+        # Termination by combination only gives a dispersity of 1.5 for long chains at
+        # low conversion, disproportionation only the most probable distribution (2)
+        kinetics = dict(self.sim.polymerization)
+        kinetics["transfer_to_monomer"] = {"frequency_factor": 0.0, "activation_energy": 0}
+        self.sim.set_polymerization(kinetics)
+        self.assertAlmostEqual(self.sim.solve_polymerization(temperature=380.0)["PDI"][0], 1.5, delta=0.02)
+        kinetics["termination_disproportionation"] = kinetics["termination_combination"]
+        kinetics["termination_combination"] = {"frequency_factor": 0.0, "activation_energy": 0}
+        self.sim.set_polymerization(kinetics)
+        self.assertAlmostEqual(self.sim.solve_polymerization(temperature=380.0)["PDI"][0], 2.0, delta=0.02)
+    
+    def test_dynamics(self):
+        temperatures = [420.0, 450.0, 480.0]
+        trajectory = self.sim.simulate_polymerization(6000.0, n_steps=400, temperature=temperatures)
+        self.assertEqual(len(trajectory), 401 * 3)
+        final = trajectory[trajectory["time"] == trajectory["time"].max()].reset_index(drop=True)
+        steady = self.sim.solve_polymerization(temperature=temperatures)
+        for column in ["monomer", "conversion", "Mn", "Mw"]:
+            np.testing.assert_allclose(final[column], steady[column], rtol=1e-4)
+        
+        # Analytic Jacobian of the moment equations against finite differences
+        _, constants, dilution, feed = self.sim._polymerization_inputs(temperatures, None, None, None)
+        state = final[list(self.sim.POLYMER_STATE)].to_numpy()
+        derivative, jacobian = self.sim._polymerization_rates(state, constants, dilution, feed)
+        for i in range(state.shape[1]):
+            step = 1e-6 * np.maximum(np.abs(state[:, i]), 1e-12)
+            shifted = state.copy()
+            shifted[:, i] += step
+            numerical = (self.sim._polymerization_rates(shifted, constants, dilution, feed)[0] - derivative) / step[:, None]
+            np.testing.assert_allclose(jacobian[:, :, i], numerical, rtol=1e-4,
+                                       atol=1e-6 * np.abs(numerical).max())
+
+if __name__ == "__main__":
+    unittest.main()
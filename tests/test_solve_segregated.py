@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from functions import CSTRSimulator
+
+class TestSolveSegregated(unittest.TestCase):
+    def make_simulator(self, order):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": order},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        return sim
+    
+    def test_first_order(self):
+        sim = self.make_simulator(1)
+        results = sim.solve_segregated(residence_time=[10.0, 100.0, 1000.0], n_tanks=[[1.0], [3.0], [10.0]])
+        self.assertEqual(len(results), 9)
+        
+        # Linear kinetics: segregated flow over the gamma RTD equals the tanks in series
+        k = 1e10 * np.exp(-80000.0 / (sim.R * 350.0))
+        expected = 1 / (1 + k * results["residence_time"] / results["n_tanks"]) ** results["n_tanks"]
+        np.testing.assert_allclose(results["A"], expected, atol=5e-5)
+        np.testing.assert_allclose(results["A"] + results["B"], 1.0, atol=1e-12)
+        
+        # Batch trajectories are reused for other residence times at the same temperature
+        sim.solve_segregated(residence_time=np.geomspace(1.0, 1e4, 50), n_tanks=2.0)
+        self.assertEqual(list(sim._batch_cache["paths"]), [350.0])
+    
+    def test_second_order(self):
+        # Segregation raises the conversion of reactions of order above one
+        sim = self.make_simulator(2)
+        segregated = sim.solve_segregated()["A"][0]
+        micromixed = sim.solve_steady_state()["A"]
+        self.assertLess(segregated, micromixed)
+        
+        # Many tanks approach plug flow, where both mixing limits coincide
+        k = 1e10 * np.exp(-80000.0 / (sim.R * 350.0))
+        plug_flow = 1 / (1 + k * 100.0)
+        self.assertAlmostEqual(sim.solve_segregated(n_tanks=1e4)["A"][0], plug_flow, places=3)
+    
+    def test_fit_residence_time_distribution(self):
+        rng = np.random.default_rng(0)
+        times = np.arange(0.0, 3000.0, 5.0)
+        
+        # Pulse injection
+        response = 2000.0 * CSTRSimulator.residence_time_distribution(times, 300.0, 3.0)
+        noisy = response + rng.normal(0.0, 0.01 * response.max(), times.size)
+        fit = CSTRSimulator.fit_residence_time_distribution(times, noisy)
+        self.assertAlmostEqual(fit["residence_time"] / 300.0, 1.0, delta=0.02)
+        self.assertAlmostEqual(fit["n_tanks"] / 3.0, 1.0, delta=0.05)
+        
+        # Rectangular injection: the outlet is the inlet convolved with the RTD
+        inlet = np.where((times >= 100.0) & (times < 400.0), 1.0, 0.0)
+        outlet = np.convolve(inlet, 5.0 * CSTRSimulator.residence_time_distribution(times, 150.0, 2.5))[:times.size]
+        fit = CSTRSimulator.fit_residence_time_distribution(times, outlet, inlet=inlet)
+        self.assertAlmostEqual(fit["residence_time"] / 150.0, 1.0, delta=0.03)
+        self.assertAlmostEqual(fit["n_tanks"] / 2.5, 1.0, delta=0.05)
+        self.assertLess(fit["rmse"], 0.01)
+
+if __name__ == "__main__":
+    unittest.main()
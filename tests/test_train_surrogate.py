@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from functions import CSTRSimulator, SurrogateModel
+
+class TestTrainSurrogate(unittest.TestCase):
+    def test_train_surrogate(self):
+        sim = CSTRSimulator()
+        sim.set_parameters(
+            volume=1.0,
+            temperature=350.0,
+            flow_rate=0.01,
+            reactions=[
+                {
+                    "name": "A to B",
+                    "frequency_factor": 1e10,
+                    "activation_energy": 80000.0,
+                    "reaction_order": {"A": 1},
+                    "stoichiometry": {"A": -1, "B": 1},
+                    "reversible": False
+                }
+            ],
+            feed_composition={"A": 1.0},
+            recycle_ratio=0.0,
+            target_product="B"
+        )
+        sim.components = ["A", "B"]
+        surrogate = sim.train_surrogate(temp_bounds=(300, 400), flow_rate_bounds=(0.005, 0.05),
+                                        recycle_bounds=(0.0, 0.5), n_samples=200, n_validation=50, seed=0)
+
+        self.assertEqual(surrogate.validation["n_validation"], 50)
+        self.assertLess(surrogate.validation["yield_rmse"], 0.02)
+        yields, conc = surrogate.predict([[350.0, 0.01, 0.2, 1.0], [320.0, 0.02, 0.0, 1.0]])
+        self.assertEqual(yields.shape, (2,))
+        self.assertEqual(conc.shape, (2, 2))
+
+        # Saved surrogates give the same predictions
+        with tempfile.TemporaryDirectory() as directory:
+            path = surrogate.save(os.path.join(directory, "a_to_b.npz"))
+            loaded = SurrogateModel.load(path)
+        np.testing.assert_allclose(loaded.predict([[350.0, 0.01, 0.2, 1.0]])[0], yields[:1])
+        self.assertEqual(loaded.validation, surrogate.validation)
+
+        # Screening confirms the best candidates with exact solves
+        result = sim.screen_with_surrogate(surrogate, n_candidates=2000, n_confirm=3, seed=1)
+        self.assertEqual(len(result["candidates"]), 3)
+        self.assertTrue(result["candidates"]["converged"].all())
+        self.assertAlmostEqual(result["yield"], result["candidates"]["yield"].max())
+        self.assertAlmostEqual(sim.temperature, result["temperature"])
+
+        # Non-converged confirmations never become the optimum
+        evaluate = sim._evaluate_operating_points
+        def diverging(*args, **kwargs):
+            yields, gradients, conc, converged = evaluate(*args, **kwargs)
+            yields[0], converged[0] = 2.0, False
+            return yields, gradients, conc, converged
+        with mock.patch.object(sim, "_evaluate_operating_points", side_effect=diverging):
+            result = sim.screen_with_surrogate(surrogate, n_candidates=2000, n_confirm=3, seed=1)
+        self.assertFalse(result["candidates"]["converged"].iloc[0])
+        self.assertLess(result["yield"], 1.0)
+
+        # Surrogates of another process are rejected without touching the simulator
+        sim.volume = 2.0
+        state = (sim.temperature, sim.flow_rate, sim.recycle_ratio, dict(sim.feed_composition))
+        with self.assertRaises(ValueError):
+            sim.screen_with_surrogate(surrogate, n_candidates=100, n_confirm=1, seed=1)
+        self.assertEqual((sim.temperature, sim.flow_rate, sim.recycle_ratio, dict(sim.feed_composition)), state)
+
+if __name__ == '__main__':
+    unittest.main()